@@ -0,0 +1,35 @@
+"""
+Performance benchmarks, run as modules from the repository root.
+
+Settings are read by `src.envs` at import, so they're pinned here, before any
+benchmark imports `src`: benchmarks never talk to Notion and must not read or
+write the user's sync state, trained model or merchant cache.
+"""
+
+import os
+import tempfile
+
+# Worker processes inherit the environment and reuse their parent's directory
+STATE_DIR = os.environ.get("BENCHMARK_STATE_DIR") or tempfile.mkdtemp(
+    prefix="notion-finance-bench-"
+)
+
+# Set explicitly rather than unset, so values from a local .env can't apply
+os.environ.update(
+    {
+        "NOTION_SECRET": "benchmark",
+        "FINANCE_DASHBOARD_ID": "benchmark",
+        "MONTHLY_INVOICE_FILENAME": "benchmark.csv",
+        "INVOICE_BANK": "INTER",
+        "BENCHMARK_STATE_DIR": STATE_DIR,
+        "SYNC_STATE_DIR": STATE_DIR,
+        "NOTION_RATE_LIMIT_DB": os.path.join(STATE_DIR, "rate_limit.sqlite"),
+        "CATEGORY_MODEL_PATH": os.path.join(STATE_DIR, "category_model.npz"),
+        "MERCHANT_CACHE_PATH": os.path.join(STATE_DIR, "merchant_keys.json"),
+        "CATEGORY_RULES_CACHE_DIR": os.path.join(STATE_DIR, "category_rules"),
+        "CATEGORY_MEMORY_DB": os.path.join(STATE_DIR, "category_memory.sqlite"),
+        "EXPENSE_STORE_DIR": os.path.join(STATE_DIR, "expenses"),
+        "SUMMARY_DATABASE_ID": "",
+        "SUMMARY_STATE_DB": os.path.join(STATE_DIR, "summary.sqlite"),
+    }
+)
@@ -0,0 +1,257 @@
+"""
+Throughput and memory of the ingestion and categorisation path.
+
+Synthetic Inter invoices, Inter account statements and Nubank exports of each
+size go through every stage of the path the CLI and the app take:
+
+    python -m benchmarks.ingestion --sizes 1000,10000,50000
+
+Each measurement runs in a fresh worker process so its peak RSS belongs to
+that stage alone; the median of `--repeat` runs is reported as rows/s so one
+lucky or unlucky run can't pass or fail `--check` on its own. Results
+are compared with the stored baseline (`--check` fails on regressions), and
+`--update-baseline` replaces it.
+"""
+
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable
+
+import click
+import pandas as pd
+
+from benchmarks.report import find_regressions, load_results, write_results
+from benchmarks.synthetic import write_export
+from src.adapters.adapter_factory import AdapterFactory
+from src.adapters.inter_statement_adapter import InterStatementAdapter
+from src.adapters.export_parser import parse_uploaded_file
+from src.adapters.notion_adapter import NotionAdapter
+from src.notion_gateway import NotionAPIGateway
+from src.notion_sync_expenses.category_mapper import CategoryMapper
+from src.notion_sync_expenses.merchant_canonicalizer import MerchantCanonicalizer
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "ingestion.json"
+MIB = 1024 * 1024
+
+UPLOAD_TYPES = {
+    "inter_invoice": "CREDIT_CARD_INVOICE",
+    "inter_statement": "BANK_ACCOUNT_STATEMENT",
+}
+
+
+def read_invoice(path: Path, export: str) -> pd.DataFrame:
+    """Read an export with the adapter the sync service uses for it."""
+    if export == "inter_statement":
+        return InterStatementAdapter().read_invoice(str(path))
+    bank = "NUBANK" if export == "nubank" else "INTER"
+    return AdapterFactory.create_adapter(bank).read_invoice(str(path))
+
+
+def _uncategorised(path: Path, export: str) -> pd.DataFrame:
+    """Adapter output with every category cleared, so all rows get mapped."""
+    df = read_invoice(path, export)
+    df["category"] = None
+    df["merchant"] = MerchantCanonicalizer(cache_path=None).canonicalize_series(
+        df["description"]
+    )
+    return df
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    One step of the ingestion path.
+
+    `setup` builds its input once, untimed; `fresh` derives the argument of
+    each timed `run` from it, so runs that mutate their input stay comparable.
+    """
+
+    setup: Callable[[Path, str], Any]
+    run: Callable[[Any], Any]
+    fresh: Callable[[Any], Any] = lambda state: state
+    exports: tuple[str, ...] = ("inter_invoice", "inter_statement", "nubank")
+
+
+STAGES = {
+    "read_invoice": Stage(
+        setup=lambda path, export: (path, export),
+        run=lambda args: read_invoice(*args),
+    ),
+    "parse_uploaded_file": Stage(
+        setup=lambda path, export: (path.read_bytes(), UPLOAD_TYPES[export]),
+        run=lambda args: parse_uploaded_file(*args),
+        # Each run reads from its own buffer
+        fresh=lambda state: (BytesIO(state[0]), state[1]),
+        exports=tuple(UPLOAD_TYPES),
+    ),
+    "canonicalize_merchants": Stage(
+        setup=read_invoice,
+        run=lambda args: args[0].canonicalize_series(args[1]["description"]),
+        # A cold memo cache each run, as for a statement never seen before
+        fresh=lambda df: (MerchantCanonicalizer(cache_path=None), df),
+    ),
+    "map_dataframe": Stage(
+        setup=lambda path, export: (CategoryMapper(), _uncategorised(path, export)),
+        run=lambda args: args[0].map_dataframe(args[1], "merchant", "category"),
+        fresh=lambda state: (state[0], state[1].copy()),
+    ),
+    "convert_to_notion_format": Stage(
+        setup=lambda path, export: CategoryMapper().map_dataframe(
+            _uncategorised(path, export), "merchant", "category"
+        ),
+        run=NotionAdapter().convert_to_notion_format,
+    ),
+    "build_payloads": Stage(
+        setup=lambda path, export: NotionAdapter().convert_to_notion_format(
+            CategoryMapper().map_dataframe(
+                _uncategorised(path, export), "merchant", "category"
+            )
+        ),
+        run=lambda expenses: [
+            NotionAPIGateway.build_payload("benchmark", expense) for expense in expenses
+        ],
+    ),
+}
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / MIB if sys.platform == "darwin" else peak / 1024
+
+
+def measure(stage_name: str, export: str, path: Path, repeat: int) -> dict:
+    """Time one stage on one export; runs in its own worker process."""
+    stage = STAGES[stage_name]
+    state = stage.setup(path, export)
+    rss_before = _peak_rss_mib()
+
+    timings = []
+    for _ in range(repeat):
+        argument = stage.fresh(state)
+        start = time.perf_counter()
+        stage.run(argument)
+        timings.append(time.perf_counter() - start)
+
+    peak = _peak_rss_mib()
+    return {
+        "seconds": round(statistics.median(timings), 5),
+        "peak_rss_mib": round(peak, 1),
+        "rss_growth_mib": round(peak - rss_before, 1),
+    }
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="1000,10000,50000",
+    show_default=True,
+    help="Comma-separated row counts",
+)
+@click.option(
+    "--stage",
+    "stages",
+    type=click.Choice(list(STAGES)),
+    multiple=True,
+    help="Stages to run (default: all)",
+)
+@click.option("--repeat", default=5, show_default=True)
+@click.option("--seed", default=0, show_default=True)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default="benchmarks/results/ingestion.json",
+    show_default=True,
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False),
+    default=str(BASELINE_PATH),
+    show_default=True,
+)
+@click.option("--tolerance", default=0.2, show_default=True)
+@click.option(
+    "--check",
+    is_flag=True,
+    help="Fail when throughput is more than --tolerance below the baseline",
+)
+@click.option(
+    "--update-baseline",
+    is_flag=True,
+    help="Store these results as the new baseline instead of comparing",
+)
+def main(
+    sizes, stages, repeat, seed, output, baseline, tolerance, check, update_baseline
+):
+    """Benchmark the ingestion and categorisation path on synthetic exports."""
+    baseline_path = Path(baseline)
+    expected = {}
+    if baseline_path.exists() and not update_baseline:
+        expected = {
+            (entry["stage"], entry["export"], entry["rows"]): entry["rows_per_s"]
+            for entry in load_results(baseline_path)
+        }
+
+    results = []
+    context = get_context("spawn")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows in (int(size) for size in sizes.split(",")):
+            for stage_name in stages or STAGES:
+                for export in STAGES[stage_name].exports:
+                    path = Path(directory) / f"{export}_{rows}_{seed}.csv"
+                    if not path.exists():
+                        write_export(export, rows, Path(directory), seed)
+                    with ProcessPoolExecutor(1, mp_context=context) as worker:
+                        measured = worker.submit(
+                            measure, stage_name, export, path, repeat
+                        ).result()
+
+                    result = {
+                        "stage": stage_name,
+                        "export": export,
+                        "rows": rows,
+                        "rows_per_s": round(rows / measured["seconds"], 1),
+                        **measured,
+                    }
+                    results.append(result)
+
+                    before = expected.get((stage_name, export, rows))
+                    change = f"{result['rows_per_s'] / before:>6.2f}x" if before else ""
+                    click.echo(
+                        f"{stage_name:<25} {export:<16} {rows:>7} rows "
+                        f"{result['rows_per_s']:>12,.0f} rows/s "
+                        f"{result['peak_rss_mib']:>8.1f} MiB  {change}"
+                    )
+
+    write_results(output, "ingestion", results)
+    click.echo(f"Results written to {output}")
+
+    if update_baseline:
+        write_results(baseline_path, "ingestion", results)
+        click.echo(f"Baseline updated at {baseline_path}")
+    elif expected:
+        regressions = find_regressions(
+            results,
+            load_results(baseline_path),
+            key=("stage", "export", "rows"),
+            metric="rows_per_s",
+            tolerance=tolerance,
+            higher_is_better=True,
+        )
+        if regressions:
+            message = "Ingestion throughput regressed:\n" + "\n".join(regressions)
+            if check:
+                raise click.ClickException(message)
+            click.echo(message, err=True)
+
+
+if __name__ == "__main__":
+    main()
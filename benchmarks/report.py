@@ -0,0 +1,71 @@
+"""Writing benchmark results and checking them against a stored baseline."""
+
+import json
+import platform
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+from typing import Any, Iterable
+
+
+def write_results(path: str | Path, benchmark: str, results: list[dict]) -> None:
+    """Write `results` as JSON along with the environment they were measured in."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "benchmark": benchmark,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "packages": {
+            name: _version(name) for name in ("pandas", "pyarrow", "streamlit")
+        },
+        "results": results,
+    }
+    path.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+
+
+def _version(package: str) -> str | None:
+    try:
+        return version(package)
+    except PackageNotFoundError:
+        return None
+
+
+def load_results(path: str | Path) -> list[dict]:
+    return json.loads(Path(path).read_text(encoding="utf-8"))["results"]
+
+
+def find_regressions(
+    results: list[dict],
+    baseline: list[dict],
+    key: Iterable[str],
+    metric: str,
+    tolerance: float,
+    higher_is_better: bool = False,
+    min_delta: float = 0.0,
+) -> list[str]:
+    """
+    Describe every result whose `metric` is worse than the baseline's.
+
+    Results are matched on the `key` fields; a result regresses when it is
+    more than `tolerance` (relative) and `min_delta` (absolute) worse.
+    """
+    key = tuple(key)
+
+    def identity(entry: dict) -> tuple[Any, ...]:
+        return tuple(entry.get(field) for field in key)
+
+    expected = {identity(entry): entry.get(metric) for entry in baseline}
+    regressions = []
+    for entry in results:
+        before, after = expected.get(identity(entry)), entry.get(metric)
+        if before is None or after is None:
+            continue
+        delta = before - after if higher_is_better else after - before
+        if delta > max(abs(before) * tolerance, min_delta):
+            name = ", ".join(
+                f"{field}={value}" for field, value in zip(key, identity(entry))
+            )
+            regressions.append(f"{name}: {metric} {before:.4g} -> {after:.4g}")
+    return regressions
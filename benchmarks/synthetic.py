@@ -0,0 +1,141 @@
+"""Deterministic synthetic bank exports for benchmarks."""
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+import numpy as np
+
+# (raw description, typical amount in BRL); descriptions carry the noise real
+# exports have: processor prefixes, installments, order ids and city suffixes
+MERCHANTS = [
+    ("IFOOD *IFOOD", 45.0),
+    ("IFD*RESTAURANTE SABOR", 62.0),
+    ("UBER *TRIP", 23.0),
+    ("99 RIDE", 18.0),
+    ("NETFLIX.COM", 39.9),
+    ("SPOTIFY", 21.9),
+    ("AMAZON BR", 120.0),
+    ("AMAZON MARKETPLACE", 89.0),
+    ("PG *LOJA DO BAIRRO", 35.0),
+    ("MP*MERCADOLIVRE", 150.0),
+    ("SUPERMERCADO PAO DE ACUCAR", 230.0),
+    ("ASSAI ATACADISTA", 310.0),
+    ("DROGASIL 1234", 58.0),
+    ("RAIADROGASIL SAO PAULO BR", 74.0),
+    ("PADARIA SANTA MARIA", 16.0),
+    ("POSTO SHELL FORTALEZA", 200.0),
+    ("STEAM GAMES", 60.0),
+    ("CAMARIM SALAO", 90.0),
+    ("SMARTFIT", 129.9),
+    ("ENEL CE", 180.0),
+]
+# (history, description); None takes the merchant from the transaction
+STATEMENT_KINDS = [
+    ("Pix enviado", "Fulano de Tal"),
+    ("Pix recebido", "Beltrana Silva"),
+    ("Compra no debito", None),
+    ("Compra no debito", None),
+    ("Pagamento efetuado", "Fatura cartao Inter"),
+    ("Debito automatico", None),
+]
+
+
+def _brl(value: float) -> str:
+    """Format as the banks do: '1.234,56', with a leading '-' when negative."""
+    text = f"{abs(value):,.2f}".replace(",", "_").replace(".", ",")
+    return ("-" if value < 0 else "") + text.replace("_", ".")
+
+
+def _transactions(rows: int, seed: int, start: date):
+    """Draw `rows` (date, description, amount) tuples, sorted by date."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(MERCHANTS), rows)
+    scale = rng.lognormal(0.0, 0.5, rows)
+    offsets = np.sort(rng.integers(0, max(rows // 10, 30), rows))
+    installments = rng.random(rows) < 0.08
+    totals = rng.integers(2, 13, rows)
+
+    for i in range(rows):
+        description, typical = MERCHANTS[picks[i]]
+        if installments[i]:
+            total = int(totals[i])
+            description = f"{description} PARCELA {i % total + 1}/{total}"
+        yield (
+            start + timedelta(days=int(offsets[i])),
+            description,
+            round(typical * float(scale[i]), 2),
+        )
+
+
+def inter_invoice_csv(
+    rows: int, seed: int = 0, start: date = date(2025, 1, 1)
+) -> bytes:
+    """An Inter credit card invoice export (',' separated, 'R$' values)."""
+    lines = ['"Data","Lançamento","Categoria","Tipo","Valor"']
+    for day, description, amount in _transactions(rows, seed, start):
+        lines.append(
+            f'"{day:%d/%m/%Y}","{description}","UNASSIGNED","Compra à vista",'
+            f'"R$ {_brl(amount)}"'
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def inter_statement_csv(
+    rows: int, seed: int = 0, start: date = date(2025, 1, 1)
+) -> bytes:
+    """An Inter account statement export: preamble, ';' separator, accented headers."""
+    rng = np.random.default_rng(seed + 1)
+    kinds = rng.integers(0, len(STATEMENT_KINDS), rows)
+    transactions = list(_transactions(rows, seed, start))
+    end = transactions[-1][0] if transactions else start
+
+    balance = 5000.0
+    body = []
+    for (day, merchant, amount), kind in zip(transactions, kinds):
+        history, description = STATEMENT_KINDS[kind]
+        description = description or merchant
+        signed = amount if history == "Pix recebido" else -amount
+        balance += signed
+        body.append(
+            f"{day:%d/%m/%Y};{history} ;{description};{_brl(signed)};{_brl(balance)}"
+        )
+
+    preamble = [
+        "Extrato Conta Corrente ",
+        "Conta ;12345678",
+        f"Período ;{start:%d/%m/%Y} a {end:%d/%m/%Y}",
+        f"Saldo ;{_brl(balance)}",
+        "",
+        "Data Lançamento;Histórico;Descrição;Valor;Saldo",
+    ]
+    return ("\n".join(preamble + body) + "\n").encode("utf-8-sig")
+
+
+def nubank_csv(rows: int, seed: int = 0, start: date = date(2025, 1, 1)) -> bytes:
+    """A Nubank card export: ISO dates, title-cased merchants, '.' decimals."""
+    rng = np.random.default_rng(seed + 2)
+    refunds = rng.random(rows) < 0.02
+    lines = ["date,title,amount"]
+    for (day, description, amount), refund in zip(
+        _transactions(rows, seed, start), refunds
+    ):
+        title = f"Estorno de {description}" if refund else description
+        lines.append(
+            f'{day:%Y-%m-%d},"{title.title()}",{-amount if refund else amount:.2f}'
+        )
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+EXPORTS: dict[str, Callable[..., bytes]] = {
+    "inter_invoice": inter_invoice_csv,
+    "inter_statement": inter_statement_csv,
+    "nubank": nubank_csv,
+}
+
+
+def write_export(export: str, rows: int, directory: Path, seed: int = 0) -> Path:
+    """Write a synthetic export to `directory` and return its path."""
+    path = Path(directory) / f"{export}_{rows}_{seed}.csv"
+    path.write_bytes(EXPORTS[export](rows, seed))
+    return path
@@ -0,0 +1,355 @@
+"""
+Rerun latency of the Streamlit app, measured with AppTest.
+
+Each scenario uploads a synthetic export, reruns without changes, edits a cell
+in the Notion editor, then in the raw editor, and sends with a stubbed Notion
+gateway. Uploads large enough to open in windowed review, which has no raw
+editor, switch to the full editors before the raw edit, in a rerun that isn't
+measured. A step that finds nothing to act on fails the run. Every step
+records the wall time and peak traced memory of the whole rerun and of the
+components below, so regressions can be pinned to the part of the app that
+caused them:
+
+    python -m benchmarks.ui_rerun --sizes 100,1000,5000,20000
+
+AppTest runs the whole script on each step, fragments included, so the
+numbers are an upper bound on what a browser interaction costs. It can't
+edit a data editor, so edits are handed to the app where it reads editor
+state: `editor_changes` and the frame `st.data_editor` returns.
+
+`--check` compares against `benchmarks/baselines/ui_rerun.json`, recorded
+with `--update-baseline` on the machine that runs the check.
+"""
+
+import functools
+import time
+import tracemalloc
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from unittest import mock
+
+import click
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.report import find_regressions, load_results, write_results
+from benchmarks.synthetic import inter_invoice_csv, inter_statement_csv
+from src.notion_gateway import SendResult
+from src.streamlit_app.components import (
+    data_editor,
+    payload_preview,
+    raw_data_editor,
+    windowed_editor,
+)
+from src.streamlit_app.processors import data_loader, notion_processor
+from src.streamlit_app.session import review_data
+from src.streamlit_app.validators import data_validator
+
+APP_PATH = Path(__file__).resolve().parents[1] / "src" / "streamlit_app" / "app.py"
+BASELINE_PATH = Path(__file__).resolve().parent / "baselines" / "ui_rerun.json"
+MIB = 1024 * 1024
+
+UPLOADS = {
+    "CREDIT_CARD_INVOICE": ("fatura.csv", inter_invoice_csv),
+    "BANK_ACCOUNT_STATEMENT": ("extrato.csv", inter_statement_csv),
+}
+# (module, attribute, component name) of every measured component
+COMPONENTS = [
+    (data_loader, "parse_upload_bytes", "parse_upload"),
+    (data_validator, "validate_data", "validate_data"),
+    (review_data, "transform_data_for_notion", "transform_data_for_notion"),
+    (raw_data_editor, "display_raw_data_editor", "raw_editor"),
+    (data_editor, "display_notion_data_editor", "notion_editor"),
+    (windowed_editor, "display_windowed_notion_editor", "windowed_editor"),
+    (payload_preview, "show_notion_payload_preview", "payload_preview"),
+    (notion_processor, "send_to_notion", "send_to_notion"),
+]
+
+
+class StubGateway:
+    """Accepts every page immediately, so sending measures the app only."""
+
+    def create_pages(self, payloads):
+        for key, _ in payloads:
+            yield SendResult(key=key, response={"id": f"page-{key}"})
+
+
+class Probe:
+    """Wall time and peak traced memory of nested components in one rerun."""
+
+    def __init__(self) -> None:
+        self.components: dict[str, dict[str, float]] = {}
+        # [traced memory at entry, highest peak seen so far] per open component
+        self._stack: list[list[int]] = []
+
+    def wrap(self, name: str, function: Callable) -> Callable:
+        @functools.wraps(function)
+        def measured(*args, **kwargs):
+            with self.measure(name):
+                return function(*args, **kwargs)
+
+        return measured
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        tracing = tracemalloc.is_tracing()
+        entry = 0
+        if tracing:
+            entry, peak = tracemalloc.get_traced_memory()
+            # Resetting the peak for this component must not lose the parent's
+            if self._stack:
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+        frame = [entry, 0]
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            peak = entry
+            if tracing:
+                peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+            stats = self.components.setdefault(
+                name, {"calls": 0, "wall_s": 0.0, "peak_mib": 0.0}
+            )
+            stats["calls"] += 1
+            stats["wall_s"] += elapsed
+            stats["peak_mib"] = max(stats["peak_mib"], (peak - entry) / MIB)
+
+
+class Scenario:
+    """One AppTest session of the app, stepping through a review."""
+
+    def __init__(self, probe: Probe, timeout: float) -> None:
+        self.probe = probe
+        self.app = AppTest.from_file(str(APP_PATH), default_timeout=timeout)
+        # Edit state of each data editor, as the browser would send it
+        self.editor_states: dict[str, dict[str, Any]] = {}
+
+    def run(self) -> list[str]:
+        with ExitStack() as patches:
+            patches.enter_context(
+                mock.patch.object(
+                    review_data,
+                    "editor_changes",
+                    self._editor_changes(review_data.editor_changes),
+                )
+            )
+            patches.enter_context(
+                mock.patch.object(st, "data_editor", self._data_editor(st.data_editor))
+            )
+            self.app.run()
+        return [exception.value for exception in self.app.exception]
+
+    def _editor_changes(self, original: Callable) -> Callable:
+        @functools.wraps(original)
+        def editor_changes(key: str) -> dict[str, Any]:
+            return self.editor_states.get(key) or original(key)
+
+        return editor_changes
+
+    def _data_editor(self, original: Callable) -> Callable:
+        @functools.wraps(original)
+        def data_editor(data, *args, key=None, **kwargs):
+            shown = original(data, *args, key=key, **kwargs)
+            if key in self.editor_states:
+                return review_data.apply_editor_changes(data, self.editor_states[key])
+            return shown
+
+        return data_editor
+
+    def editor_key(self, prefix: str) -> str | None:
+        keys = [element.key or "" for element in self.app.dataframe]
+        return next((key for key in keys if key.startswith(prefix)), None)
+
+    def edit_cell(self, prefix: str, column: str, value: str) -> bool:
+        """Edit the first row of the editor whose key starts with `prefix`."""
+        key = self.editor_key(prefix)
+        if key is None:
+            return False
+        self.editor_states[key] = {
+            "edited_rows": {"0": {column: value}},
+            "deleted_rows": [],
+            "added_rows": [],
+        }
+        return True
+
+
+def run_scenario(file_type: str, rows: int, probe: Probe, timeout: float) -> list[dict]:
+    filename, generate = UPLOADS[file_type]
+    upload = generate(rows)
+    scenario = Scenario(probe, timeout)
+    scenario.app.run()
+
+    def upload_file() -> bool:
+        scenario.app.file_uploader[0].set_value([(filename, upload, "text/csv")])
+        return True
+
+    def edit_raw() -> bool:
+        toggles = [t for t in scenario.app.toggle if t.label == "Windowed review"]
+        if toggles and toggles[0].value:
+            toggles[0].set_value(False)
+            scenario.run()
+        return scenario.edit_cell("raw_data_editor", "Lançamento", "UBER TRIP")
+
+    def send() -> bool:
+        buttons = [b for b in scenario.app.button if "Send to Notion" in b.label]
+        if not buttons:
+            return False
+        buttons[0].click()
+        return True
+
+    steps: list[tuple[str, Callable[[], bool]]] = [
+        ("upload", upload_file),
+        ("rerun", lambda: True),
+        ("edit_notion", lambda: scenario.edit_cell("notion_", "Category", "Food")),
+        ("edit_raw", edit_raw),
+        ("send", send),
+    ]
+
+    records = []
+    for step, prepare in steps:
+        if not prepare():
+            raise RuntimeError(f"Nothing to {step} at {rows} {file_type} rows")
+        probe.components.clear()
+        if tracemalloc.is_tracing():
+            tracemalloc.clear_traces()
+        with probe.measure("total"):
+            errors = scenario.run()
+        total = probe.components.pop("total")
+        records.append(
+            {
+                "file_type": file_type,
+                "rows": rows,
+                "step": step,
+                "windowed": scenario.editor_key("notion_window_editor") is not None,
+                "wall_s": round(total["wall_s"], 4),
+                "peak_mib": round(total["peak_mib"], 2),
+                "components": {
+                    name: {
+                        "calls": int(stats["calls"]),
+                        "wall_s": round(stats["wall_s"], 4),
+                        "peak_mib": round(stats["peak_mib"], 2),
+                    }
+                    for name, stats in probe.components.items()
+                },
+                "errors": errors,
+            }
+        )
+    return records
+
+
+@click.command()
+@click.option(
+    "--sizes",
+    default="100,1000,5000,20000",
+    show_default=True,
+    help="Comma-separated row counts",
+)
+@click.option(
+    "--file-type",
+    "file_types",
+    type=click.Choice(list(UPLOADS)),
+    multiple=True,
+    help="File types to upload (default: all)",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False),
+    default="benchmarks/results/ui_rerun.json",
+    show_default=True,
+)
+@click.option(
+    "--baseline",
+    type=click.Path(dir_okay=False),
+    default=str(BASELINE_PATH),
+    show_default=True,
+)
+@click.option("--tolerance", default=0.25, show_default=True)
+@click.option(
+    "--check",
+    is_flag=True,
+    help="Fail when a step is more than --tolerance slower than the baseline",
+)
+@click.option(
+    "--update-baseline",
+    is_flag=True,
+    help="Store these results as the new baseline instead of comparing",
+)
+@click.option(
+    "--memory/--no-memory",
+    default=True,
+    show_default=True,
+    help="Trace peak memory (slows every step down)",
+)
+@click.option("--timeout", default=600.0, show_default=True)
+def main(
+    sizes,
+    file_types,
+    output,
+    baseline,
+    tolerance,
+    check,
+    update_baseline,
+    memory,
+    timeout,
+):
+    """Benchmark Streamlit rerun latency on synthetic uploads."""
+    probe = Probe()
+    results = []
+    with ExitStack() as patches:
+        patches.enter_context(
+            mock.patch.object(
+                notion_processor, "get_notion_gateway", lambda: StubGateway()
+            )
+        )
+        for module, attribute, name in COMPONENTS:
+            original = getattr(module, attribute)
+            patches.enter_context(
+                mock.patch.object(module, attribute, probe.wrap(name, original))
+            )
+        if memory:
+            tracemalloc.start()
+            patches.callback(tracemalloc.stop)
+
+        for file_type in file_types or UPLOADS:
+            for rows in (int(size) for size in sizes.split(",")):
+                for record in run_scenario(file_type, rows, probe, timeout):
+                    results.append(record)
+                    click.echo(
+                        f"{file_type:<22} {rows:>6} rows  {record['step']:<11} "
+                        f"{record['wall_s'] * 1000:>9.1f} ms  "
+                        f"{record['peak_mib']:>8.1f} MiB"
+                    )
+
+    write_results(output, "ui_rerun", results)
+    click.echo(f"Results written to {output}")
+
+    baseline_path = Path(baseline)
+    if update_baseline:
+        write_results(baseline_path, "ui_rerun", results)
+        click.echo(f"Baseline updated at {baseline_path}")
+    elif baseline_path.exists():
+        regressions = find_regressions(
+            results,
+            load_results(baseline_path),
+            key=("file_type", "rows", "step"),
+            metric="wall_s",
+            tolerance=tolerance,
+            min_delta=0.05,
+        )
+        if regressions:
+            message = "Rerun latency regressed:\n" + "\n".join(regressions)
+            if check:
+                raise click.ClickException(message)
+            click.echo(message, err=True)
+
+
+if __name__ == "__main__":
+    main()
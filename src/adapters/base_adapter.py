@@ -5,6 +5,8 @@ from typing import Protocol
 
 import pandas as pd
 
+from src.money import parse_brl, parse_cents
+
 
 @dataclass
 class StandardExpenseRow:
@@ -36,6 +38,7 @@ class BaseInvoiceAdapter(ABC):
         - date: datetime
         - description: str
         - amount: float
+        - amount_cents: int64, the exact amount the float was derived from
         - category: str (optional, can be None)
         """
         pass
@@ -50,8 +53,40 @@ class BaseInvoiceAdapter(ABC):
                     "date": row.date,
                     "description": row.description,
                     "amount": row.amount,
+                    "amount_cents": parse_cents(row.amount),
                     "category": row.category,
                 }
                 for row in rows
             ]
         )
+
+    def _create_standard_dataframe_from_columns(
+        self,
+        dates: pd.Series,
+        descriptions: pd.Series,
+        amounts: pd.Series,
+        categories: pd.Series | None = None,
+    ) -> pd.DataFrame:
+        """
+        Create standardized DataFrame from whole columns of an export.
+
+        Amounts are parsed once into cents; a ValueError names the first
+        line whose amount isn't one.
+        """
+        parsed = parse_brl(amounts)
+        if parsed.invalid.any():
+            line = int(parsed.invalid.to_numpy().argmax())
+            raise ValueError(f"Row {line + 1}: Invalid amount {amounts.iloc[line]!r}")
+        return pd.DataFrame(
+            {
+                "date": dates.to_numpy(),
+                "description": descriptions.astype(str).to_numpy(),
+                "amount": (parsed.cents / 100).to_numpy(),
+                "amount_cents": parsed.cents.to_numpy(),
+                "category": (
+                    categories.astype(object).where(categories.notna(), None).to_numpy()
+                    if categories is not None
+                    else None
+                ),
+            }
+        )
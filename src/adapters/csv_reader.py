@@ -0,0 +1,140 @@
+import csv
+import io
+import os
+from collections import defaultdict
+from pathlib import Path
+from typing import IO, Literal
+
+import numpy as np
+import pandas as pd
+
+from src.envs import CSV_BACKEND
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # optional: install the `arrow` extra
+    pa = None
+
+CsvBackend = Literal["auto", "pandas", "pyarrow"]
+CsvSource = str | os.PathLike | bytes | IO
+# Like pandas' default `str` dtype: Arrow-backed, with NaN for missing values
+ARROW_STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+
+
+def resolve_backend(backend: CsvBackend | None = None) -> str:
+    """The backend to read with: pyarrow for `auto` when it's installed."""
+    backend = backend or CSV_BACKEND
+    if backend == "auto":
+        return "pyarrow" if pa is not None else "pandas"
+    if backend == "pyarrow" and pa is None:
+        raise ImportError(
+            "The pyarrow CSV backend needs pyarrow; install the `arrow` extra"
+        )
+    if backend not in ("pandas", "pyarrow"):
+        raise ValueError(f"Unknown CSV backend: {backend}")
+    return backend
+
+
+def read_header(source: CsvSource, sep: str = ",", skip_rows: int = 0) -> list[str]:
+    """Column names of a CSV, read from its header line only."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            head = b"".join(file.readline() for _ in range(skip_rows + 1))
+    else:
+        head = b"\n".join(
+            _read_bytes(source).split(b"\n", skip_rows + 1)[: skip_rows + 1]
+        )
+    lines = head.decode("utf-8-sig", errors="ignore").splitlines()
+    if len(lines) <= skip_rows:
+        return []
+    return next(csv.reader([lines[skip_rows]], delimiter=sep))
+
+
+def read_csv(
+    source: CsvSource,
+    sep: str = ",",
+    usecols: list[str] | None = None,
+    dtype: dict[str, str] | None = None,
+    skip_rows: int = 0,
+    backend: CsvBackend | None = None,
+) -> pd.DataFrame:
+    """
+    Read a CSV with only the columns in `usecols`, typed by `dtype`.
+
+    Columns of `usecols` the file doesn't have are skipped, and columns
+    without a dtype are read as strings rather than inferred. The
+    pyarrow backend parses on all cores, memory-maps local files and returns
+    Arrow-backed string columns; the pandas backend uses the C parser. Files
+    Arrow rejects, such as rows with more fields than the header, are read
+    with pandas so both backends accept the same exports.
+    """
+    dtype = dtype or {}
+    header = read_header(source, sep, skip_rows)
+    if usecols is not None:
+        usecols = [name for name in usecols if name in header]
+
+    if resolve_backend(backend) == "pandas":
+        return _read_pandas(source, sep, usecols, dtype, skip_rows)
+
+    column_types = {
+        name: (
+            pa.from_numpy_dtype(np.dtype(dtype[name])) if name in dtype else pa.string()
+        )
+        for name in (header if usecols is None else usecols)
+    }
+    try:
+        table = pa_csv.read_csv(
+            _arrow_input(source),
+            read_options=pa_csv.ReadOptions(use_threads=True, skip_rows=skip_rows),
+            parse_options=pa_csv.ParseOptions(delimiter=sep),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=usecols,
+                column_types=column_types,
+                # Empty cells are missing, as with pandas
+                strings_can_be_null=True,
+            ),
+        )
+    except pa.ArrowInvalid:
+        # Ragged rows: pandas pads short ones and drops extra fields outside
+        # `usecols`, where Arrow refuses the whole file
+        return _read_pandas(source, sep, usecols, dtype, skip_rows)
+    return table.to_pandas(
+        types_mapper={pa.string(): ARROW_STRING, pa.large_string(): ARROW_STRING}.get
+    )
+
+
+def _read_pandas(
+    source: CsvSource,
+    sep: str,
+    usecols: list[str] | None,
+    dtype: dict[str, str],
+    skip_rows: int,
+) -> pd.DataFrame:
+    if not isinstance(source, (str, os.PathLike)):
+        source = io.BytesIO(_read_bytes(source))
+    return pd.read_csv(
+        source,
+        sep=sep,
+        usecols=usecols,
+        skiprows=skip_rows,
+        dtype=defaultdict(lambda: str, dtype),
+        encoding="utf-8-sig",
+    )
+
+
+def _read_bytes(source: CsvSource) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read()
+
+
+def _arrow_input(source: CsvSource):
+    # Local files are mapped rather than read, so large exports aren't copied
+    if isinstance(source, (str, os.PathLike)) and Path(source).is_file():
+        return pa.memory_map(os.fspath(source), "r")
+    return pa.BufferReader(_read_bytes(source))
@@ -1,8 +1,7 @@
-from datetime import datetime
-
 import pandas as pd
 
-from .base_adapter import BaseInvoiceAdapter, StandardExpenseRow
+from .base_adapter import BaseInvoiceAdapter
+from .csv_reader import read_csv
 
 
 class InterAdapter(BaseInvoiceAdapter):
@@ -11,30 +10,13 @@ class InterAdapter(BaseInvoiceAdapter):
     def read_invoice(self, file_path: str) -> pd.DataFrame:
         """Read Inter invoice CSV and return standardized DataFrame."""
         # Read Inter CSV format
-        df = pd.read_csv(file_path, sep=",")
-
-        # Convert to standard format
-        rows = []
-        for _, row in df.iterrows():
-            # Parse date from Inter format (DD/MM/YYYY)
-            date = datetime.strptime(row["Data"], "%d/%m/%Y")
-
-            # Clean amount value (remove R$, dots, and replace comma with dot)
-            amount_str = (
-                str(row["Valor"])
-                .replace("R$", "")
-                .replace(".", "")
-                .replace(",", ".")
-                .strip()
-            )
-            amount = float(amount_str)
-
-            standard_row = StandardExpenseRow(
-                date=date,
-                description=str(row["Lançamento"]),
-                amount=amount,
-                category=row.get("Categoria"),
-            )
-            rows.append(standard_row)
-
-        return self._create_standard_dataframe(rows)
+        df = read_csv(file_path, usecols=["Data", "Lançamento", "Categoria", "Valor"])
+
+        # Convert to standard format; dates are DD/MM/YYYY and amounts are
+        # BRL strings like "R$ 1.234,56"
+        return self._create_standard_dataframe_from_columns(
+            dates=pd.to_datetime(df["Data"], format="%d/%m/%Y"),
+            descriptions=df["Lançamento"],
+            amounts=df["Valor"],
+            categories=df.get("Categoria"),
+        )
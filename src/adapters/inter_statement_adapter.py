@@ -0,0 +1,20 @@
+import pandas as pd
+
+from .base_adapter import BaseInvoiceAdapter
+from .export_parser import parse_uploaded_file
+
+
+class InterStatementAdapter(BaseInvoiceAdapter):
+    """Adapter for Inter bank account statements (preamble and ';' separator)."""
+
+    def read_invoice(self, file_path: str) -> pd.DataFrame:
+        """Read Inter account statement CSV and return standardized DataFrame."""
+        with open(file_path, "rb") as statement:
+            df = parse_uploaded_file(statement, "BANK_ACCOUNT_STATEMENT")
+
+        # Outgoing entries are negative; keep the sign as the statement shows it
+        return self._create_standard_dataframe_from_columns(
+            dates=pd.to_datetime(df["Data"], format="%d/%m/%Y"),
+            descriptions=df["Lançamento"],
+            amounts=df["Valor"],
+        )
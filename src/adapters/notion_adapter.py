@@ -3,6 +3,7 @@ from datetime import datetime
 import pandas as pd
 
 from src.enums import PaymentTypeEnum
+from src.money import parse_brl, to_reais
 from src.notion_gateway import ExpenseRow
 
 
@@ -18,24 +19,36 @@ class NotionAdapter:
         Convert standardized DataFrame to list of ExpenseRow objects for Notion.
 
         Args:
-            df: DataFrame with columns: date, description, amount, category
+            df: DataFrame with columns: date, description, amount, category and
+                optionally amount_cents
             payment_type: Payment type for all expenses
 
         Returns:
             List of ExpenseRow objects ready for Notion
         """
         expense_rows = []
-
-        for _, row in df.iterrows():
+        if df.empty:
+            return expense_rows
+        # Exact cents when the adapter parsed them, the float amount otherwise
+        cents = (
+            df["amount_cents"]
+            if "amount_cents" in df.columns
+            else parse_brl(df["amount"]).cents
+        )
+
+        categories = df["category"] if "category" in df.columns else [None] * len(df)
+        for date, description, category, amount_cents in zip(
+            df["date"], df["description"], categories, cents
+        ):
             expense_row = ExpenseRow(
                 date=(
-                    row["date"]
-                    if isinstance(row["date"], datetime)
-                    else datetime.fromisoformat(str(row["date"]))
+                    date
+                    if isinstance(date, datetime)
+                    else datetime.fromisoformat(str(date))
                 ),
-                description=str(row["description"]),
-                category=row.get("category") or "UNASSIGNED",
-                value=float(row["amount"]),
+                description=str(description),
+                category=category or "UNASSIGNED",
+                value=to_reais(int(amount_cents)),
                 payment=payment_type.value,
                 type_="NON-ESSENTIAL",
                 source="AUTOMATION",
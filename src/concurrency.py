@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import StrEnum
+from typing import Any
+
+
+class CircuitState(StrEnum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+class CircuitOpenError(Exception):
+    """Raised when requests are refused because the Notion API keeps failing."""
+
+
+@dataclass
+class ConcurrencyChange:
+    at: float
+    limit: int
+    reason: str
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD limit on in-flight Notion requests.
+
+    The limit grows by one after a full window of healthy requests and is
+    halved on 429/5xx responses or when the p95 latency of the recent window
+    drifts above `latency_tolerance` times the best p95 seen. After
+    `failure_threshold` consecutive failures the circuit opens and requests
+    fail fast for `cooldown_seconds`, then a single probe decides whether
+    it closes again.
+    """
+
+    def __init__(
+        self,
+        maximum: int,
+        initial: int = 1,
+        minimum: int = 1,
+        window: int = 20,
+        latency_tolerance: float = 2.0,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30.0,
+    ) -> None:
+        self.window = window
+        self.minimum = max(minimum, 1)
+        self.maximum = max(maximum, self.minimum)
+        self.latency_tolerance = latency_tolerance
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+
+        self._limit = min(max(initial, self.minimum), self.maximum)
+        self._in_flight = 0
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._best_p95: float | None = None
+        self._healthy_since_change = 0
+        self._consecutive_failures = 0
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._history: deque[ConcurrencyChange] = deque(maxlen=100)
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    @property
+    def history(self) -> list[ConcurrencyChange]:
+        with self._condition:
+            return list(self._history)
+
+    def snapshot(self) -> dict[str, Any]:
+        """Current controller state, for monitoring."""
+        with self._condition:
+            return {
+                "limit": self._limit,
+                "in_flight": self._in_flight,
+                "state": self._state.value,
+                "p95_seconds": self._p95(),
+                "last_change": self._history[-1].reason if self._history else None,
+            }
+
+    def acquire(self) -> None:
+        """Block until a request may start; raise if the circuit is open."""
+        with self._condition:
+            while True:
+                if self._state == CircuitState.OPEN:
+                    if time.monotonic() - self._opened_at < self.cooldown_seconds:
+                        raise CircuitOpenError(
+                            "Notion API circuit is open after repeated failures"
+                        )
+                    self._state = CircuitState.HALF_OPEN
+                    self._record(self._limit, "circuit half-open, probing")
+
+                limit = 1 if self._state == CircuitState.HALF_OPEN else self._limit
+                if self._in_flight < limit:
+                    self._in_flight += 1
+                    return
+                self._condition.wait()
+
+    def release(self, latency_seconds: float, status: int | None) -> None:
+        """Report the outcome of a request started with `acquire`."""
+        with self._condition:
+            self._in_flight -= 1
+            if status is not None and status < 400:
+                self._on_success(latency_seconds)
+            elif status is not None and status != 429 and status < 500:
+                # Client errors say nothing about API health
+                self._consecutive_failures = 0
+            else:
+                self._on_failure(status)
+            self._condition.notify_all()
+
+    def _on_success(self, latency_seconds: float) -> None:
+        self._consecutive_failures = 0
+        if self._state == CircuitState.HALF_OPEN:
+            self._state = CircuitState.CLOSED
+            self._record(self._limit, "circuit closed, probe succeeded")
+
+        self._latencies.append(latency_seconds)
+        if len(self._latencies) < self.window:
+            return
+
+        p95 = self._p95()
+        if self._best_p95 is None or p95 < self._best_p95:
+            self._best_p95 = p95
+
+        if p95 > self._best_p95 * self.latency_tolerance:
+            self._decrease(f"p95 latency {p95:.2f}s above {self._best_p95:.2f}s")
+            return
+
+        self._healthy_since_change += 1
+        if self._healthy_since_change >= self.window and self._limit < self.maximum:
+            self._healthy_since_change = 0
+            self._limit += 1
+            self._record(self._limit, f"healthy window, p95 {p95:.2f}s")
+
+    def _on_failure(self, status: int | None) -> None:
+        self._consecutive_failures += 1
+        reason = f"HTTP {status}" if status else "request error"
+
+        if self._state == CircuitState.HALF_OPEN or (
+            self._consecutive_failures >= self.failure_threshold
+        ):
+            self._state = CircuitState.OPEN
+            self._opened_at = time.monotonic()
+            self._record(self._limit, f"circuit open after {reason}")
+            return
+
+        self._decrease(reason)
+
+    def _decrease(self, reason: str) -> None:
+        self._healthy_since_change = 0
+        self._latencies.clear()
+        new_limit = max(self.minimum, self._limit // 2)
+        if new_limit != self._limit:
+            self._limit = new_limit
+            self._record(new_limit, reason)
+
+    def _p95(self) -> float | None:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def _record(self, limit: int, reason: str) -> None:
+        self._history.append(
+            ConcurrencyChange(at=time.time(), limit=limit, reason=reason)
+        )
@@ -9,3 +9,19 @@ class PaymentTypeEnum(StrEnum):
 class BankEnum(StrEnum):
     NUBANK = "NUBANK"
     INTER = "INTER"
+
+
+class CategoryEnum(StrEnum):
+    AMAZON = "Amazon"
+    BEAUTY = "Beauty"
+    HEALTH = "Health"
+    TRANSPORT = "Transport"
+    FOOD = "Food"
+    GAMES = "Games"
+    SUBSCRIPTION = "Subscription"
+    SUPERMARKET = "Supermarket"
+    LEISURE = "Leisure"
+    SERVICE = "Service"
+    HOME = "Home"
+    ELETRONIC = "Electronic"
+    UNASSIGNED = "UNASSIGNED"
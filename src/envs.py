@@ -8,6 +8,41 @@ NOTION_SECRET = os.getenv("NOTION_SECRET")
 FINANCE_DASHBOARD_ID = os.getenv("FINANCE_DASHBOARD_ID")
 MONTHLY_INVOICE_FILENAME = os.getenv("MONTHLY_INVOICE_FILENAME")
 INVOICE_BANK = os.getenv("INVOICE_BANK")
+NOTION_REQUESTS_PER_SECOND = float(os.getenv("NOTION_REQUESTS_PER_SECOND", "2.8"))
+NOTION_MAX_WORKERS = int(os.getenv("NOTION_MAX_WORKERS", "4"))
+NOTION_MAX_CONNECTIONS = int(os.getenv("NOTION_MAX_CONNECTIONS", "10"))
+NOTION_KEEPALIVE_SECONDS = float(os.getenv("NOTION_KEEPALIVE_SECONDS", "60"))
+NOTION_HTTP2 = os.getenv("NOTION_HTTP2", "false").lower() in ("1", "true", "yes")
+NOTION_RUN_ID_PROPERTY = os.getenv("NOTION_RUN_ID_PROPERTY")
+SYNC_STATE_DIR = os.getenv("SYNC_STATE_DIR", ".sync_state")
+NOTION_RATE_LIMIT_DB = os.getenv(
+    "NOTION_RATE_LIMIT_DB", os.path.join(SYNC_STATE_DIR, "rate_limit.sqlite")
+)
+CATEGORY_MODEL_PATH = os.getenv(
+    "CATEGORY_MODEL_PATH", os.path.join(SYNC_STATE_DIR, "category_model.npz")
+)
+MERCHANT_CACHE_PATH = os.getenv(
+    "MERCHANT_CACHE_PATH", os.path.join(SYNC_STATE_DIR, "merchant_keys.json")
+)
+CATEGORY_MIN_CONFIDENCE = float(os.getenv("CATEGORY_MIN_CONFIDENCE", "0.8"))
+CATEGORY_RULES_PATH = os.getenv("CATEGORY_RULES_PATH", "category_rules.toml")
+CATEGORY_RULES_CACHE_DIR = os.getenv(
+    "CATEGORY_RULES_CACHE_DIR", os.path.join(SYNC_STATE_DIR, "category_rules")
+)
+CATEGORY_MEMORY_DB = os.getenv(
+    "CATEGORY_MEMORY_DB", os.path.join(SYNC_STATE_DIR, "category_memory.sqlite")
+)
+CATEGORY_MEMORY_MAX_ENTRIES = int(os.getenv("CATEGORY_MEMORY_MAX_ENTRIES", "20000"))
+CATEGORY_MEMORY_MAX_AGE_DAYS = float(os.getenv("CATEGORY_MEMORY_MAX_AGE_DAYS", "365"))
+# Optional: one page per month and category, updated by every sync
+SUMMARY_DATABASE_ID = os.getenv("SUMMARY_DATABASE_ID")
+SUMMARY_STATE_DB = os.getenv(
+    "SUMMARY_STATE_DB", os.path.join(SYNC_STATE_DIR, "summary.sqlite")
+)
+CSV_BACKEND = os.getenv("CSV_BACKEND", "auto")
+EXPENSE_STORE_DIR = os.getenv(
+    "EXPENSE_STORE_DIR", os.path.join(SYNC_STATE_DIR, "expenses")
+)
 
 if not NOTION_SECRET:
     raise ValueError("Notion secret isn't provided")
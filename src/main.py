@@ -1,10 +1,19 @@
 import subprocess
 import sys
+import time
 from pathlib import Path
 
 import click
+import pandas as pd
 
+from src.adapters.adapter_factory import AdapterFactory
+from src.envs import FINANCE_DASHBOARD_ID, NOTION_MAX_WORKERS
+from src.notion_sync_expenses.expense_report import REPORT_DIMENSIONS, build_report
+from src.notion_sync_expenses.expense_store import ExpenseStore
 from src.notion_sync_expenses.notion_sync_service import NotionSyncService
+from src.notion_sync_expenses.scheduler import SyncScheduler
+from src.notion_sync_expenses.tenants import load_tenants
+from src.profiling import MIB, PipelineProfiler, StubGateway
 
 
 @click.group()
@@ -20,10 +29,298 @@ def streamlit():
 
 
 @cli.command()
-def sync():
+@click.option(
+    "--spool",
+    "spool_path",
+    type=click.Path(dir_okay=False),
+    help="Write the built payloads to this spool file instead of printing them.",
+)
+@click.option(
+    "--upsert",
+    is_flag=True,
+    help="Update changed rows in place instead of creating duplicates.",
+)
+@click.option(
+    "--statement",
+    "statement_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Inter account statement to sync alongside the invoice (duplicates dropped).",
+)
+@click.option("--workers", default=NOTION_MAX_WORKERS, show_default=True)
+def sync(
+    spool_path: str | None, upsert: bool, statement_path: str | None, workers: int
+):
     """Run direct sync (send expenses to Notion)."""
+    notion_sync_service = NotionSyncService(statement_path=statement_path)
+    if upsert:
+        report = notion_sync_service.upsert_expenses(max_workers=workers)
+        click.echo(
+            f"Created {report.created}, updated {report.updated}, "
+            f"unchanged {report.unchanged}, failed {report.failed} "
+            f"(run {report.run_id})"
+        )
+        return
+
+    notion_sync_service.sync_expenses(spool_path=spool_path)
+
+
+@cli.command()
+@click.argument("spool_path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--workers", default=NOTION_MAX_WORKERS, show_default=True)
+def drain(spool_path: str, workers: int):
+    """Send a spool file to Notion, resuming from its checkpoint."""
+    notion_sync_service = NotionSyncService()
+    report = notion_sync_service.drain_spool(spool_path, max_workers=workers)
+    click.echo(
+        f"Sent {report.sent}, failed {report.failed}, "
+        f"already sent {report.skipped} (run {report.run_id})"
+    )
+    _echo_concurrency(notion_sync_service)
+
+
+@cli.command()
+@click.argument("run_id")
+@click.option("--workers", default=NOTION_MAX_WORKERS, show_default=True)
+def rollback(run_id: str, workers: int):
+    """Archive every page created by a sync run."""
+    notion_sync_service = NotionSyncService()
+    try:
+        report = notion_sync_service.rollback_run(run_id, max_workers=workers)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Archived {report.archived}, failed {report.failed}, "
+        f"already archived {report.skipped}"
+    )
+    _echo_concurrency(notion_sync_service)
+
+
+@cli.command("train-classifier")
+def train_classifier():
+    """Train the category classifier from expenses already in Notion."""
+    notion_sync_service = NotionSyncService()
+    try:
+        report = notion_sync_service.train_category_classifier()
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Trained on {report.rows} expenses across "
+        f"{len(report.categories)} categories"
+    )
+
+
+@cli.command()
+@click.argument("path", type=click.Path(dir_okay=False))
+@click.option(
+    "--database-id",
+    default=FINANCE_DASHBOARD_ID,
+    help="Database to back up (default: the finance dashboard).",
+)
+def snapshot(path: str, database_id: str):
+    """Back up every page of the database into a Parquet snapshot file."""
+    notion_sync_service = NotionSyncService()
+    try:
+        count = notion_sync_service.snapshot_database(path, database_id)
+    except ImportError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Saved {count} pages to {path}")
+
+
+@cli.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--database-id", required=True, help="Empty database to recreate the pages in."
+)
+@click.option("--workers", default=NOTION_MAX_WORKERS, show_default=True)
+@click.option(
+    "--force", is_flag=True, help="Restore even if the database already has pages."
+)
+def restore(path: str, database_id: str, workers: int, force: bool):
+    """Recreate the pages of a snapshot, resuming from its checkpoint."""
+    notion_sync_service = NotionSyncService()
+    try:
+        report = notion_sync_service.restore_snapshot(
+            path, database_id, max_workers=workers, force=force
+        )
+    except (ImportError, ValueError) as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Restored {report.restored}, failed {report.failed}, "
+        f"already restored {report.skipped} (run {report.run_id})"
+    )
+    _echo_concurrency(notion_sync_service)
+
+
+@cli.command()
+@click.argument("config", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--interval",
+    default=60.0,
+    show_default=True,
+    help="Seconds between scans of the inboxes.",
+)
+@click.option("--once", is_flag=True, help="Sync what's in the inboxes now and exit.")
+@click.option(
+    "--parse-workers",
+    type=int,
+    help="Parsing processes shared by every tenant (default: CPU count).",
+)
+def schedule(config: str, interval: float, once: bool, parse_workers: int | None):
+    """Sync the inbox of every tenant in a TOML config from one process."""
+    try:
+        tenants = load_tenants(config)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+    with SyncScheduler(tenants, parse_workers=parse_workers) as scheduler:
+        while True:
+            for report in scheduler.run_once():
+                if report.files or report.sent or report.failed:
+                    click.echo(
+                        f"[{report.tenant}] Synced {report.files} exports: "
+                        f"sent {report.sent}, failed {report.failed}, "
+                        f"already sent {report.skipped} (run {report.run_id})"
+                    )
+            if once:
+                break
+            time.sleep(interval)
+
+
+@cli.command()
+@click.option("--from", "start", metavar="YYYY-MM", help="First month to report on.")
+@click.option("--to", "end", metavar="YYYY-MM", help="Last month to report on.")
+@click.option(
+    "--by",
+    type=click.Choice(REPORT_DIMENSIONS),
+    default="category",
+    show_default=True,
+    help="Column of the monthly totals.",
+)
+@click.option("--top", default=10, show_default=True, help="Merchants to list.")
+@click.option(
+    "--refresh",
+    is_flag=True,
+    help="Rebuild the local store from Notion first (reads every page).",
+)
+def report(start: str | None, end: str | None, by: str, top: int, refresh: bool):
+    """Report monthly totals from the local expense store, without API calls."""
+    store = ExpenseStore()
+    if not store.enabled:
+        raise click.ClickException(
+            "The expense store needs pyarrow; install the `arrow` extra"
+        )
+    if refresh:
+        refreshed = NotionSyncService().refresh_expense_store()
+        click.echo(
+            f"Stored {refreshed.expenses} expenses across {refreshed.months} months"
+        )
+
+    expense_report = build_report(store, start, end, by=by, limit=top)
+    if expense_report.totals.empty:
+        raise click.ClickException(
+            "No stored expenses for these months; sync or run with --refresh"
+        )
+
+    totals = expense_report.totals.assign(TOTAL=expense_report.totals.sum(axis=1))
+    click.echo(f"Monthly totals by {by} (R$)")
+    click.echo(_format_cents(totals))
+    click.echo("\nEssential vs non-essential (R$)")
+    click.echo(_format_cents(expense_report.essential))
+    click.echo(f"\nTop {top} merchants (R$)")
+    merchants = expense_report.top_merchants.rename(columns={"total_cents": "total"})
+    click.echo(_format_cents(merchants, columns=["total"]))
+
+
+@cli.command()
+@click.option(
+    "--rebuild",
+    is_flag=True,
+    help="Recompute every total from Notion (reads every page).",
+)
+def summary(rebuild: bool):
+    """Bring the monthly summary database up to date with the synced expenses."""
     notion_sync_service = NotionSyncService()
-    notion_sync_service.sync_expenses()
+    if notion_sync_service.summary is None:
+        raise click.ClickException(
+            "No summary database configured; set SUMMARY_DATABASE_ID"
+        )
+    try:
+        if rebuild:
+            report = notion_sync_service.rebuild_summary()
+        else:
+            report = notion_sync_service.summary.push()
+    except (ImportError, ValueError) as e:
+        raise click.ClickException(str(e))
+    click.echo(
+        f"Created {report.created}, updated {report.updated}, "
+        f"failed {report.failed} summary pages"
+    )
+
+
+@cli.command()
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option(
+    "--bank",
+    type=click.Choice(AdapterFactory.get_supported_banks(), case_sensitive=False),
+    default="INTER",
+    show_default=True,
+)
+@click.option(
+    "--statement",
+    "statement_path",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Inter account statement to merge, as `sync --statement` does.",
+)
+@click.option(
+    "--output",
+    type=click.Path(file_okay=False),
+    default="profile",
+    show_default=True,
+    help="Directory for the folded stacks, stats and allocation report.",
+)
+@click.option(
+    "--top", default=15, show_default=True, help="Allocation sites per stage."
+)
+def profile(path: str, bank: str, statement_path: str | None, output: str, top: int):
+    """Profile CPU and memory of each sync stage on an export, without Notion."""
+    notion_sync_service = NotionSyncService(
+        statement_path=statement_path,
+        invoice_path=path,
+        bank=bank,
+        gateway=StubGateway(),
+    )
+    with PipelineProfiler() as profiler:
+        notion_sync_service.stage = profiler.stage
+        try:
+            payloads = notion_sync_service.build_payloads(run_id="profile")
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        with profiler.stage("send"):
+            for payload in payloads:
+                notion_sync_service.gateway.create_page(payload)
+
+    written = profiler.write(output, top=top)
+    click.echo(f"Profiled {len(payloads)} payloads")
+    for stage in profiler.stages.values():
+        click.echo(
+            f"{stage.name:<26} {stage.seconds:>9.3f} s "
+            f"{stage.peak_bytes / MIB:>9.1f} MiB peak"
+        )
+    click.echo("Wrote " + ", ".join(str(path) for path in written))
+
+
+def _format_cents(df: pd.DataFrame, columns: list[str] | None = None) -> str:
+    reais = df.astype({name: "float64" for name in columns or df.columns})
+    for name in columns or df.columns:
+        reais[name] = reais[name] / 100
+    return reais.to_string(float_format="{:,.2f}".format)
+
+
+def _echo_concurrency(notion_sync_service: NotionSyncService) -> None:
+    for change in notion_sync_service.gateway.concurrency.history:
+        click.echo(f"  concurrency -> {change.limit}: {change.reason}")
+    snapshot = notion_sync_service.gateway.concurrency.snapshot()
+    click.echo(f"Concurrency {snapshot['limit']} ({snapshot['state']})")
 
 
 if __name__ == "__main__":
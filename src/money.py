@@ -0,0 +1,113 @@
+"""
+Brazilian real amounts as exact integer cents.
+
+Every stage that reads an amount, from the bank exports to the Notion payload,
+parses it here, so "R$ 1.234,56", "-1234,56" and "1234.56" mean the same
+thing everywhere and sums of cents are exact.
+
+Accepted amounts have an optional sign, an optional `R$`, any spaces
+(including NBSP), dots as thousands separators and up to two decimals after a
+comma. A dot followed by one or two digits and no comma is read as a decimal
+point, as in numbers typed into the editors.
+"""
+
+import re
+from typing import Any, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+# Currency symbol and whitespace, with the no-break spaces spreadsheets export
+_NOISE = "R\\$|\\s|\u00a0|\u202f"
+_DOT_DECIMAL = r"^([-+]?\d+)\.(\d{1,2})$"
+_AMOUNT = (
+    r"^(?P<sign>[-+]?)(?P<units>\d{1,3}(?:\.\d{3})+|\d+)(?:,(?P<decimals>\d{1,2}))?$"
+)
+# Above this many digits of reais, or 10**15 as a number, the cents would
+# overflow int64
+MAX_UNIT_DIGITS = 15
+
+_NOISE_RE = re.compile(_NOISE)
+_DOT_DECIMAL_RE = re.compile(_DOT_DECIMAL)
+_AMOUNT_RE = re.compile(_AMOUNT)
+
+
+class ParsedAmounts(NamedTuple):
+    """Cents of each value (0 where invalid) and the mask of invalid values."""
+
+    cents: pd.Series
+    invalid: pd.Series
+
+
+def parse_brl(values: pd.Series) -> ParsedAmounts:
+    """
+    Parse a column of amounts into int64 cents.
+
+    Numeric columns are rounded to the cent; text is matched over whole
+    columns, parsing each distinct value once.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = values.astype("float64")
+        # NaN and infinities fail the comparison too
+        invalid = ~(numbers.abs() < 10**MAX_UNIT_DIGITS)
+        cents = np.rint(numbers.where(~invalid, 0) * 100).astype(np.int64)
+        return ParsedAmounts(cents, invalid)
+
+    codes, uniques = pd.factorize(values)
+    text = (
+        pd.Series(np.asarray(uniques, dtype=object), dtype="string")
+        .str.replace(_NOISE, "", regex=True)
+        .str.replace(_DOT_DECIMAL, r"\1,\2", regex=True)
+    )
+    parts = text.str.extract(_AMOUNT)
+    units = parts["units"].str.replace(".", "", regex=False)
+    failed = (units.isna() | (units.str.len() > MAX_UNIT_DIGITS)).to_numpy(bool)
+
+    reais = units.where(~failed, "0").astype("int64").to_numpy()
+    decimals = parts["decimals"].fillna("").str.ljust(2, "0").astype("int64").to_numpy()
+    signs = np.where(parts["sign"].eq("-").to_numpy(bool, na_value=False), -1, 1)
+    unique_cents = np.where(failed, 0, signs * (reais * 100 + decimals))
+
+    # Missing values have code -1, which picks the invalid entry appended last
+    cents = np.append(unique_cents, 0)[codes]
+    invalid = np.append(failed, True)[codes]
+    return ParsedAmounts(
+        pd.Series(cents, index=values.index, dtype="int64"),
+        pd.Series(invalid, index=values.index, dtype=bool),
+    )
+
+
+def parse_cents(value: Any) -> int:
+    """Cents of a single amount, as `parse_brl` reads it; ValueError if invalid."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if not abs(value) < 10**MAX_UNIT_DIGITS:
+            raise ValueError(f"Invalid amount: {value!r}")
+        return int(np.rint(value * 100))
+
+    text = _DOT_DECIMAL_RE.sub(r"\1,\2", _NOISE_RE.sub("", str(value)))
+    match = _AMOUNT_RE.match(text)
+    if value is None or match is None:
+        raise ValueError(f"Invalid amount: {value!r}")
+    units = match["units"].replace(".", "")
+    if len(units) > MAX_UNIT_DIGITS:
+        raise ValueError(f"Invalid amount: {value!r}")
+    cents = int(units) * 100 + int((match["decimals"] or "").ljust(2, "0"))
+    return -cents if match["sign"] == "-" else cents
+
+
+def format_brl(cents: pd.Series) -> pd.Series:
+    """Format cents the way the review editors show them, e.g. "R$ -1234,56"."""
+    magnitude = cents.abs()
+    signs = pd.Series(np.where(cents < 0, "-", ""), index=cents.index)
+    return (
+        "R$ "
+        + signs
+        + (magnitude // 100).astype(str)
+        + ","
+        + (magnitude % 100).astype(str).str.zfill(2)
+    )
+
+
+def to_reais(cents: int) -> float:
+    """The float Notion stores for an amount of cents."""
+    return cents / 100
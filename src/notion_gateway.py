@@ -1,15 +1,36 @@
 from __future__ import annotations
 
+import functools
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, TypedDict, cast
 
+import httpx
 import pandas as pd
 from notion_client import Client
+from notion_client.errors import HTTPResponseError
 
-from src.envs import NOTION_SECRET
+from src.envs import (
+    NOTION_HTTP2,
+    NOTION_KEEPALIVE_SECONDS,
+    NOTION_MAX_CONNECTIONS,
+    NOTION_MAX_WORKERS,
+    NOTION_RATE_LIMIT_DB,
+    NOTION_REQUESTS_PER_SECOND,
+    NOTION_RUN_ID_PROPERTY,
+    NOTION_SECRET,
+)
 
+from src.concurrency import AdaptiveConcurrencyController
 from src.enums import PaymentTypeEnum
+from src.money import parse_cents, to_reais
+from src.rate_limiter import RateLimiter, SharedRateLimiter
+
+RETRYABLE_STATUSES = {409, 429, 500, 502, 503, 504}
+MAX_ATTEMPTS = 5
 
 
 @dataclass
@@ -21,6 +42,7 @@ class ExpenseRow:
     payment: str
     type_: str
     source: str = "AUTOMATION"
+    run_id: str | None = None
 
     @classmethod
     def from_series(cls, row: pd.Series, payment_type: PaymentTypeEnum) -> "ExpenseRow":
@@ -28,9 +50,7 @@ class ExpenseRow:
             date=datetime.strptime(row["Data"], "%d/%m/%Y"),
             description=str(row["Lançamento"]),
             category=row.get("NewCategory") or row.get("Categoria") or "UNASSIGNED",
-            value=float(
-                str(row["Valor"]).replace("R$", "").replace(".", "").replace(",", ".")
-            ),
+            value=to_reais(parse_cents(row["Valor"])),
             payment=payment_type.value,
             type_="NON-ESSENTIAL",
         )
@@ -41,60 +61,147 @@ class NotionPayload(TypedDict):
     properties: dict[str, Any]
 
 
+@dataclass
+class SendResult:
+    key: Any
+    response: dict[str, Any] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
 class NotionAPIGateway:
-    def __init__(self) -> None:
-        self._notion_client = Client(auth=NOTION_SECRET)
+    def __init__(
+        self,
+        rate_limiter: RateLimiter | SharedRateLimiter | None = None,
+        http_client: httpx.Client | None = None,
+        concurrency: AdaptiveConcurrencyController | None = None,
+        token: str | None = None,
+    ) -> None:
+        token = token or cast(str, NOTION_SECRET)
+        self._notion_client = Client(auth=token, client=http_client)
+        # Shared across processes so every worker using this token fits one budget
+        self._rate_limiter = rate_limiter or SharedRateLimiter(
+            NOTION_RATE_LIMIT_DB, key=token, rate=NOTION_REQUESTS_PER_SECOND
+        )
+        self.concurrency = concurrency or AdaptiveConcurrencyController(
+            maximum=NOTION_MAX_WORKERS
+        )
 
     def get_database_all(self, database_id: str) -> pd.DataFrame:
-        all_results: list[dict[str, Any]] = []
-        next_cursor: str | None = None
+        return pages_to_frame(self.iter_database_pages(database_id))
+
+    def get_database(self, database_id: str) -> dict[str, Any]:
+        """The database object, with the name and type of every property."""
+        return self._request(
+            self._notion_client.databases.retrieve, database_id=database_id
+        )
+
+    def iter_database_pages(
+        self, database_id: str, filter: dict[str, Any] | None = None
+    ) -> Iterator[dict[str, Any]]:
+        """Stream raw page objects from a database query, one page of 100 at a time."""
+        query: dict[str, Any] = {"database_id": database_id, "page_size": 100}
+        if filter:
+            query["filter"] = filter
 
         while True:
-            response = (
-                self._notion_client.databases.query(
-                    database_id=database_id,
-                    start_cursor=next_cursor,
-                    page_size=100,
-                )
-                if next_cursor
-                else self._notion_client.databases.query(
-                    database_id=database_id,
-                    page_size=100,
-                )
-            )
-            response = cast(dict, response)
-            all_results.extend(response["results"])
+            response = self._request(self._notion_client.databases.query, **query)
+            yield from response["results"]
 
             if response.get("has_more"):
-                next_cursor = response["next_cursor"]
+                query["start_cursor"] = response["next_cursor"]
             else:
                 break
 
-        data = []
-        for page in all_results:
-            props = page["properties"]
-            row = {key: _extract_property_value(value) for key, value in props.items()}
-            data.append(row)
-
-        return pd.DataFrame(data)
-
     def send_row_to_notion(self, database_id: str, expense: ExpenseRow) -> None:
         payload = self.build_payload(database_id, expense)
-        self._notion_client.pages.create(**payload)
+        self.create_page(payload)
+
+    def create_page(self, payload: NotionPayload) -> dict[str, Any]:
+        return self._request(self._notion_client.pages.create, **payload)
+
+    def update_page(self, page_id: str, properties: dict[str, Any]) -> dict[str, Any]:
+        return self._request(
+            self._notion_client.pages.update, page_id=page_id, properties=properties
+        )
+
+    def archive_page(self, page_id: str) -> dict[str, Any]:
+        return self._request(
+            self._notion_client.pages.update, page_id=page_id, archived=True
+        )
+
+    def create_pages(
+        self,
+        payloads: Iterable[tuple[Any, NotionPayload]],
+        max_workers: int = NOTION_MAX_WORKERS,
+    ) -> Iterator[SendResult]:
+        """Create pages concurrently, yielding one result per (key, payload)."""
+        return self.map_concurrently(self.create_page, payloads, max_workers)
+
+    def map_concurrently(
+        self,
+        send: Callable[[Any], dict[str, Any]],
+        items: Iterable[tuple[Any, Any]],
+        max_workers: int = NOTION_MAX_WORKERS,
+    ) -> Iterator[SendResult]:
+        """
+        Run `send` over `items` in a thread pool, yielding results as they finish.
+
+        Items are consumed lazily so large inputs (e.g. a spool file) are never
+        fully loaded; at most `2 * max_workers` requests are queued at once.
+        Every request still goes through the gateway rate limiter.
+        """
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending: dict[Future, Any] = {}
+            for key, item in items:
+                if len(pending) >= max_workers * 2:
+                    yield from _collect_finished(pending)
+                pending[executor.submit(send, item)] = key
+
+            while pending:
+                yield from _collect_finished(pending)
+
+    def _request(self, method: Callable[..., Any], **kwargs: Any) -> dict[str, Any]:
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            self.concurrency.acquire()
+            started_at = time.monotonic()
+            # Outcomes without a status (timeouts, dropped connections) count as failures
+            status: int | None = None
+            try:
+                self._rate_limiter.acquire()
+                started_at = time.monotonic()
+                response = cast(dict, method(**kwargs))
+                status = 200
+                return response
+            except HTTPResponseError as e:
+                # Also raised for non-JSON bodies, e.g. a 502 page from a proxy
+                status = e.status
+                if e.status not in RETRYABLE_STATUSES or attempt == MAX_ATTEMPTS:
+                    raise
+                retry_after = e.headers.get("Retry-After")
+            finally:
+                # Whatever happened, or the slot leaks and later requests block
+                self.concurrency.release(time.monotonic() - started_at, status)
+            time.sleep(float(retry_after) if retry_after else 2 ** (attempt - 1))
+
+        raise RuntimeError("Unreachable")
 
     def send_payloads(self, payloads: list[NotionPayload]) -> None:
         for idx, payload in enumerate(payloads, start=1):
             print("\n" + "-" * 200 + "\n")
             print(f"[{idx}] Sending payload -> {payload}")
             try:
-                self._notion_client.pages.create(**payload)
+                self.create_page(payload)
                 # pass
             except Exception as e:
                 print(f"[{idx}] Failed to send: {e}")
 
     @staticmethod
     def build_payload(database_id: str, expense: ExpenseRow) -> NotionPayload:
-        return {
+        payload: NotionPayload = {
             "parent": {"database_id": database_id},
             "properties": {
                 "Month": {"select": {"name": _format_month(expense.date)}},
@@ -109,6 +216,56 @@ class NotionAPIGateway:
                 "SOURCE": {"select": {"name": expense.source}},
             },
         }
+        if expense.run_id and NOTION_RUN_ID_PROPERTY:
+            payload["properties"][NOTION_RUN_ID_PROPERTY] = {
+                "rich_text": [{"text": {"content": expense.run_id}}]
+            }
+        return payload
+
+
+@functools.cache
+def get_shared_gateway(token: str | None = None) -> NotionAPIGateway:
+    """
+    Process-wide gateway reused by CLI commands and every Streamlit session.
+
+    One keep-alive connection pool (HTTP/2 when NOTION_HTTP2 is set) and one
+    rate limiter serve every caller, so repeated sends skip TLS setup. Each
+    integration `token` (NOTION_SECRET by default) gets a gateway of its own,
+    so tenants never share a pool, a rate budget or a concurrency limit.
+    """
+    http_client = httpx.Client(
+        http2=NOTION_HTTP2,
+        limits=httpx.Limits(
+            max_connections=NOTION_MAX_CONNECTIONS,
+            max_keepalive_connections=NOTION_MAX_CONNECTIONS,
+            keepalive_expiry=NOTION_KEEPALIVE_SECONDS,
+        ),
+    )
+    return NotionAPIGateway(http_client=http_client, token=token)
+
+
+def pages_to_frame(pages: Iterable[dict[str, Any]]) -> pd.DataFrame:
+    """Plain property values of Notion page objects, indexed by page id."""
+    ids = []
+    data = []
+    for page in pages:
+        props = page.get("properties", {})
+        data.append(
+            {key: _extract_property_value(value) for key, value in props.items()}
+        )
+        ids.append(page["id"])
+
+    return pd.DataFrame(data, index=pd.Index(ids, name="page_id", dtype=object))
+
+
+def _collect_finished(pending: dict[Future, Any]) -> Iterator[SendResult]:
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        key = pending.pop(future)
+        try:
+            yield SendResult(key=key, response=future.result())
+        except Exception as e:
+            yield SendResult(key=key, error=e)
 
 
 def _format_month(date: datetime) -> str:
@@ -118,12 +275,12 @@ def _format_month(date: datetime) -> str:
 
 def _extract_property_value(prop: dict[str, Any]) -> Any:
     match prop["type"]:
-        case "title":
-            return prop["title"][0]["plain_text"] if prop["title"] else None
-        case "rich_text":
-            return prop["rich_text"][0]["plain_text"] if prop["rich_text"] else None
-        case "number":
-            return prop["number"]
+        case "title" | "rich_text":
+            # Long texts come split into several segments
+            segments = prop[prop["type"]]
+            return "".join(s["plain_text"] for s in segments) if segments else None
+        case "number" | "checkbox" | "url" | "email" | "phone_number":
+            return prop[prop["type"]]
         case "select":
             return prop["select"]["name"] if prop["select"] else None
         case "multi_select":
@@ -0,0 +1,166 @@
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.envs import CATEGORY_MODEL_PATH
+
+HASH_MULTIPLIER = np.uint64(1_000_003)
+MAX_DESCRIPTION_BYTES = 64
+PREDICT_CHUNK_ROWS = 2048
+
+
+class CategoryClassifier:
+    """
+    Multinomial naive Bayes over hashed character n-grams of bank descriptions.
+
+    Descriptions are packed into a fixed-width byte matrix and the n-gram
+    hashes are rolled over whole columns at once, so both training and
+    prediction stay in NumPy instead of looping over rows in Python.
+    """
+
+    def __init__(
+        self,
+        categories: np.ndarray,
+        log_prior: np.ndarray,
+        log_likelihood: np.ndarray,
+        ngram_sizes: tuple[int, ...] = (2, 3, 4),
+    ) -> None:
+        self.categories = categories
+        self.log_prior = log_prior
+        # Stored feature-major so a row's features gather contiguous class scores
+        self.log_likelihood = log_likelihood
+        self.ngram_sizes = ngram_sizes
+        # Extra all-zero row that masked-out windows point at during prediction
+        self._scores_by_feature = np.vstack(
+            [log_likelihood, np.zeros((1, log_likelihood.shape[1]), np.float32)]
+        )
+
+    @property
+    def n_features(self) -> int:
+        return self.log_likelihood.shape[0]
+
+    @classmethod
+    def fit(
+        cls,
+        descriptions: Sequence[str] | pd.Series,
+        categories: Sequence[str] | pd.Series,
+        n_features: int = 2**16,
+        ngram_sizes: tuple[int, ...] = (2, 3, 4),
+        alpha: float = 0.1,
+    ) -> "CategoryClassifier":
+        labels, class_index = np.unique(
+            np.asarray(categories, dtype=str), return_inverse=True
+        )
+        features, valid = _hash_ngrams(descriptions, n_features, ngram_sizes)
+
+        rows = np.broadcast_to(class_index[:, None], features.shape)[valid]
+        counts = np.bincount(
+            rows * n_features + features[valid], minlength=len(labels) * n_features
+        ).reshape(len(labels), n_features)
+
+        smoothed = counts + alpha
+        log_likelihood = np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        log_prior = np.log(np.bincount(class_index) / len(class_index))
+
+        return cls(
+            categories=labels,
+            log_prior=log_prior.astype(np.float32),
+            log_likelihood=np.ascontiguousarray(log_likelihood.T, dtype=np.float32),
+            ngram_sizes=ngram_sizes,
+        )
+
+    def predict(
+        self, descriptions: Sequence[str] | pd.Series
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Predict a category for every description.
+
+        Returns:
+            Tuple of (categories, confidence), the confidence being the
+            posterior probability of the predicted category
+        """
+        values = np.asarray(descriptions, dtype=object)
+        predictions = np.empty(len(values), dtype=self.categories.dtype)
+        confidence = np.empty(len(values), dtype=np.float32)
+
+        for start in range(0, len(values), PREDICT_CHUNK_ROWS):
+            chunk = values[start : start + PREDICT_CHUNK_ROWS]
+            features, valid = _hash_ngrams(chunk, self.n_features, self.ngram_sizes)
+            features[~valid] = self.n_features
+            scores = self._scores_by_feature[features].sum(axis=1) + self.log_prior
+
+            best = scores.argmax(axis=1)
+            shifted = np.exp(scores - scores[np.arange(len(best)), best][:, None])
+            end = start + len(chunk)
+            predictions[start:end] = self.categories[best]
+            confidence[start:end] = 1 / shifted.sum(axis=1)
+
+        return predictions, confidence
+
+    def save(self, path: str | Path) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "wb") as model_file:
+            np.savez_compressed(
+                model_file,
+                categories=self.categories,
+                log_prior=self.log_prior,
+                log_likelihood=self.log_likelihood,
+                ngram_sizes=np.array(self.ngram_sizes),
+            )
+
+    @classmethod
+    def load(cls, path: str | Path) -> "CategoryClassifier":
+        with np.load(path) as model:
+            return cls(
+                categories=model["categories"],
+                log_prior=model["log_prior"],
+                log_likelihood=model["log_likelihood"],
+                ngram_sizes=tuple(int(n) for n in model["ngram_sizes"]),
+            )
+
+
+def load_category_classifier(
+    path: str | Path = CATEGORY_MODEL_PATH,
+) -> CategoryClassifier | None:
+    """Load the trained classifier, or None when no model has been trained yet."""
+    if not Path(path).exists():
+        return None
+    return CategoryClassifier.load(path)
+
+
+def _hash_ngrams(
+    descriptions: Sequence[str] | pd.Series,
+    n_features: int,
+    ngram_sizes: tuple[int, ...],
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Hash every character n-gram of every description.
+
+    Returns:
+        Tuple of (feature ids, valid mask), both shaped (rows, windows);
+        windows past the end of a shorter description are masked out
+    """
+    padded = pd.Series(np.asarray(descriptions, dtype=object)).fillna("").astype(str)
+    padded = " " + padded.str.upper().str.slice(0, MAX_DESCRIPTION_BYTES - 2) + " "
+    encoded = padded.str.encode("utf-8").str.slice(0, MAX_DESCRIPTION_BYTES)
+    lengths = encoded.str.len().to_numpy()
+    codes = (
+        np.array(encoded.tolist(), dtype=f"S{MAX_DESCRIPTION_BYTES}")
+        .view(np.uint8)
+        .reshape(len(encoded), MAX_DESCRIPTION_BYTES)
+        .astype(np.uint64)
+    )
+
+    features = []
+    valid = []
+    for size in ngram_sizes:
+        windows = MAX_DESCRIPTION_BYTES - size + 1
+        hashes = np.full((len(codes), windows), size, dtype=np.uint64)
+        for offset in range(size):
+            hashes = hashes * HASH_MULTIPLIER + codes[:, offset : offset + windows]
+        features.append((hashes % np.uint64(n_features)).astype(np.intp))
+        valid.append(np.arange(windows) + size <= lengths[:, None])
+
+    return np.concatenate(features, axis=1), np.concatenate(valid, axis=1)
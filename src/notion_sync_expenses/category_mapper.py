@@ -1,69 +1,71 @@
-import re
+import numpy as np
 import pandas as pd
-from enum import StrEnum
 
-
-class CategoryEnum(StrEnum):
-    AMAZON = "Amazon"
-    BEAUTY = "Beauty"
-    HEALTH = "Health"
-    TRANSPORT = "Transport"
-    FOOD = "Food"
-    GAMES = "Games"
-    SUBSCRIPTION = "Subscription"
-    SUPERMARKET = "Supermarket"
-    LEISURE = "Leisure"
-    SERVICE = "Service"
-    HOME = "Home"
-    ELETRONIC = "Electronic"
-    UNASSIGNED = "UNASSIGNED"
+from src.enums import CategoryEnum  # noqa: F401  (imported from here elsewhere)
+from src.envs import CATEGORY_MIN_CONFIDENCE
+from src.notion_sync_expenses.category_classifier import CategoryClassifier
+from src.notion_sync_expenses.category_memory import (
+    CategoryMemory,
+    get_category_memory,
+)
+from src.notion_sync_expenses.category_rules import CategoryRules, get_category_rules
 
 
 class CategoryMapper:
-    def __init__(self) -> None:
-        self.rules = {
-            # Mapeamento direto pelo lançamento
-            "AMAZON": CategoryEnum.AMAZON,
-            "CAMARIM": CategoryEnum.BEAUTY,
-            "RAIADROGASIL": CategoryEnum.HEALTH,
-            "DROGASIL": CategoryEnum.HEALTH,
-            "99 RIDE": CategoryEnum.TRANSPORT,
-            "UBER": CategoryEnum.TRANSPORT,
-            "IFOOD": CategoryEnum.FOOD,
-            "IFD": CategoryEnum.FOOD,
-            "MERCAD": CategoryEnum.SUPERMARKET,
-            "CARREFOUR": CategoryEnum.SUPERMARKET,
-            "SONYPLAYSTATN": CategoryEnum.GAMES,
-            "PLAYSTATION": CategoryEnum.GAMES,
-            "HBOMAX": CategoryEnum.SUBSCRIPTION,
-            "NETFLIX": CategoryEnum.SUBSCRIPTION,
-            "SPOTIFY": CategoryEnum.SUBSCRIPTION,
-            "GOOGLE ONE": CategoryEnum.SUBSCRIPTION,
-            "BRISANET": CategoryEnum.HOME,
-            "CONTA VIVO": CategoryEnum.HOME,
-            "DELL": CategoryEnum.ELETRONIC,
-            "YOUTUBE": CategoryEnum.SUBSCRIPTION,
-            # Categorias genéricas vindas do extrato
-            "RESTAURANTES": CategoryEnum.FOOD,
-            "SUPERMERCADO": CategoryEnum.SUPERMARKET,
-            "DROGARIA": CategoryEnum.HEALTH,
-            "TRANSPORTE": CategoryEnum.TRANSPORT,
-            "ENTRETENIMENTO": CategoryEnum.LEISURE,
-            "PAGAMENTOS": CategoryEnum.SERVICE,
-        }
+    def __init__(
+        self,
+        classifier: CategoryClassifier | None = None,
+        min_confidence: float = CATEGORY_MIN_CONFIDENCE,
+        rules: CategoryRules | None = None,
+        memory: CategoryMemory | None = None,
+    ) -> None:
+        self.classifier = classifier
+        self.min_confidence = min_confidence
+        # One compiled rule set and one memory per process unless a mapper is
+        # given its own
+        self.rules = rules or get_category_rules()
+        self.memory = memory or get_category_memory()
 
-    def add_rule(self, pattern: str, category: str) -> None:
-        self.rules[pattern] = category
+    def add_rule(self, pattern: str, category: str, priority: int = 0) -> None:
+        # Written to the rules file, so it outlives this mapper
+        self.rules.add_rule(pattern, category, priority)
 
     def map_category(self, description: str) -> str | None:
         if not description:
             return None
+        remembered = self.memory.lookup([description])
+        if remembered:
+            return remembered[description]
+        return self.rules.compiled.match(description.upper())
+
+    def map_descriptions(self, descriptions: pd.Series) -> pd.Series:
+        """
+        Map a column of descriptions to categories.
+
+        Categories the user chose for a description before come first; rules
+        run once per distinct description left; descriptions no rule matches
+        fall back to the trained classifier when its confidence is high enough.
+        Unmapped descriptions are left as None.
+        """
+        # The same rules for the whole column, even if the file changes meanwhile
+        rules = self.rules.compiled
+        distinct = descriptions.unique()
+        categories: dict = self.memory.lookup(distinct)
+        for description in distinct:
+            if description not in categories:
+                categories[description] = (
+                    rules.match(description.upper()) if description else None
+                )
+        mapped = descriptions.map(categories).astype(object)
+
+        unmatched = mapped.isna()
+        if self.classifier is not None and unmatched.any():
+            predicted, confidence = self.classifier.predict(descriptions[unmatched])
+            mapped[unmatched] = np.where(
+                confidence >= self.min_confidence, predicted.astype(object), None
+            )
 
-        text = description.upper()
-        for pattern, category in self.rules.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return category
-        return None
+        return mapped
 
     def map_dataframe(
         self,
@@ -71,20 +73,16 @@ class CategoryMapper:
         source_column: str,
         target_column: str,
     ) -> pd.DataFrame:
-        df[target_column] = df.apply(
-            lambda row: self._map_if_none(row, source_column, target_column),
-            axis=1,
+        current = (
+            df[target_column].astype(object)
+            if target_column in df.columns
+            else pd.Series(None, index=df.index, dtype=object)
         )
+        missing = current.isna()
+        if missing.any():
+            current = current.copy()
+            current[missing] = self.map_descriptions(
+                df.loc[missing, source_column].astype(str)
+            )
+        df[target_column] = current
         return df
-
-    def _map_if_none(
-        self,
-        row,
-        source_column: str,
-        target_column: str,
-    ) -> str:
-        current_value = row.get(target_column)
-        if pd.isna(current_value) or current_value is None:
-            mapped = self.map_category(str(row[source_column]))
-            return mapped
-        return current_value
@@ -0,0 +1,187 @@
+import atexit
+import functools
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Mapping
+from pathlib import Path
+
+from src.enums import CategoryEnum
+from src.envs import (
+    CATEGORY_MEMORY_DB,
+    CATEGORY_MEMORY_MAX_AGE_DAYS,
+    CATEGORY_MEMORY_MAX_ENTRIES,
+)
+
+# Lookups mark merchants as used in memory; the marks are written at most this
+# often, and before every `remember` so eviction sees them
+TOUCH_FLUSH_SECONDS = 60
+
+
+class CategoryMemory:
+    """
+    Categories chosen by hand for merchants, remembered across runs.
+
+    Corrections are stored in SQLite keyed by canonical merchant key and
+    mirrored in a dict, so a lookup is a dict hit rather than a rule scan.
+    The dict is reloaded only when another connection has committed, which
+    SQLite's `data_version` tells without reading the table.
+
+    At most `max_entries` merchants are kept. Merchants not seen for
+    `max_age_days` are dropped first, then the least recently seen ones.
+    Lookups never write: when merchants were last seen is kept in memory and
+    written in one transaction by `remember` or a timer.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = CATEGORY_MEMORY_DB,
+        max_entries: int = CATEGORY_MEMORY_MAX_ENTRIES,
+        max_age_days: float = CATEGORY_MEMORY_MAX_AGE_DAYS,
+    ) -> None:
+        if max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_days * 86400
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS corrections (merchant TEXT PRIMARY KEY, "
+            "category TEXT NOT NULL, used_at REAL NOT NULL)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS corrections_used_at ON corrections (used_at)"
+        )
+        self._lock = threading.Lock()
+        self._entries: dict[str, str] = {}
+        self._version: int | None = None
+        self._touched: dict[str, float] = {}
+        self._flush_timer: threading.Timer | None = None
+        with self._lock:
+            self._transaction(self._prune)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._entries)
+
+    def lookup(self, merchants: Iterable[str]) -> dict[str, str]:
+        """Remembered categories of the merchants that have one, marked as used."""
+        with self._lock:
+            self._refresh()
+            found = {
+                merchant: self._entries[merchant]
+                for merchant in merchants
+                if merchant in self._entries
+            }
+            if found:
+                now = time.time()
+                self._touched.update(dict.fromkeys(found, now))
+                if self._flush_timer is None:
+                    self._flush_timer = threading.Timer(TOUCH_FLUSH_SECONDS, self.flush)
+                    self._flush_timer.daemon = True
+                    self._flush_timer.start()
+        return found
+
+    def flush(self) -> None:
+        """Write when the merchants looked up since the last flush were used."""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._touched:
+                self._transaction(self._write_touches)
+                self._touched = {}
+
+    def remember(self, corrections: Mapping[str, object]) -> None:
+        """
+        Remember the category chosen for each merchant.
+
+        A merchant set to UNASSIGNED or left blank is forgotten, so a wrong
+        remembered category can be undone from the same editor.
+        """
+        now = time.time()
+        kept = [
+            (merchant, category, now)
+            for merchant, category in corrections.items()
+            if merchant and _is_category(category)
+        ]
+        forgotten = [
+            (merchant,)
+            for merchant, category in corrections.items()
+            if merchant and not _is_category(category)
+        ]
+
+        def write() -> None:
+            self._write_touches()
+            self._connection.executemany(
+                "INSERT INTO corrections (merchant, category, used_at) "
+                "VALUES (?, ?, ?) ON CONFLICT (merchant) DO UPDATE SET "
+                "category = excluded.category, used_at = excluded.used_at",
+                kept,
+            )
+            self._connection.executemany(
+                "DELETE FROM corrections WHERE merchant = ?", forgotten
+            )
+            self._prune()
+
+        with self._lock:
+            self._transaction(write)
+            self._touched = {}
+            # This connection's own commits don't change its data_version
+            self._version = None
+
+    def _write_touches(self) -> None:
+        # Never moves used_at back, e.g. past another process's newer lookups
+        self._connection.executemany(
+            "UPDATE corrections SET used_at = MAX(used_at, ?) WHERE merchant = ?",
+            [(used_at, merchant) for merchant, used_at in self._touched.items()],
+        )
+
+    def _prune(self) -> None:
+        self._connection.execute(
+            "DELETE FROM corrections WHERE used_at < ?",
+            (time.time() - self.max_age_seconds,),
+        )
+        self._connection.execute(
+            "DELETE FROM corrections WHERE merchant IN (SELECT merchant FROM "
+            "corrections ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def _refresh(self) -> None:
+        (version,) = self._connection.execute("PRAGMA data_version").fetchone()
+        if version != self._version:
+            self._entries = dict(
+                self._connection.execute("SELECT merchant, category FROM corrections")
+            )
+            self._version = version
+
+    def _transaction(self, work) -> None:
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            work()
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+
+
+def _is_category(category: object) -> bool:
+    return (
+        isinstance(category, str)
+        and bool(category.strip())
+        and category != CategoryEnum.UNASSIGNED
+    )
+
+
+@functools.cache
+def get_category_memory() -> CategoryMemory:
+    """Corrections shared by every mapper of this process."""
+    memory = CategoryMemory()
+    atexit.register(memory.flush)
+    return memory
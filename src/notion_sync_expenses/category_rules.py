@@ -0,0 +1,251 @@
+import functools
+import hashlib
+import json
+import os
+import re
+import threading
+import tomllib
+from dataclasses import dataclass
+from pathlib import Path
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from src.enums import CategoryEnum
+from src.envs import CATEGORY_RULES_CACHE_DIR, CATEGORY_RULES_PATH
+
+RULES_VERSION = 1
+# Bump when the compiled form changes, so older cache files are ignored
+COMPILED_VERSION = 1
+RULE_KEYS = {"pattern", "category", "priority"}
+FLAGS = re.IGNORECASE | re.DOTALL
+
+
+@dataclass(frozen=True)
+class CategoryRule:
+    pattern: str
+    category: CategoryEnum
+    priority: int = 0
+
+
+class CompiledRules:
+    """
+    Rules of one version of the rules file, compiled into a single regex.
+
+    Each rule becomes a lookahead alternative of an anchored pattern, in
+    priority order, so one match tries every rule in C and stops at the
+    first that matches anywhere in the text.
+    """
+
+    def __init__(self, digest: str, rules: list[CategoryRule], source: str) -> None:
+        self.digest = digest
+        self.rules = rules
+        self.source = source
+        self._matcher = re.compile(source, FLAGS)
+
+    @classmethod
+    def build(cls, digest: str, rules: list[CategoryRule]) -> "CompiledRules":
+        ordered = sorted(rules, key=lambda rule: -rule.priority)
+        alternatives = "|".join(
+            f"{_lookahead(rule.pattern)}(?P<r{index}>)"
+            for index, rule in enumerate(ordered)
+        )
+        # An empty rules file matches nothing
+        return cls(digest, ordered, f"^(?:{alternatives})" if ordered else "(?!)")
+
+    def match(self, text: str) -> CategoryEnum | None:
+        found = self._matcher.match(text)
+        if found is None:
+            return None
+        return self.rules[int(found.lastgroup[1:])].category
+
+
+def _lookahead(pattern: str) -> str:
+    return f"(?=.*?(?:{pattern}))"
+
+
+def parse_rules(text: str) -> list[CategoryRule]:
+    """Rules of a rules file, in file order; ValueError if any is invalid."""
+    try:
+        config = tomllib.loads(text)
+    except tomllib.TOMLDecodeError as e:
+        raise ValueError(f"Invalid rules file: {e}") from e
+    if config.get("version") != RULES_VERSION:
+        raise ValueError(f"Unsupported rules version {config.get('version')!r}")
+
+    rules = []
+    for number, entry in enumerate(config.get("rules", []), start=1):
+        unknown = set(entry) - RULE_KEYS
+        if unknown:
+            raise ValueError(f"Rule {number} has unknown keys: {sorted(unknown)}")
+        try:
+            # Compiled as it appears in the combined regex, where inline
+            # global flags such as `(?i)` are no longer at the start
+            compiled = re.compile(_lookahead(entry["pattern"]), FLAGS)
+            category = CategoryEnum(entry["category"])
+        except KeyError as e:
+            raise ValueError(f"Rule {number} has no {e.args[0]}") from e
+        except re.error as e:
+            raise ValueError(f"Rule {number} has an invalid pattern: {e}") from e
+        except ValueError as e:
+            raise ValueError(f"Rule {number}: {e}") from e
+        # Each pattern becomes one alternative of a combined regex
+        if compiled.groupindex or re.search(r"\\\d", entry["pattern"]):
+            raise ValueError(
+                f"Rule {number} can't use named groups or numbered backreferences"
+            )
+        priority = entry.get("priority", 0)
+        if not isinstance(priority, int):
+            raise ValueError(f"Rule {number} needs an integer priority")
+        rules.append(CategoryRule(entry["pattern"], category, priority))
+    return rules
+
+
+def load_rules(
+    path: str | Path, cache_dir: str | Path | None = CATEGORY_RULES_CACHE_DIR
+) -> CompiledRules:
+    """
+    Compiled rules of a rules file, reusing the compiled form cached for it.
+
+    Cache files are keyed by the file's content hash, so an edit never reads
+    a stale cache and going back to an earlier version finds its cache again.
+    Python can't store a compiled regex, but the cache skips parsing,
+    validating and ordering the rules.
+    """
+    content = Path(path).read_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    cache_path = (
+        Path(cache_dir) / f"rules-{digest[:32]}.json" if cache_dir is not None else None
+    )
+
+    if cache_path is not None and cache_path.exists():
+        try:
+            cached = json.loads(cache_path.read_text(encoding="utf-8"))
+            if cached["compiled_version"] == COMPILED_VERSION:
+                rules = [
+                    CategoryRule(pattern, CategoryEnum(category), priority)
+                    for pattern, category, priority in cached["rules"]
+                ]
+                return CompiledRules(digest, rules, cached["source"])
+        except (OSError, ValueError, KeyError, TypeError, re.error):
+            pass  # Rebuilt and rewritten below
+
+    compiled = CompiledRules.build(digest, parse_rules(content.decode("utf-8")))
+    if cache_path is not None:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(
+            json.dumps(
+                {
+                    "compiled_version": COMPILED_VERSION,
+                    "rules": [
+                        [rule.pattern, rule.category.value, rule.priority]
+                        for rule in compiled.rules
+                    ],
+                    "source": compiled.source,
+                }
+            ),
+            encoding="utf-8",
+        )
+        temp_path.replace(cache_path)
+    return compiled
+
+
+class CategoryRules:
+    """
+    The current rules of a rules file, swapped for new ones when it changes.
+
+    Readers take `compiled` once per batch; a reload replaces it with a
+    single assignment, so a batch never sees half of an edit. An invalid
+    edit is reported and the rules in use are kept.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = CATEGORY_RULES_PATH,
+        cache_dir: str | Path | None = CATEGORY_RULES_CACHE_DIR,
+    ) -> None:
+        self.path = Path(path)
+        self.cache_dir = cache_dir
+        self.compiled = load_rules(self.path, cache_dir)
+        self._lock = threading.Lock()
+        self._observer: Observer | None = None
+
+    def reload(self) -> bool:
+        """Load the file again; False if it's unreadable or invalid."""
+        with self._lock:
+            try:
+                compiled = load_rules(self.path, self.cache_dir)
+            except (OSError, ValueError, re.error) as e:
+                print(f"Keeping the current category rules, {self.path} failed: {e}")
+                return False
+            if compiled.digest != self.compiled.digest:
+                self.compiled = compiled
+            return True
+
+    def add_rule(
+        self, pattern: str, category: CategoryEnum | str, priority: int = 0
+    ) -> None:
+        """
+        Append a rule to the rules file and load it; ValueError if invalid.
+
+        The rule is tried after every rule of a higher or equal priority
+        already in the file. Every mapper sharing these rules sees it, and
+        so do other processes watching the file.
+        """
+        # TOML basic strings share JSON's escapes
+        entry = (
+            f"\n[[rules]]\npattern = {json.dumps(pattern, ensure_ascii=False)}\n"
+            f"category = {json.dumps(CategoryEnum(category).value)}\n"
+            f"priority = {priority}\n"
+        )
+        with self._lock:
+            text = self.path.read_text(encoding="utf-8")
+            if text and not text.endswith("\n"):
+                text += "\n"
+            text += entry
+            parse_rules(text)
+            temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            temp_path.write_text(text, encoding="utf-8")
+            temp_path.replace(self.path)
+        self.reload()
+
+    def watch(self) -> None:
+        """Reload on every change to the file, from a watchdog thread."""
+        if self._observer is not None:
+            return
+        observer = Observer()
+        # Editors often save by replacing the file, so its directory is watched
+        observer.schedule(
+            _RulesFileHandler(self), str(self.path.resolve().parent), recursive=False
+        )
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+
+class _RulesFileHandler(FileSystemEventHandler):
+    def __init__(self, rules: CategoryRules) -> None:
+        self.rules = rules
+        self.target = rules.path.resolve()
+
+    def on_any_event(self, event: FileSystemEvent) -> None:
+        if event.event_type not in ("created", "modified", "moved"):
+            return
+        paths = (event.src_path, getattr(event, "dest_path", ""))
+        if any(path and Path(os.fsdecode(path)) == self.target for path in paths):
+            self.rules.reload()
+
+
+@functools.cache
+def get_category_rules() -> CategoryRules:
+    """Rules shared by every mapper of this process, kept in step with the file."""
+    rules = CategoryRules()
+    rules.watch()
+    return rules
@@ -0,0 +1,31 @@
+from collections.abc import Iterable
+from pathlib import Path
+
+
+class Checkpoint:
+    """
+    Append-only record of the work items already completed.
+
+    Results arrive out of order from the concurrent sender, so the checkpoint
+    stores each finished key on its own line instead of a single offset.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+
+    def load(self) -> set[str]:
+        return set(self.read())
+
+    def read(self) -> list[str]:
+        if not self.path.exists():
+            return []
+        with self.path.open(encoding="utf-8") as checkpoint:
+            return [line.strip() for line in checkpoint if line.strip()]
+
+    def mark(self, key: object) -> None:
+        self.mark_many([key])
+
+    def mark_many(self, keys: Iterable[object]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as checkpoint:
+            checkpoint.writelines(f"{key}\n" for key in keys)
@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+
+import pandas as pd
+
+from src.notion_sync_expenses.expense_store import ExpenseStore
+
+REPORT_DIMENSIONS = ("category", "payment", "type")
+REPORT_COLUMNS = ["month", "merchant", "amount_cents", *REPORT_DIMENSIONS]
+BLANK = "(blank)"
+
+
+@dataclass
+class ExpenseReport:
+    """Aggregates of the local expense store; every amount is in cents."""
+
+    totals: pd.DataFrame
+    top_merchants: pd.DataFrame
+    essential: pd.DataFrame
+
+
+def monthly_totals(expenses: pd.DataFrame, by: str = "category") -> pd.DataFrame:
+    """Month × `by` totals, one row per month and one column per value."""
+    if expenses.empty:
+        return pd.DataFrame(dtype="int64")
+    return (
+        expenses.groupby(["month", expenses[by].fillna(BLANK)], observed=True)[
+            "amount_cents"
+        ]
+        .sum()
+        .unstack(fill_value=0)
+        .astype("int64")
+    )
+
+
+def top_merchants(expenses: pd.DataFrame, limit: int = 10) -> pd.DataFrame:
+    """The merchants with the largest totals, whatever their sign."""
+    if expenses.empty:
+        return pd.DataFrame(columns=["expenses", "total_cents"])
+    merchants = expenses.groupby(expenses["merchant"].fillna(BLANK)).agg(
+        expenses=("amount_cents", "size"), total_cents=("amount_cents", "sum")
+    )
+    largest = merchants["total_cents"].abs().nlargest(limit).index
+    return merchants.loc[largest]
+
+
+def build_report(
+    store: ExpenseStore,
+    start: str | None = None,
+    end: str | None = None,
+    by: str = "category",
+    limit: int = 10,
+) -> ExpenseReport:
+    """Report on the stored expenses of months `start` to `end` (YYYY-MM)."""
+    if by not in REPORT_DIMENSIONS:
+        raise ValueError(f"Can't total by {by}; use one of {REPORT_DIMENSIONS}")
+
+    expenses = store.load(start, end, columns=REPORT_COLUMNS)
+    return ExpenseReport(
+        totals=monthly_totals(expenses, by),
+        top_merchants=top_merchants(expenses, limit),
+        essential=monthly_totals(expenses, "type"),
+    )
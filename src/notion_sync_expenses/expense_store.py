@@ -0,0 +1,292 @@
+import os
+import shutil
+import uuid
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.envs import EXPENSE_STORE_DIR
+from src.money import parse_brl
+from src.notion_gateway import pages_to_frame
+from src.notion_sync_expenses.merchant_canonicalizer import MerchantCanonicalizer
+from src.notion_sync_expenses.summary import MonthlySummary, summary_deltas
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+except ImportError:  # optional: install the `arrow` extra
+    pyarrow = None
+
+PARTITION = "month"
+PARTITION_FILE = "expenses.parquet"
+COLUMNS = [
+    "page_id",
+    "date",
+    "description",
+    "merchant",
+    "category",
+    "amount_cents",
+    "payment",
+    "type",
+    "source",
+]
+# Notion property holding each text column of the store
+PROPERTIES = {
+    "description": "Bank Description",
+    "category": "Category",
+    "payment": "Payment",
+    "type": "Type",
+    "source": "SOURCE",
+}
+
+
+class ExpenseStore:
+    """
+    Local copy of the expenses in Notion, for reports that need no API calls.
+
+    A Parquet dataset partitioned by month (`month=YYYY-MM/expenses.parquet`),
+    keyed by page id. Writes rewrite only the months they touch, each file
+    replaced atomically, and reads of a month range skip the other partitions.
+    """
+
+    def __init__(self, path: str | Path = EXPENSE_STORE_DIR) -> None:
+        self.path = Path(path)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether Parquet can be written here; it needs the `arrow` extra."""
+        return pyarrow is not None
+
+    def months(self) -> list[str]:
+        """Months with stored expenses, oldest first."""
+        if not self.path.is_dir():
+            return []
+        return sorted(
+            part.name.split("=", 1)[1]
+            for part in self.path.glob(f"{PARTITION}=*")
+            if (part / PARTITION_FILE).exists()
+        )
+
+    def version(self) -> float:
+        """Changes whenever the store is written; a cache key for its readers."""
+        files = self.path.glob(f"{PARTITION}=*/{PARTITION_FILE}")
+        return max((file.stat().st_mtime for file in files), default=0.0)
+
+    def load(
+        self,
+        start: str | None = None,
+        end: str | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Expenses from month `start` to `end` (YYYY-MM, inclusive)."""
+        self._require_parquet()
+        months = [
+            month
+            for month in self.months()
+            if (start is None or month >= start) and (end is None or month <= end)
+        ]
+        if not months:
+            return _empty(columns)
+
+        filters = [(PARTITION, "in", months)]
+        df = pd.read_parquet(self.path, columns=columns, filters=filters)
+        if PARTITION in df.columns:
+            df[PARTITION] = df[PARTITION].astype(str)
+        return df.reset_index(drop=True)
+
+    def upsert(self, expenses: pd.DataFrame) -> int:
+        """
+        Add or replace expenses by page id.
+
+        A page whose date moved to another month is dropped from its old
+        partition. Returns the number of expenses written.
+        """
+        self._require_parquet()
+        if expenses.empty:
+            return 0
+        expenses = expenses.drop_duplicates("page_id", keep="last")
+        # Stored copies of these pages, wherever their month was before
+        replaced = self.stored(expenses["page_id"], columns=["page_id", PARTITION])
+        replaced_by_month = dict(tuple(replaced.groupby(PARTITION)["page_id"]))
+        added_by_month = dict(tuple(expenses.groupby(_month_keys(expenses["date"]))))
+
+        for month in sorted(set(added_by_month) | set(replaced_by_month)):
+            current = self._read_partition(month)
+            if month in replaced_by_month:
+                current = current[~current["page_id"].isin(replaced_by_month[month])]
+            self._write_partition(
+                month, pd.concat([current, added_by_month.get(month)])
+            )
+        return len(expenses)
+
+    def replace(self, expenses: pd.DataFrame) -> int:
+        """Replace the whole store with `expenses`, e.g. a full Notion export."""
+        self._require_parquet()
+        staging = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex[:8]}")
+        ExpenseStore(staging).upsert(expenses)
+        staging.mkdir(parents=True, exist_ok=True)
+
+        if self.path.exists():
+            retired = staging.with_name(f"{staging.name}.old")
+            self.path.rename(retired)
+            staging.rename(self.path)
+            shutil.rmtree(retired)
+        else:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            staging.rename(self.path)
+        return len(expenses)
+
+    def remove(self, page_ids: Iterable[str]) -> int:
+        """Drop the expenses of archived pages. Returns how many were stored."""
+        self._require_parquet()
+        stored = self.stored(page_ids, columns=["page_id", PARTITION])
+        removed = 0
+        for month, ids in stored.groupby(PARTITION)["page_id"]:
+            current = self._read_partition(month)
+            kept = current[~current["page_id"].isin(ids)]
+            removed += len(current) - len(kept)
+            self._write_partition(month, kept)
+        return removed
+
+    def stored(
+        self, page_ids: Iterable[str], columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        """The stored rows of those of `page_ids` the store has."""
+        self._require_parquet()
+        page_ids = list(page_ids)
+        columns = columns or COLUMNS
+        if not page_ids or not self.months():
+            return _empty(columns)
+        stored = pd.read_parquet(
+            self.path, columns=columns, filters=[("page_id", "in", page_ids)]
+        )
+        if PARTITION in stored.columns:
+            stored[PARTITION] = stored[PARTITION].astype(str)
+        return stored.reset_index(drop=True)
+
+    def _partition_path(self, month: str) -> Path:
+        return self.path / f"{PARTITION}={month}" / PARTITION_FILE
+
+    def _read_partition(self, month: str) -> pd.DataFrame:
+        path = self._partition_path(month)
+        if not path.exists():
+            return _empty(COLUMNS)
+        return pd.read_parquet(path)
+
+    def _write_partition(self, month: str, expenses: pd.DataFrame) -> None:
+        path = self._partition_path(month)
+        if expenses.empty:
+            if path.exists():
+                path.unlink()
+                path.parent.rmdir()
+            return
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        expenses[COLUMNS].sort_values(["date", "page_id"]).to_parquet(
+            temp_path, index=False, compression="zstd"
+        )
+        os.replace(temp_path, path)
+
+    def _require_parquet(self) -> None:
+        if pyarrow is None:
+            raise ImportError(
+                "The expense store needs pyarrow; install the `arrow` extra"
+            )
+
+
+def expense_records(
+    values: pd.DataFrame, canonicalizer: MerchantCanonicalizer
+) -> pd.DataFrame:
+    """
+    Store rows for Notion property values indexed by page id.
+
+    `values` is what `get_database_all` and `pages_to_frame` return. Pages
+    without a valid date or value can't be reported on and are left out.
+    """
+    # Date-time properties keep the day they were entered on, whatever the zone
+    dates = pd.to_datetime(
+        _property(values, "Date").astype("string").str.slice(0, 10),
+        format="%Y-%m-%d",
+        errors="coerce",
+    )
+    amounts = parse_brl(_property(values, "Value"))
+    keep = (dates.notna() & ~amounts.invalid).to_numpy()
+
+    descriptions = _property(values, "Bank Description").astype("string")
+    records = pd.DataFrame(
+        {
+            "page_id": values.index.astype(str),
+            "date": dates,
+            "merchant": canonicalizer.canonicalize_series(descriptions),
+            "amount_cents": amounts.cents,
+            **{
+                column: _property(values, name).astype("string")
+                for column, name in PROPERTIES.items()
+            },
+        },
+        index=values.index,
+    )
+    return records.loc[keep, COLUMNS].reset_index(drop=True)
+
+
+def record_pages(
+    store: ExpenseStore,
+    pages: Iterable[dict[str, Any]],
+    canonicalizer: MerchantCanonicalizer,
+    summary: MonthlySummary | None = None,
+) -> int:
+    """
+    Keep the store in step with page objects Notion returned for a write.
+
+    With a `summary`, the totals are moved by what the write changed: the
+    stored copies of the pages are what the totals counted before. The deltas
+    commit together with the store write, then the summary pages are pushed.
+    """
+    if not store.enabled:
+        return 0
+    records = expense_records(pages_to_frame(pages), canonicalizer)
+    if summary is None:
+        return store.upsert(records)
+    before = store.stored(records["page_id"])
+    with summary.recording(summary_deltas(before, records)):
+        written = store.upsert(records)
+    summary.push()
+    return written
+
+
+def remove_pages(
+    store: ExpenseStore,
+    page_ids: Iterable[str],
+    summary: MonthlySummary | None = None,
+) -> int:
+    """Drop archived pages from the store, and from the totals of a `summary`."""
+    if not store.enabled:
+        return 0
+    page_ids = list(page_ids)
+    if summary is None:
+        return store.remove(page_ids)
+    before = store.stored(page_ids)
+    with summary.recording(summary_deltas(before, _empty(COLUMNS))):
+        removed = store.remove(page_ids)
+    summary.push()
+    return removed
+
+
+def _month_keys(dates: pd.Series) -> pd.Series:
+    """YYYY-MM of each date, formatting each distinct month once."""
+    codes, months = pd.factorize(dates.dt.year * 100 + dates.dt.month)
+    labels = np.array([f"{month // 100:04d}-{month % 100:02d}" for month in months])
+    return pd.Series(labels[codes], index=dates.index)
+
+
+def _property(values: pd.DataFrame, name: str) -> pd.Series:
+    if name in values.columns:
+        return values[name]
+    return pd.Series(None, index=values.index, dtype=object)
+
+
+def _empty(columns: list[str] | None) -> pd.DataFrame:
+    return pd.DataFrame(columns=columns or COLUMNS)
@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+import pandas as pd
+
+from src.envs import MERCHANT_CACHE_PATH
+
+# Payment processors whose prefix tells us something about the merchant
+PROCESSOR_ALIASES = {"IFD": "IFOOD"}
+
+NOISE_PATTERNS = [
+    # Installments: "PARCELA 2/10", "PARC 02 DE 10"
+    re.compile(r"\bPARC(?:ELA)?\.?\s*\d+\s*(?:/|DE)\s*\d+\b"),
+    # Payment processor prefixes: "PG *LOJA", "MP*LOJA", "EC *LOJA"
+    re.compile(
+        r"^(?:PG|MP|PAG|PAGSEGURO|MERCADOPAGO|EC|EBN|DL|HTM|PAYPAL|SUMUP|STONE)"
+        r"\s*\*\s*"
+    ),
+    # Statement transaction types joined by _parse_bank_account_statement
+    re.compile(
+        r"^(?:PIX (?:ENVIADO|RECEBIDO)|COMPRA (?:NO )?DEBITO|PAGAMENTO EFETUADO"
+        r"|TRANSFERENCIA (?:ENVIADA|RECEBIDA)|DEBITO AUTOMATICO)\s+-\s+"
+    ),
+    # Order ids, terminal numbers and other long digit runs
+    re.compile(r"[#*]?\b\d{4,}\b"),
+    # Trailing city and country: "... SAO PAULO BR", "... FORTALEZA BRA"
+    re.compile(
+        r"\s+(?:SAO PAULO|RIO DE JANEIRO|BELO HORIZONTE|FORTALEZA|SALVADOR"
+        r"|BRASILIA|CURITIBA|RECIFE|PORTO ALEGRE|MANAUS|BELEM|GOIANIA|CAMPINAS"
+        r"|OSASCO|BARUERI|SAO LUIS|NATAL|TERESINA|JOAO PESSOA|MACEIO|ARACAJU"
+        r"|FLORIANOPOLIS|VITORIA|CUIABA|CAMPO GRANDE)(?:\s+[A-Z]{2})?(?:\s+BRA?)?$"
+    ),
+]
+PROCESSOR_PREFIX = re.compile(r"^([A-Z]{2,4})\s*\*\s*")
+WHITESPACE = re.compile(r"\s+")
+
+# Persisted caches are dropped whenever the patterns above change
+PATTERNS_VERSION = hashlib.sha256(
+    json.dumps(
+        [pattern.pattern for pattern in NOISE_PATTERNS] + sorted(PROCESSOR_ALIASES)
+    ).encode()
+).hexdigest()[:12]
+
+
+class MerchantCanonicalizer:
+    """
+    Map raw bank descriptions to canonical merchant keys.
+
+    Results are memoized in a bounded LRU that is saved to disk, so recurring
+    merchants are canonicalized once across runs.
+    """
+
+    def __init__(
+        self,
+        cache_path: str | Path | None = MERCHANT_CACHE_PATH,
+        max_entries: int = 50_000,
+    ) -> None:
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_entries = max_entries
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def canonicalize(self, description: str) -> str:
+        with self._lock:
+            if description in self._cache:
+                self._cache.move_to_end(description)
+                return self._cache[description]
+
+        key = _canonical_key(description)
+
+        with self._lock:
+            self._cache[description] = key
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return key
+
+    def canonicalize_series(self, descriptions: pd.Series) -> pd.Series:
+        """Canonicalize a column, computing each distinct description once."""
+        keys = {
+            description: self.canonicalize(description)
+            for description in descriptions.fillna("").astype(str).unique()
+        }
+        return descriptions.fillna("").astype(str).map(keys)
+
+    def save(self) -> None:
+        if self.cache_path is None:
+            return
+        with self._lock:
+            entries = list(self._cache.items())
+
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        # Parsing workers of the scheduler save concurrently; each writes its own
+        temp_path = self.cache_path.with_name(
+            f"{self.cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        temp_path.write_text(
+            json.dumps({"version": PATTERNS_VERSION, "entries": entries}),
+            encoding="utf-8",
+        )
+        temp_path.replace(self.cache_path)
+
+    def _load(self) -> None:
+        if self.cache_path is None or not self.cache_path.exists():
+            return
+        try:
+            data = json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") == PATTERNS_VERSION:
+            self._cache.update(data["entries"][-self.max_entries :])
+
+
+def _canonical_key(description: str) -> str:
+    text = unicodedata.normalize("NFKD", description)
+    text = text.encode("ASCII", "ignore").decode("ASCII").upper()
+    text = WHITESPACE.sub(" ", text).strip()
+
+    processor = PROCESSOR_PREFIX.match(text)
+    if processor and processor.group(1) in PROCESSOR_ALIASES:
+        text = f"{PROCESSOR_ALIASES[processor.group(1)]} {text[processor.end():]}"
+
+    for pattern in NOISE_PATTERNS:
+        text = pattern.sub(" ", text).strip()
+
+    return WHITESPACE.sub(" ", text).strip(" -*") or description.strip().upper()
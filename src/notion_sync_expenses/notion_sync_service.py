@@ -1,45 +1,512 @@
+import contextlib
+from collections.abc import Callable, Iterable
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
 from src.adapters.adapter_factory import AdapterFactory
+from src.adapters.inter_statement_adapter import InterStatementAdapter
 from src.adapters.notion_adapter import NotionAdapter
 from src.enums import PaymentTypeEnum
-from src.envs import FINANCE_DASHBOARD_ID, MONTHLY_INVOICE_FILENAME, INVOICE_BANK
-from src.notion_gateway import NotionAPIGateway
+from src.envs import (
+    CATEGORY_MODEL_PATH,
+    FINANCE_DASHBOARD_ID,
+    MONTHLY_INVOICE_FILENAME,
+    INVOICE_BANK,
+    SUMMARY_DATABASE_ID,
+    SYNC_STATE_DIR,
+)
+from src.notion_gateway import NotionAPIGateway, NotionPayload, get_shared_gateway
+from src.notion_sync_expenses.category_classifier import (
+    CategoryClassifier,
+    load_category_classifier,
+)
 from src.notion_sync_expenses.category_mapper import CategoryEnum, CategoryMapper
+from src.notion_sync_expenses.checkpoint import Checkpoint
+from src.notion_sync_expenses.expense_store import (
+    ExpenseStore,
+    expense_records,
+    record_pages,
+    remove_pages,
+)
+from src.notion_sync_expenses.merchant_canonicalizer import MerchantCanonicalizer
+from src.notion_sync_expenses.payload_spool import (
+    read_spool,
+    read_spool_header,
+    spool_checkpoint,
+    write_spool,
+)
+from src.notion_sync_expenses.reconciliation import drop_cross_source_duplicates
+from src.notion_sync_expenses.snapshot import (
+    RESTORABLE_TYPES,
+    read_snapshot,
+    read_snapshot_header,
+    restore_payload,
+    snapshot_checkpoint,
+    write_snapshot,
+)
+from src.notion_sync_expenses.summary import MonthlySummary, SummaryReport
+from src.notion_sync_expenses.sync_runs import SyncRun, new_run_id
+from src.notion_sync_expenses.upsert import date_range_filter, plan_upsert
+
+# Pages created by a drain or restore are added to the expense store in batches this size
+STORE_BATCH_SIZE = 1000
+
+
+def untraced_stage(name: str) -> AbstractContextManager[None]:
+    return contextlib.nullcontext()
+
+
+@dataclass
+class DrainReport:
+    run_id: str
+    sent: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class UpsertReport:
+    run_id: str
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    failed: int = 0
+
+
+@dataclass
+class RollbackReport:
+    archived: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class RestoreReport:
+    run_id: str
+    restored: int = 0
+    failed: int = 0
+    skipped: int = 0
+
+
+@dataclass
+class StoreReport:
+    expenses: int
+    months: int
+
+
+@dataclass
+class TrainingReport:
+    rows: int
+    categories: list[str]
 
 
 class NotionSyncService:
-    def __init__(self):
-        self.gateway = NotionAPIGateway()
-        self.category_mapper = CategoryMapper()
-        self.invoice_adapter = AdapterFactory.create_adapter("INTER")
+    def __init__(
+        self,
+        statement_path: str | None = None,
+        *,
+        invoice_path: str = "fatura.csv",
+        bank: str = "INTER",
+        database_id: str = FINANCE_DASHBOARD_ID,
+        gateway: NotionAPIGateway | None = None,
+        expense_store: ExpenseStore | None = None,
+        summary_database_id: str | None = None,
+        state_dir: str | Path = SYNC_STATE_DIR,
+    ):
+        self.statement_path = statement_path
+        self.invoice_path = invoice_path
+        self.database_id = database_id
+        self.state_dir = Path(state_dir)
+        self._gateway = gateway
+        # SUMMARY_DATABASE_ID summarizes the finance dashboard only
+        self.summary_database_id = summary_database_id or (
+            SUMMARY_DATABASE_ID if database_id == FINANCE_DASHBOARD_ID else None
+        )
+        self._summary: MonthlySummary | None = None
+        self.merchant_canonicalizer = MerchantCanonicalizer()
+        self.category_mapper = CategoryMapper(classifier=load_category_classifier())
+        self.invoice_adapter = AdapterFactory.create_adapter(bank)
+        self.statement_adapter = InterStatementAdapter()
         self.notion_adapter = NotionAdapter()
+        self.expense_store = expense_store or ExpenseStore()
+        # Wraps each step of building payloads; `profile` traces them with this
+        self.stage: Callable[[str], AbstractContextManager[None]] = untraced_stage
+
+    @property
+    def gateway(self) -> NotionAPIGateway:
+        # Created on first use, so parsing-only services open no connections
+        if self._gateway is None:
+            self._gateway = get_shared_gateway()
+        return self._gateway
+
+    @property
+    def summary(self) -> MonthlySummary | None:
+        """The summary database kept in step with writes, if one is configured."""
+        if self._summary is None and self.summary_database_id:
+            self._summary = MonthlySummary(self.gateway, self.summary_database_id)
+        return self._summary
+
+    def build_payloads(self, run_id: str | None = None) -> list[NotionPayload]:
+        with self.stage("read_invoice"):
+            standardized_df = self.invoice_adapter.read_invoice(
+                self.invoice_path
+            ).assign(payment=PaymentTypeEnum.CREDIT_CARD.value)
 
-    def sync_expenses(self) -> None:
-        standardized_df = self.invoice_adapter.read_invoice("fatura.csv")
+        if self.statement_path:
+            standardized_df = self._merge_account_statement(standardized_df)
 
+        return self.payloads_from_frame(standardized_df, run_id=run_id)
+
+    def payloads_from_frame(
+        self,
+        standardized_df: pd.DataFrame,
+        run_id: str | None = None,
+        database_id: str | None = None,
+    ) -> list[NotionPayload]:
+        """
+        Categorise standardized rows with a `payment` column into page payloads.
+
+        Rows keep their order within each payment type. Pages go to the
+        service's database unless another `database_id` is given.
+        """
+        standardized_df = standardized_df.copy()
         # TODO: adapt category from column description or category.
 
-        df = self.category_mapper.map_dataframe(
-            df=standardized_df,
-            source_column="description",
-            target_column="category",
-        )
+        with self.stage("canonicalize"):
+            standardized_df["merchant"] = (
+                self.merchant_canonicalizer.canonicalize_series(
+                    standardized_df["description"]
+                )
+            )
+            self.merchant_canonicalizer.save()
+
+        with self.stage("map_dataframe"):
+            df = self.category_mapper.map_dataframe(
+                df=standardized_df,
+                source_column="merchant",
+                target_column="category",
+            )
 
         df["category"] = df["category"].fillna(CategoryEnum.UNASSIGNED)
 
-        expense_rows = self.notion_adapter.convert_to_notion_format(
-            df, payment_type=PaymentTypeEnum.CREDIT_CARD
-        )
+        expense_rows = []
+        with self.stage("convert_to_notion_format"):
+            for payment, group in df.groupby("payment", sort=False):
+                expense_rows.extend(
+                    self.notion_adapter.convert_to_notion_format(
+                        group, payment_type=PaymentTypeEnum(payment)
+                    )
+                )
+        for expense_row in expense_rows:
+            expense_row.run_id = run_id
+
+        with self.stage("build_payload"):
+            return [
+                NotionAPIGateway.build_payload(
+                    database_id=database_id or self.database_id,
+                    expense=expense_row,
+                )
+                for expense_row in expense_rows
+            ]
+
+    def _merge_account_statement(self, invoice_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add account statement rows, dropping the ones the card invoice already has.
 
-        payloads = [
-            NotionAPIGateway.build_payload(
-                database_id=FINANCE_DASHBOARD_ID,
-                expense=expense_row,
+        Card bill payments and some transfers show up in both files; the
+        invoice row is kept because it carries the merchant detail.
+        """
+        with self.stage("read_invoice"):
+            statement_df = self.statement_adapter.read_invoice(
+                self.statement_path
+            ).assign(payment=PaymentTypeEnum.PIX.value)
+        with self.stage("reconcile"):
+            combined = pd.concat([invoice_df, statement_df], ignore_index=True)
+            reconciled = drop_cross_source_duplicates(
+                combined,
+                source_column="payment",
+                keep=PaymentTypeEnum.CREDIT_CARD.value,
             )
-            for expense_row in expense_rows
-        ]
+        print(
+            f"Dropped {len(combined) - len(reconciled)} statement rows "
+            "already present in the invoice"
+        )
+        return reconciled
+
+    def sync_expenses(self, spool_path: str | None = None) -> None:
+        run_id = new_run_id()
+        payloads = self.build_payloads(run_id=run_id)
+
+        if spool_path:
+            count = write_spool(spool_path, payloads, metadata={"run_id": run_id})
+            print(f"Spooled {count} payloads to {spool_path} (run {run_id})")
+            return
 
         for payload in payloads:
             print(payload)
             print("-" * 200)
 
         # self.gateway.send_payloads(payloads)
+
+    def drain_spool(self, spool_path: str, max_workers: int) -> DrainReport:
+        """
+        Send every payload of a spool file that isn't checkpointed yet.
+
+        Successful sends are checkpointed as they complete, so an interrupted
+        drain resumes where it stopped and failed payloads are retried on the
+        next drain.
+        """
+        run = SyncRun(
+            read_spool_header(spool_path).get("run_id") or new_run_id(), self.state_dir
+        )
+        checkpoint = spool_checkpoint(spool_path)
+        done = checkpoint.load()
+        report = DrainReport(run_id=run.run_id, skipped=len(done))
+
+        pending = (
+            (index, payload)
+            for index, payload in read_spool(spool_path)
+            if str(index) not in done
+        )
+        return self.send_checkpointed(pending, run, checkpoint, max_workers, report)
+
+    def send_checkpointed(
+        self,
+        payloads: Iterable[tuple[Any, NotionPayload]],
+        run: SyncRun,
+        checkpoint: Checkpoint,
+        max_workers: int,
+        report: DrainReport,
+    ) -> DrainReport:
+        """
+        Create pages for `(key, payload)` pairs, adding the results to `report`.
+
+        Each key is checkpointed once its page exists and the page is recorded
+        under the run, so callers resume by leaving checkpointed keys out.
+        """
+        created = []
+        for result in self.gateway.create_pages(payloads, max_workers=max_workers):
+            if result.ok:
+                run.pages.mark(result.response["id"])
+                checkpoint.mark(result.key)
+                created.append(result.response)
+                report.sent += 1
+            else:
+                report.failed += 1
+                print(f"[{result.key}] Failed to send: {result.error}")
+
+            if len(created) >= STORE_BATCH_SIZE:
+                self._record_pages(created)
+                created = []
+
+        self._record_pages(created)
+        return report
+
+    def upsert_expenses(self, max_workers: int) -> UpsertReport:
+        """
+        Create new expenses and update only the changed properties of existing ones.
+
+        Existing pages are read once, restricted to the date range of the
+        statement, so unchanged rows cost no write requests. Only created pages
+        are recorded under the run id; updates can't be undone by a rollback.
+        """
+        run = SyncRun(new_run_id(), self.state_dir)
+        payloads = self.build_payloads(run_id=run.run_id)
+        pages = list(
+            self.gateway.iter_database_pages(
+                self.database_id, filter=date_range_filter(payloads)
+            )
+        )
+        plan = plan_upsert(payloads, pages)
+        # Pages were read anyway; the writes below overwrite the changed ones
+        self._record_pages(pages)
+        report = UpsertReport(run_id=run.run_id, unchanged=plan.unchanged)
+
+        updates = self.gateway.map_concurrently(
+            lambda update: self.gateway.update_page(*update),
+            ((page_id, (page_id, properties)) for page_id, properties in plan.updates),
+            max_workers=max_workers,
+        )
+        creates = self.gateway.create_pages(
+            enumerate(plan.creates), max_workers=max_workers
+        )
+
+        written = []
+        for result in updates:
+            if result.ok:
+                written.append(result.response)
+                report.updated += 1
+            else:
+                report.failed += 1
+                print(f"[{result.key}] Failed to update: {result.error}")
+
+        for result in creates:
+            if result.ok:
+                run.pages.mark(result.response["id"])
+                written.append(result.response)
+                report.created += 1
+            else:
+                report.failed += 1
+                print(f"[{result.key}] Failed to create: {result.error}")
+
+        self._record_pages(written)
+        return report
+
+    def rollback_run(self, run_id: str, max_workers: int) -> RollbackReport:
+        """Archive every page created by a sync run, resuming a previous rollback."""
+        run = SyncRun(run_id, self.state_dir)
+        if not run.exists():
+            raise ValueError(f"No pages recorded for run {run_id}")
+
+        archived = run.archived.load()
+        report = RollbackReport(skipped=len(archived))
+        pending = (
+            (page_id, page_id)
+            for page_id in dict.fromkeys(run.pages.read())
+            if page_id not in archived
+        )
+
+        archived_now = []
+        for result in self.gateway.map_concurrently(
+            self.gateway.archive_page, pending, max_workers=max_workers
+        ):
+            if result.ok:
+                run.archived.mark(result.key)
+                archived_now.append(result.key)
+                report.archived += 1
+            else:
+                report.failed += 1
+                print(f"[{result.key}] Failed to archive: {result.error}")
+
+        remove_pages(self.expense_store, archived_now, self.summary)
+        return report
+
+    def train_category_classifier(self) -> TrainingReport:
+        """Train the category classifier on pages already categorised in Notion."""
+        history = self.gateway.get_database_all(self.database_id)
+        # The whole database was read, so the local store can be rebuilt too
+        if self.expense_store.enabled:
+            self.expense_store.replace(
+                expense_records(history, self.merchant_canonicalizer)
+            )
+        labelled = history.dropna(subset=["Bank Description", "Category"])
+        labelled = labelled[labelled["Category"] != CategoryEnum.UNASSIGNED]
+        if labelled.empty:
+            raise ValueError("No categorised expenses found to train on")
+
+        classifier = CategoryClassifier.fit(
+            self.merchant_canonicalizer.canonicalize_series(
+                labelled["Bank Description"]
+            ),
+            labelled["Category"],
+        )
+        self.merchant_canonicalizer.save()
+        classifier.save(CATEGORY_MODEL_PATH)
+        self.category_mapper.classifier = classifier
+
+        return TrainingReport(
+            rows=len(labelled), categories=classifier.categories.tolist()
+        )
+
+    def snapshot_database(self, path: str, database_id: str) -> int:
+        """Back up every page of a database into a snapshot file; returns the count."""
+        database = self.gateway.get_database(database_id)
+        return write_snapshot(
+            path, database, self.gateway.iter_database_pages(database_id)
+        )
+
+    def restore_snapshot(
+        self, path: str, database_id: str, max_workers: int, force: bool = False
+    ) -> RestoreReport:
+        """
+        Recreate the pages of a snapshot in an empty database.
+
+        Restored pages are checkpointed by their original page id as they
+        complete, so an interrupted restore resumes without duplicating pages,
+        and recorded under a run id so a bad restore can be rolled back.
+        """
+        header = read_snapshot_header(path)
+        property_types = header["properties"]
+        target = self.gateway.get_database(database_id)["properties"]
+        missing = [
+            name
+            for name, kind in property_types.items()
+            if kind in RESTORABLE_TYPES and target.get(name, {}).get("type") != kind
+        ]
+        if missing:
+            raise ValueError(
+                f"Database {database_id} lacks properties of the snapshot: "
+                + ", ".join(missing)
+            )
+
+        checkpoint = snapshot_checkpoint(path, database_id)
+        done = checkpoint.load()
+        if not done and not force:
+            if next(iter(self.gateway.iter_database_pages(database_id)), None):
+                raise ValueError(
+                    f"Database {database_id} isn't empty; restore into an empty "
+                    "database or pass force"
+                )
+
+        run = SyncRun(new_run_id(), self.state_dir)
+        report = RestoreReport(run_id=run.run_id, skipped=len(done))
+        pending = (
+            (row["page_id"], restore_payload(database_id, row, property_types))
+            for row in read_snapshot(path)
+            if row["page_id"] not in done
+        )
+
+        created = []
+        record = database_id == self.database_id
+        for result in self.gateway.create_pages(pending, max_workers=max_workers):
+            if result.ok:
+                run.pages.mark(result.response["id"])
+                checkpoint.mark(result.key)
+                if record:
+                    created.append(result.response)
+                report.restored += 1
+            else:
+                report.failed += 1
+                print(f"[{result.key}] Failed to restore: {result.error}")
+
+            if len(created) >= STORE_BATCH_SIZE:
+                self._record_pages(created)
+                created = []
+
+        self._record_pages(created)
+        return report
+
+    def refresh_expense_store(self) -> StoreReport:
+        """Rebuild the local expense store from every page in Notion."""
+        history = self.gateway.get_database_all(self.database_id)
+        expenses = expense_records(history, self.merchant_canonicalizer)
+        self.merchant_canonicalizer.save()
+        self.expense_store.replace(expenses)
+        return StoreReport(
+            expenses=len(expenses), months=len(self.expense_store.months())
+        )
+
+    def rebuild_summary(self) -> SummaryReport:
+        """
+        Recompute the summary database from every page in Notion.
+
+        Rebuilds the expense store first, so that later deltas are taken
+        against what the summary counted.
+        """
+        if self.summary is None:
+            raise ValueError("No summary database configured; set SUMMARY_DATABASE_ID")
+        self.refresh_expense_store()
+        return self.summary.rebuild(
+            self.expense_store.load(columns=["date", "category", "amount_cents"])
+        )
+
+    def _record_pages(self, pages: list[dict]) -> None:
+        """Keep the local expense store and summary in step with pages written."""
+        if pages:
+            record_pages(
+                self.expense_store, pages, self.merchant_canonicalizer, self.summary
+            )
@@ -0,0 +1,62 @@
+import gzip
+import json
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import Any, cast
+
+from src.notion_gateway import NotionPayload
+from src.notion_sync_expenses.checkpoint import Checkpoint
+
+SPOOL_VERSION = 1
+
+
+def write_spool(
+    path: str | Path,
+    payloads: Iterable[NotionPayload],
+    metadata: dict[str, Any] | None = None,
+) -> int:
+    """
+    Write fully built payloads to a gzip-compressed NDJSON spool file.
+
+    The first line is a header record; every following line is one payload,
+    so the file can be streamed back without loading it into memory.
+
+    Returns:
+        Number of payloads written
+    """
+    header = {
+        "spool_version": SPOOL_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        **(metadata or {}),
+    }
+    count = 0
+    with gzip.open(path, "wt", encoding="utf-8") as spool:
+        spool.write(json.dumps(header) + "\n")
+        for payload in payloads:
+            spool.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            count += 1
+    return count
+
+
+def read_spool_header(path: str | Path) -> dict[str, Any]:
+    with gzip.open(path, "rt", encoding="utf-8") as spool:
+        header = json.loads(spool.readline())
+
+    if header.get("spool_version") != SPOOL_VERSION:
+        raise ValueError(f"Unsupported spool version in {path}")
+    return header
+
+
+def spool_checkpoint(spool_path: str | Path) -> Checkpoint:
+    return Checkpoint(f"{spool_path}.done")
+
+
+def read_spool(path: str | Path) -> Iterator[tuple[int, NotionPayload]]:
+    """Stream (index, payload) pairs from a spool file, skipping the header."""
+    read_spool_header(path)
+    with gzip.open(path, "rt", encoding="utf-8") as spool:
+        next(spool)
+        for index, line in enumerate(spool):
+            if line.strip():
+                yield index, cast(NotionPayload, json.loads(line))
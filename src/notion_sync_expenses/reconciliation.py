@@ -0,0 +1,90 @@
+import pandas as pd
+
+from src.money import parse_brl
+
+DUPLICATE_COLUMN = "duplicate_of"
+DEFAULT_TOLERANCE = pd.Timedelta(days=3)
+
+
+def find_cross_source_duplicates(
+    df: pd.DataFrame,
+    source_column: str,
+    keep: str,
+    date_column: str = "date",
+    amount_column: str = "amount",
+    tolerance: pd.Timedelta = DEFAULT_TOLERANCE,
+    cents_column: str = "amount_cents",
+) -> pd.Series:
+    """
+    Find rows of other sources that repeat a row of the `keep` source.
+
+    Rows match when their absolute amounts are equal to the cent and their
+    dates are within `tolerance`. Each preferred row absorbs at most one
+    duplicate, the nearest in time. Matching runs in rounds of a sorted
+    `merge_asof` per amount bucket, O(n log n) each, instead of comparing
+    every pair. A round settles at least one pair per bucket, and rows whose
+    nearest preferred row went to a closer one are retried in the next round.
+    So there are as many rounds as the longest such chain: one or two for
+    real statements, but up to the size of the largest bucket of repeated
+    amounts on nearby dates.
+
+    Returns:
+        Series aligned with `df` holding the index of the duplicated
+        `keep` row, or NA for rows that aren't duplicates
+    """
+    duplicate_of = pd.Series(pd.NA, index=df.index, dtype="object")
+    # Adapters provide exact cents; other frames have their amounts rounded
+    cents = (
+        df[cents_column]
+        if cents_column in df.columns
+        else parse_brl(df[amount_column]).cents
+    )
+    frame = pd.DataFrame(
+        {
+            "date": pd.to_datetime(df[date_column]),
+            "cents": cents.abs(),
+            "row": df.index,
+        },
+        index=df.index,
+    ).astype({"cents": "int64"})
+
+    is_preferred = df[source_column] == keep
+    preferred = frame[is_preferred].rename(
+        columns={"date": "match_date", "row": "match"}
+    )
+    others = frame[~is_preferred]
+
+    # A preferred row can be the nearest match of several rows; keep the closest
+    # pair and retry the rest against the preferred rows still unmatched.
+    while not others.empty and not preferred.empty:
+        candidates = pd.merge_asof(
+            others.sort_values("date"),
+            preferred.sort_values("match_date"),
+            left_on="date",
+            right_on="match_date",
+            by="cents",
+            tolerance=tolerance,
+            direction="nearest",
+        ).dropna(subset=["match"])
+        if candidates.empty:
+            break
+
+        candidates["distance"] = (candidates["date"] - candidates["match_date"]).abs()
+        pairs = candidates.sort_values("distance").drop_duplicates("match")
+        pairs = pairs.astype({"match": preferred["match"].dtype})
+        duplicate_of.loc[pairs["row"].to_numpy()] = pairs["match"].to_numpy()
+
+        others = others.drop(pairs["row"])
+        preferred = preferred[~preferred["match"].isin(pairs["match"])]
+
+    return duplicate_of
+
+
+def flag_cross_source_duplicates(df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """Add a `duplicate_of` column; see `find_cross_source_duplicates`."""
+    return df.assign(**{DUPLICATE_COLUMN: find_cross_source_duplicates(df, **kwargs)})
+
+
+def drop_cross_source_duplicates(df: pd.DataFrame, **kwargs) -> pd.DataFrame:
+    """Drop rows that repeat a row of the preferred source."""
+    return df[find_cross_source_duplicates(df, **kwargs).isna()]
@@ -0,0 +1,361 @@
+import functools
+import hashlib
+import os
+from collections import Counter, deque
+from collections.abc import Container
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Generic, TypeVar
+
+import pandas as pd
+
+from src.adapters.adapter_factory import AdapterFactory
+from src.enums import PaymentTypeEnum
+from src.envs import SYNC_STATE_DIR
+from src.notion_gateway import NotionPayload, get_shared_gateway
+from src.notion_sync_expenses.checkpoint import Checkpoint
+from src.notion_sync_expenses.expense_store import ExpenseStore
+from src.notion_sync_expenses.notion_sync_service import (
+    DrainReport,
+    NotionSyncService,
+)
+from src.notion_sync_expenses.sync_runs import SyncRun, new_run_id
+from src.notion_sync_expenses.tenants import Tenant
+
+# Rows categorised per parsing job; a large export becomes many jobs that take
+# turns with the other tenants' instead of holding a worker until it's done
+CHUNK_ROWS = 2000
+# Parsed chunks a tenant may have waiting for its sender before its parsing
+# pauses; sends are bound by the tenant's rate budget, not by parsing
+MAX_BACKLOG = 2
+PROCESSED_DIR = "processed"
+
+T = TypeVar("T")
+
+
+class FairQueue(Generic[T]):
+    """
+    Work queue shared by many tenants, served round-robin.
+
+    Each pop takes the oldest item of the next tenant in turn, so a tenant
+    with a thousand items queued delays every other tenant by one item.
+    """
+
+    def __init__(self) -> None:
+        self._queues: dict[str, deque[T]] = {}
+        self._turns: deque[str] = deque()
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def push(self, tenant: str, item: T) -> None:
+        queue = self._queues.setdefault(tenant, deque())
+        if not queue:
+            self._turns.append(tenant)
+        queue.append(item)
+
+    def pop(self, skip: Container[str] = ()) -> T | None:
+        """The next tenant's item, passing over tenants in `skip`; None if none."""
+        for _ in range(len(self._turns)):
+            tenant = self._turns.popleft()
+            if tenant in skip:
+                self._turns.append(tenant)
+                continue
+            queue = self._queues[tenant]
+            item = queue.popleft()
+            if queue:
+                self._turns.append(tenant)
+            return item
+        return None
+
+
+@dataclass(frozen=True)
+class ReadJob:
+    """A tenant's export, parsed once into the rows its ParseJobs share out."""
+
+    tenant: str
+    path: str
+    bank: str
+
+
+@dataclass(frozen=True)
+class ParseJob:
+    """Up to `chunk_rows` standardized rows of an export that weren't sent yet."""
+
+    tenant: str
+    path: str
+    database_id: str
+    run_id: str
+    rows: pd.DataFrame
+
+
+@dataclass
+class TenantReport(DrainReport):
+    tenant: str = ""
+    files: int = 0
+
+
+@dataclass
+class _InboxFile:
+    path: Path
+    checkpoint: Checkpoint
+    # Jobs left: the read, then the ParseJobs its rows are split into
+    chunks: int = 1
+    failed: bool = False
+
+
+def read_export(job: ReadJob) -> pd.DataFrame:
+    """Standardized rows of an export, parsed in the shared parsing processes."""
+    return (
+        AdapterFactory.create_adapter(job.bank)
+        .read_invoice(job.path)
+        .assign(payment=PaymentTypeEnum.CREDIT_CARD.value)
+    )
+
+
+def build_chunk(job: ParseJob) -> list[tuple[int, NotionPayload]]:
+    """Payloads of a job keyed by row, built in the shared parsing processes."""
+    payloads = _parsing_service().payloads_from_frame(
+        job.rows, run_id=job.run_id, database_id=job.database_id
+    )
+    # Invoice rows share one payment type, so the payloads follow row order
+    return list(zip(job.rows.index.tolist(), payloads))
+
+
+@functools.cache
+def _parsing_service() -> NotionSyncService:
+    return NotionSyncService()
+
+
+def inbox_files(inbox: Path) -> list[Path]:
+    """CSV exports waiting in an inbox, oldest first."""
+    if not inbox.is_dir():
+        return []
+    exports = [
+        path
+        for path in inbox.iterdir()
+        if path.is_file() and path.suffix.lower() == ".csv"
+    ]
+    return sorted(exports, key=lambda path: path.stat().st_mtime)
+
+
+class SyncScheduler:
+    """
+    Syncs the inboxes of many tenants from one process.
+
+    Each tenant gets the gateway of its token: its own connection pool, rate
+    budget and concurrency limit, and a thread of its own sending its pages.
+    Parsing and categorising, the CPU-bound part, share one process pool:
+    each export is parsed once there, then its rows are split into jobs of
+    `chunk_rows` rows, queued per tenant and served round-robin, so a huge
+    import takes turns with everyone else's.
+
+    Sent rows are checkpointed per export content, so an interrupted pass
+    resumes and an export dropped in again isn't sent twice. Exports sent in
+    full move to the `processed` directory of their inbox; the others stay
+    to be retried on the next pass.
+    """
+
+    def __init__(
+        self,
+        tenants: list[Tenant],
+        parse_workers: int | None = None,
+        chunk_rows: int = CHUNK_ROWS,
+        state_dir: str | Path = SYNC_STATE_DIR,
+    ) -> None:
+        self.tenants = {tenant.name: tenant for tenant in tenants}
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.chunk_rows = chunk_rows
+        self.state_dir = Path(state_dir)
+        self.services = {
+            tenant.name: NotionSyncService(
+                bank=tenant.bank,
+                database_id=tenant.database_id,
+                gateway=get_shared_gateway(tenant.token),
+                expense_store=ExpenseStore(self._tenant_dir(tenant.name) / "expenses"),
+                summary_database_id=tenant.summary_database_id,
+            )
+            for tenant in tenants
+        }
+        self._senders = {
+            name: ThreadPoolExecutor(1, thread_name_prefix=f"sync-{name}")
+            for name in self.tenants
+        }
+        self._pool: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "SyncScheduler":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for sender in self._senders.values():
+            sender.shutdown()
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def run_once(self) -> list[TenantReport]:
+        """Sync every export waiting in the inboxes; returns when all are done."""
+        reports = {
+            name: TenantReport(run_id=new_run_id(), tenant=name)
+            for name in self.tenants
+        }
+        runs = {
+            name: SyncRun(report.run_id, self.state_dir)
+            for name, report in reports.items()
+        }
+
+        queue: FairQueue[ReadJob | ParseJob] = FairQueue()
+        files: dict[str, _InboxFile] = {}
+        for tenant in self.tenants.values():
+            for path in inbox_files(tenant.inbox):
+                files[str(path)] = self._open(tenant, path)
+                queue.push(tenant.name, ReadJob(tenant.name, str(path), tenant.bank))
+
+        backlog: Counter[str] = Counter()
+        parsing: dict[Future, ReadJob | ParseJob] = {}
+        sending: dict[Future, ParseJob] = {}
+        while queue or parsing or sending:
+            while len(parsing) < self.parse_workers:
+                busy = {name for name, count in backlog.items() if count >= MAX_BACKLOG}
+                job = queue.pop(skip=busy)
+                if job is None:
+                    break
+                if files[job.path].failed:
+                    self._finish_chunk(files[job.path], reports[job.tenant])
+                    continue
+                if isinstance(job, ReadJob):
+                    parsing[self._parsing_pool().submit(read_export, job)] = job
+                    continue
+                backlog[job.tenant] += 1
+                parsing[self._parsing_pool().submit(build_chunk, job)] = job
+
+            if not parsing and not sending:
+                continue
+            done, _ = wait([*parsing, *sending], return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parsing:
+                    job = parsing.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        print(f"[{job.tenant}] Failed to parse {job.path}: {e}")
+                        if isinstance(job, ParseJob):
+                            backlog[job.tenant] -= 1
+                        files[job.path].failed = True
+                        self._finish_chunk(files[job.path], reports[job.tenant])
+                        continue
+                    if isinstance(job, ReadJob):
+                        for chunk in self._split(
+                            job, result, files[job.path], reports[job.tenant]
+                        ):
+                            queue.push(job.tenant, chunk)
+                        self._finish_chunk(files[job.path], reports[job.tenant])
+                        continue
+                    sent = self._senders[job.tenant].submit(
+                        self._send,
+                        job.tenant,
+                        result,
+                        runs[job.tenant],
+                        files[job.path].checkpoint,
+                        reports[job.tenant],
+                    )
+                    sending[sent] = job
+                else:
+                    job = sending.pop(future)
+                    backlog[job.tenant] -= 1
+                    try:
+                        complete = future.result()
+                    except Exception as e:
+                        print(f"[{job.tenant}] Failed to send {job.path}: {e}")
+                        complete = False
+                    files[job.path].failed |= not complete
+                    self._finish_chunk(files[job.path], reports[job.tenant])
+
+        return list(reports.values())
+
+    def _open(self, tenant: Tenant, path: Path) -> _InboxFile:
+        """An export with the checkpoint of its content."""
+        checkpoint = Checkpoint(
+            self._tenant_dir(tenant.name) / "exports" / f"{_digest(path)}.done"
+        )
+        return _InboxFile(path, checkpoint)
+
+    def _split(
+        self,
+        job: ReadJob,
+        rows: pd.DataFrame,
+        inbox_file: _InboxFile,
+        report: TenantReport,
+    ) -> list[ParseJob]:
+        """Split an export's rows into parsing jobs, leaving out rows already sent."""
+        sent = {int(key) for key in inbox_file.checkpoint.load()}
+        report.skipped += len(sent)
+        rows = rows[~rows.index.isin(sent)]
+
+        jobs = [
+            ParseJob(
+                tenant=job.tenant,
+                path=job.path,
+                database_id=self.tenants[job.tenant].database_id,
+                run_id=report.run_id,
+                rows=rows.iloc[start : start + self.chunk_rows],
+            )
+            for start in range(0, len(rows), self.chunk_rows)
+        ]
+        inbox_file.chunks += len(jobs)
+        return jobs
+
+    def _send(
+        self,
+        tenant: str,
+        payloads: list[tuple[int, NotionPayload]],
+        run: SyncRun,
+        checkpoint: Checkpoint,
+        report: TenantReport,
+    ) -> bool:
+        """Send a parsed job from the tenant's thread; False if any page failed."""
+        failed = report.failed
+        self.services[tenant].send_checkpointed(
+            payloads, run, checkpoint, self.tenants[tenant].workers, report
+        )
+        return report.failed == failed
+
+    def _finish_chunk(self, inbox_file: _InboxFile, report: TenantReport) -> None:
+        inbox_file.chunks -= 1
+        if inbox_file.chunks or inbox_file.failed:
+            return
+        processed = inbox_file.path.parent / PROCESSED_DIR
+        processed.mkdir(exist_ok=True)
+        inbox_file.path.rename(processed / f"{report.run_id}-{inbox_file.path.name}")
+        report.files += 1
+
+    def _parsing_pool(self) -> ProcessPoolExecutor:
+        # Spawned rather than forked: the sender threads may hold locks
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self.parse_workers, mp_context=get_context("spawn")
+            )
+        return self._pool
+
+    def _tenant_dir(self, name: str) -> Path:
+        return self.state_dir / "tenants" / name
+
+
+def _digest(path: Path) -> str:
+    """Content hash of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with path.open("rb") as file:
+        while block := file.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()[:32]
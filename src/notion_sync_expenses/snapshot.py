@@ -0,0 +1,201 @@
+import json
+import os
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from src.notion_gateway import NotionPayload, _extract_property_value
+from src.notion_sync_expenses.checkpoint import Checkpoint
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: install the `arrow` extra
+    pa = None
+
+SNAPSHOT_VERSION = 1
+SNAPSHOT_METADATA_KEY = b"notion_snapshot"
+# Columns of every snapshot besides one per database property
+PAGE_COLUMNS = ("page_id", "created_time", "last_edited_time")
+# Property types a restore can write back; the rest are computed by Notion
+RESTORABLE_TYPES = {
+    "title",
+    "rich_text",
+    "number",
+    "select",
+    "multi_select",
+    "date",
+    "checkbox",
+    "url",
+    "email",
+    "phone_number",
+}
+# Notion accepts at most this many characters per rich text segment
+MAX_TEXT_LENGTH = 2000
+BATCH_SIZE = 1000
+
+
+def write_snapshot(
+    path: str | Path,
+    database: dict[str, Any],
+    pages: Iterable[dict[str, Any]],
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """
+    Stream pages of `database` into a zstd-compressed Parquet snapshot.
+
+    Each property becomes a column holding the values `_extract_property_value`
+    decodes, next to the page id and its created and last edited times. The
+    property types are kept in the file metadata so the pages can be rebuilt.
+    Pages are written in row groups of `batch_size` as they arrive, so memory
+    doesn't grow with the database; the file only appears once complete.
+
+    Returns:
+        Number of pages written
+    """
+    _require_arrow()
+    property_types = {
+        name: prop["type"] for name, prop in database["properties"].items()
+    }
+    clashes = set(property_types) & set(PAGE_COLUMNS)
+    if clashes:
+        raise ValueError(f"Properties clash with snapshot columns: {clashes}")
+
+    schema = pa.schema(
+        [
+            ("page_id", pa.string()),
+            ("created_time", pa.timestamp("ms", tz="UTC")),
+            ("last_edited_time", pa.timestamp("ms", tz="UTC")),
+            *((name, _arrow_type(kind)) for name, kind in property_types.items()),
+        ],
+        metadata={
+            SNAPSHOT_METADATA_KEY: json.dumps(
+                {
+                    "snapshot_version": SNAPSHOT_VERSION,
+                    "database_id": database["id"],
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "properties": property_types,
+                }
+            )
+        },
+    )
+
+    path = Path(path)
+    temp_path = path.with_name(f"{path.name}.tmp")
+    count = 0
+    pages = iter(pages)
+    try:
+        with pq.ParquetWriter(temp_path, schema, compression="zstd") as writer:
+            while batch := list(islice(pages, batch_size)):
+                rows = [_snapshot_row(page, property_types) for page in batch]
+                writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+                count += len(rows)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+    os.replace(temp_path, path)
+    return count
+
+
+def read_snapshot_header(path: str | Path) -> dict[str, Any]:
+    _require_arrow()
+    metadata = pq.read_schema(path).metadata or {}
+    if SNAPSHOT_METADATA_KEY not in metadata:
+        raise ValueError(f"{path} isn't a database snapshot")
+
+    header = json.loads(metadata[SNAPSHOT_METADATA_KEY])
+    if header.get("snapshot_version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version in {path}")
+    return header
+
+
+def read_snapshot(
+    path: str | Path, batch_size: int = BATCH_SIZE
+) -> Iterator[dict[str, Any]]:
+    """Stream snapshot rows, one row group batch in memory at a time."""
+    read_snapshot_header(path)
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def snapshot_checkpoint(snapshot_path: str | Path, database_id: str) -> Checkpoint:
+    """Original page ids already restored from a snapshot into a database."""
+    return Checkpoint(f"{snapshot_path}.{database_id}.done")
+
+
+def restore_payload(
+    database_id: str, row: dict[str, Any], property_types: dict[str, str]
+) -> NotionPayload:
+    """Payload recreating a snapshot row; computed properties are left out."""
+    return {
+        "parent": {"database_id": database_id},
+        "properties": {
+            name: _property_payload(kind, row.get(name))
+            for name, kind in property_types.items()
+            if kind in RESTORABLE_TYPES
+            and not (kind == "checkbox" and row.get(name) is None)
+        },
+    }
+
+
+def _snapshot_row(
+    page: dict[str, Any], property_types: dict[str, str]
+) -> dict[str, Any]:
+    properties = page.get("properties", {})
+    row: dict[str, Any] = {
+        "page_id": page["id"],
+        "created_time": _timestamp(page.get("created_time")),
+        "last_edited_time": _timestamp(page.get("last_edited_time")),
+    }
+    for name, kind in property_types.items():
+        value = (
+            _extract_property_value(properties[name]) if name in properties else None
+        )
+        if value is not None and _arrow_type(kind) == pa.string():
+            # Formulas decode to either strings or numbers
+            value = str(value)
+        row[name] = value
+    return row
+
+
+def _arrow_type(kind: str) -> "pa.DataType":
+    match kind:
+        case "number":
+            return pa.float64()
+        case "checkbox":
+            return pa.bool_()
+        case "multi_select":
+            return pa.list_(pa.string())
+        case _:
+            return pa.string()
+
+
+def _property_payload(kind: str, value: Any) -> dict[str, Any]:
+    match kind:
+        case "title" | "rich_text":
+            text = value or ""
+            return {
+                kind: [
+                    {"text": {"content": text[start : start + MAX_TEXT_LENGTH]}}
+                    for start in range(0, len(text), MAX_TEXT_LENGTH)
+                ]
+            }
+        case "select":
+            return {"select": {"name": value} if value else None}
+        case "multi_select":
+            return {"multi_select": [{"name": name} for name in value or []]}
+        case "date":
+            return {"date": {"start": value} if value else None}
+        case _:
+            return {kind: value}
+
+
+def _timestamp(value: str | None) -> datetime | None:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _require_arrow() -> None:
+    if pa is None:
+        raise ImportError("Snapshots need pyarrow; install the `arrow` extra")
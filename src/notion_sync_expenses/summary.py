@@ -0,0 +1,294 @@
+"""
+Monthly totals per category kept in a Notion summary database.
+
+Dashboards built on rollups over every expense get slower as the expense
+database grows. A summary database has one page per month and category
+instead, with the total and the number of expenses. The pipeline keeps those
+pages current with deltas: every write batch works out locally how it changed
+each total and updates only the summary pages it touched.
+"""
+
+import sqlite3
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from src.envs import NOTION_MAX_WORKERS, SUMMARY_STATE_DB
+from src.money import to_reais
+from src.notion_gateway import NotionAPIGateway, NotionPayload
+
+# Properties a summary database needs, by name and type
+SUMMARY_PROPERTIES = {
+    "Name": "title",
+    "Month": "select",
+    "Category": "select",
+    "Total": "number",
+    "Expenses": "number",
+}
+UNCATEGORIZED = "UNASSIGNED"
+DELTA_COLUMNS = ["month", "category", "cents", "expenses"]
+# Seconds a push waits for another process's push to finish
+PUSH_LOCK_TIMEOUT = 600
+
+
+@dataclass
+class SummaryReport:
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+
+
+def category_totals(expenses: pd.DataFrame) -> pd.DataFrame:
+    """
+    Month × category totals of expense store rows, one row per pair.
+
+    `expenses` needs `date`, `category` and `amount_cents` columns.
+    """
+    if expenses.empty:
+        return pd.DataFrame(columns=DELTA_COLUMNS)
+    keys = [
+        pd.to_datetime(expenses["date"]).dt.strftime("%Y-%m").rename("month"),
+        expenses["category"]
+        .astype(object)
+        .where(expenses["category"].notna(), UNCATEGORIZED)
+        .rename("category"),
+    ]
+    return (
+        expenses.groupby(keys)["amount_cents"]
+        .agg(cents="sum", expenses="size")
+        .reset_index()
+        .astype({"cents": "int64", "expenses": "int64"})
+    )
+
+
+def summary_deltas(before: pd.DataFrame, after: pd.DataFrame) -> pd.DataFrame:
+    """
+    How each month × category total changes when `before` rows become `after`.
+
+    Both are expense store rows of the same pages: what was stored for them
+    and what was written. Pairs that don't change are left out.
+    """
+    removed = category_totals(before)
+    removed[["cents", "expenses"]] *= -1
+    combined = pd.concat([category_totals(after), removed], ignore_index=True)
+    deltas = combined.groupby(["month", "category"], as_index=False)[
+        ["cents", "expenses"]
+    ].sum()
+    changed = (deltas["cents"] != 0) | (deltas["expenses"] != 0)
+    return deltas[changed].reset_index(drop=True)
+
+
+class MonthlySummary:
+    """
+    One summary database, kept in step with the expense database.
+
+    The totals are kept in SQLite next to the totals last written to each
+    summary page. Deltas are added to the local totals in one transaction,
+    committed with the store write they describe. Then every page whose total
+    differs from what Notion holds is written: the pages of this batch, plus
+    any whose earlier write failed. Writes happen after that commit, under a
+    lock of their own, so recording a batch never waits on Notion and
+    processes syncing at once can't overwrite a newer total with an older one.
+    """
+
+    def __init__(
+        self,
+        gateway: NotionAPIGateway,
+        database_id: str,
+        state_path: str | Path = SUMMARY_STATE_DB,
+        max_workers: int = NOTION_MAX_WORKERS,
+    ) -> None:
+        self.gateway = gateway
+        self.database_id = database_id
+        self.max_workers = max_workers
+
+        Path(state_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            state_path, timeout=60, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS totals (database_id TEXT NOT NULL, "
+            "month TEXT NOT NULL, category TEXT NOT NULL, page_id TEXT, "
+            "cents INTEGER NOT NULL, expenses INTEGER NOT NULL, "
+            "synced_cents INTEGER, synced_expenses INTEGER, "
+            "PRIMARY KEY (database_id, month, category))"
+        )
+        self._lock = threading.Lock()
+        # Held across page writes, in a file of its own so that deltas can be
+        # recorded meanwhile; nothing is ever written to it
+        self._push_connection = sqlite3.connect(
+            f"{state_path}.push",
+            timeout=PUSH_LOCK_TIMEOUT,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._push_lock = threading.Lock()
+
+    def apply(self, deltas: pd.DataFrame) -> SummaryReport:
+        """Add `summary_deltas` to the totals and write the pages that changed."""
+        with self.recording(deltas):
+            pass
+        return self.push()
+
+    @contextmanager
+    def recording(self, deltas: pd.DataFrame) -> Iterator[None]:
+        """
+        Add `summary_deltas` to the totals when the block completes.
+
+        The block is the write the deltas describe: if it raises, the totals
+        are left as they were. Pages aren't written; call `push` after.
+        """
+        rows = [
+            (self.database_id, month, category, int(cents), int(expenses))
+            for month, category, cents, expenses in deltas[DELTA_COLUMNS].itertuples(
+                index=False
+            )
+        ]
+        with self._transaction():
+            self._connection.executemany(
+                "INSERT INTO totals (database_id, month, category, cents, "
+                "expenses) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (database_id, month, category) DO UPDATE SET "
+                "cents = cents + excluded.cents, "
+                "expenses = expenses + excluded.expenses",
+                rows,
+            )
+            yield
+
+    def push(self) -> SummaryReport:
+        """Write the pages whose totals Notion doesn't hold yet."""
+        with self._push_lock:
+            self._push_connection.execute("BEGIN IMMEDIATE")
+            try:
+                return self._push()
+            finally:
+                self._push_connection.execute("ROLLBACK")
+
+    def rebuild(self, expenses: pd.DataFrame) -> SummaryReport:
+        """
+        Set every total from scratch from expense store rows.
+
+        Pages already in the summary database are reused, matched by month
+        and category; the ones no expense falls under anymore are set to zero.
+        """
+        types = {
+            name: spec["type"]
+            for name, spec in self.gateway.get_database(self.database_id)[
+                "properties"
+            ].items()
+        }
+        missing = [
+            name for name, kind in SUMMARY_PROPERTIES.items() if types.get(name) != kind
+        ]
+        if missing:
+            raise ValueError(
+                f"Summary database {self.database_id} lacks properties: "
+                + ", ".join(f"{name} ({SUMMARY_PROPERTIES[name]})" for name in missing)
+            )
+
+        pages = {}
+        for page in self.gateway.iter_database_pages(self.database_id):
+            properties = page["properties"]
+            month = properties["Month"]["select"]
+            category = properties["Category"]["select"]
+            if month and category:
+                pages[month["name"], category["name"]] = page["id"]
+
+        totals = {
+            (month, category): (int(cents), int(expenses))
+            for month, category, cents, expenses in category_totals(
+                expenses
+            ).itertuples(index=False)
+        }
+        rows = [
+            (self.database_id, month, category, pages.get((month, category)))
+            + totals.get((month, category), (0, 0))
+            for month, category in totals.keys() | pages.keys()
+        ]
+        with self._transaction():
+            self._connection.execute(
+                "DELETE FROM totals WHERE database_id = ?", (self.database_id,)
+            )
+            # Nothing counts as written, so every page is written again
+            self._connection.executemany(
+                "INSERT INTO totals (database_id, month, category, page_id, "
+                "cents, expenses) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return self.push()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def _push(self) -> SummaryReport:
+        with self._lock:
+            stale = self._connection.execute(
+                "SELECT month, category, page_id, cents, expenses FROM totals "
+                "WHERE database_id = ? AND (page_id IS NULL AND expenses != 0 "
+                "OR cents IS NOT synced_cents OR expenses IS NOT synced_expenses)",
+                (self.database_id,),
+            ).fetchall()
+        report = SummaryReport()
+        for result in self.gateway.map_concurrently(
+            self._write_page, ((row, row) for row in stale), self.max_workers
+        ):
+            month, category, page_id, cents, expenses = result.key
+            if not result.ok:
+                report.failed += 1
+                print(f"[{month} {category}] Failed to write summary: {result.error}")
+                continue
+            if page_id is None:
+                report.created += 1
+            else:
+                report.updated += 1
+            # Committed page by page, so a created page is never created again
+            with self._transaction():
+                self._connection.execute(
+                    "UPDATE totals SET page_id = ?, synced_cents = ?, "
+                    "synced_expenses = ? "
+                    "WHERE database_id = ? AND month = ? AND category = ?",
+                    (
+                        result.response["id"],
+                        cents,
+                        expenses,
+                        self.database_id,
+                        month,
+                        category,
+                    ),
+                )
+        return report
+
+    def _write_page(self, row: tuple) -> dict[str, Any]:
+        """Update the page of a total, or create it the first time."""
+        month, category, page_id, cents, expenses = row
+        properties: dict[str, Any] = {
+            "Total": {"number": to_reais(cents)},
+            "Expenses": {"number": expenses},
+        }
+        if page_id is not None:
+            return self.gateway.update_page(page_id, properties)
+
+        payload: NotionPayload = {
+            "parent": {"database_id": self.database_id},
+            "properties": {
+                "Name": {"title": [{"text": {"content": f"{month} {category}"}}]},
+                "Month": {"select": {"name": month}},
+                "Category": {"select": {"name": category}},
+                **properties,
+            },
+        }
+        return self.gateway.create_page(payload)
@@ -0,0 +1,28 @@
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from src.envs import SYNC_STATE_DIR
+from src.notion_sync_expenses.checkpoint import Checkpoint
+
+
+def new_run_id() -> str:
+    return f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+
+
+class SyncRun:
+    """
+    Local ledger of the pages created by one sync run.
+
+    `pages` lists every page id created under the run id and `archived`
+    checkpoints the ones already rolled back, so a rollback can resume.
+    """
+
+    def __init__(self, run_id: str, state_dir: str | Path = SYNC_STATE_DIR) -> None:
+        self.run_id = run_id
+        runs_dir = Path(state_dir) / "runs"
+        self.pages = Checkpoint(runs_dir / f"{run_id}.pages")
+        self.archived = Checkpoint(runs_dir / f"{run_id}.archived")
+
+    def exists(self) -> bool:
+        return self.pages.path.exists()
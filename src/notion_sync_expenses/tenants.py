@@ -0,0 +1,101 @@
+import os
+import re
+import tomllib
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.enums import BankEnum
+from src.envs import NOTION_MAX_WORKERS
+
+TENANT_KEYS = {
+    "name",
+    "token",
+    "token_env",
+    "database_id",
+    "inbox",
+    "bank",
+    "workers",
+    "summary_database_id",
+}
+# Names become directories of the sync state
+_NAME = re.compile(r"[A-Za-z0-9_-]+")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """One integration token syncing the exports dropped in its inbox."""
+
+    name: str
+    token: str = field(repr=False)
+    database_id: str
+    inbox: Path
+    bank: str = BankEnum.INTER.value
+    workers: int = NOTION_MAX_WORKERS
+    summary_database_id: str | None = None
+
+
+def load_tenants(path: str | Path) -> list[Tenant]:
+    """
+    Read the tenants of a scheduler config, a TOML file of `[[tenants]]` tables.
+
+    Each tenant needs a `name`, a `database_id`, an `inbox` directory and its
+    integration token, preferably as `token_env`, the environment variable
+    holding it, rather than inline as `token`. `bank` defaults to INTER and
+    `workers` to NOTION_MAX_WORKERS; `summary_database_id` optionally names
+    a monthly summary database. Raises ValueError for an invalid config.
+    """
+    with open(path, "rb") as config:
+        entries = tomllib.load(config).get("tenants", [])
+    if not entries:
+        raise ValueError(f"No [[tenants]] configured in {path}")
+
+    tenants = [_tenant(entry) for entry in entries]
+    names = [tenant.name for tenant in tenants]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate tenant names: {', '.join(duplicates)}")
+    return tenants
+
+
+def _tenant(entry: dict) -> Tenant:
+    name = entry.get("name", "")
+    if not isinstance(name, str) or not _NAME.fullmatch(name):
+        raise ValueError(
+            f"Tenant name {name!r} must be letters, digits, '-' or '_' only"
+        )
+
+    unknown = set(entry) - TENANT_KEYS
+    if unknown:
+        raise ValueError(
+            f"Tenant {name} has unknown keys: {', '.join(sorted(unknown))}"
+        )
+    for key in ("database_id", "inbox"):
+        if not entry.get(key):
+            raise ValueError(f"Tenant {name} has no {key}")
+
+    token = entry.get("token") or os.getenv(entry.get("token_env", ""))
+    if not token:
+        raise ValueError(
+            f"Tenant {name} has no token; set token_env to a variable holding it"
+        )
+
+    bank = str(entry.get("bank", BankEnum.INTER.value)).upper()
+    if bank not in BankEnum.__members__:
+        raise ValueError(
+            f"Tenant {name} has unsupported bank {bank}; "
+            f"use one of {', '.join(BankEnum.__members__)}"
+        )
+
+    workers = entry.get("workers", NOTION_MAX_WORKERS)
+    if not isinstance(workers, int) or workers < 1:
+        raise ValueError(f"Tenant {name} needs a positive number of workers")
+
+    return Tenant(
+        name=name,
+        token=token,
+        database_id=entry["database_id"],
+        inbox=Path(entry["inbox"]),
+        bank=bank,
+        workers=workers,
+        summary_database_id=entry.get("summary_database_id") or None,
+    )
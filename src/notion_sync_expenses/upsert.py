@@ -0,0 +1,122 @@
+from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.envs import NOTION_RUN_ID_PROPERTY
+from src.notion_gateway import NotionPayload, _extract_property_value
+
+KEY_PROPERTIES = ("Date", "Bank Description")
+
+RowKey = tuple[Any, ...]
+
+
+@dataclass
+class UpsertPlan:
+    creates: list[NotionPayload] = field(default_factory=list)
+    updates: list[tuple[str, dict[str, Any]]] = field(default_factory=list)
+    unchanged: int = 0
+
+
+def decode_payload_property(prop: dict[str, Any]) -> Any:
+    """Decode a payload property into the same plain value `_extract_property_value` yields."""
+    ((prop_type, value),) = prop.items()
+    match prop_type:
+        case "title" | "rich_text":
+            return "".join(item["text"]["content"] for item in value) if value else None
+        case "number" | "checkbox" | "url" | "email" | "phone_number":
+            return value
+        case "select":
+            return value["name"] if value else None
+        case "multi_select":
+            return [s["name"] for s in value]
+        case "date":
+            return value["start"] if value else None
+        case _:
+            return value
+
+
+def diff_properties(
+    properties: dict[str, Any], current_values: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Return only the payload properties whose value differs from the page.
+
+    The run id tag is left alone: it records which run created the page.
+    """
+    return {
+        name: prop
+        for name, prop in properties.items()
+        if name != NOTION_RUN_ID_PROPERTY
+        and not _same_value(decode_payload_property(prop), current_values.get(name))
+    }
+
+
+def plan_upsert(
+    payloads: Iterable[NotionPayload], pages: Iterable[dict[str, Any]]
+) -> UpsertPlan:
+    """
+    Match payloads to existing pages by a stable key and plan the minimal writes.
+
+    The key is the expense date and bank description; repeated purchases on
+    the same day are told apart by their order of appearance (pages ordered by
+    creation time), which is stable across re-runs of the same statement.
+    """
+    existing: dict[RowKey, tuple[str, dict[str, Any]]] = {}
+    seen: dict[RowKey, int] = defaultdict(int)
+    for page in sorted(pages, key=lambda page: page.get("created_time", "")):
+        values = {
+            name: _extract_property_value(prop)
+            for name, prop in page["properties"].items()
+        }
+        base_key = tuple(values.get(name) for name in KEY_PROPERTIES)
+        existing[(*base_key, seen[base_key])] = (page["id"], values)
+        seen[base_key] += 1
+
+    plan = UpsertPlan()
+    seen.clear()
+    for payload in payloads:
+        properties = payload["properties"]
+        base_key = tuple(
+            decode_payload_property(properties[name]) if name in properties else None
+            for name in KEY_PROPERTIES
+        )
+        key = (*base_key, seen[base_key])
+        seen[base_key] += 1
+
+        if key not in existing:
+            plan.creates.append(payload)
+            continue
+
+        page_id, current_values = existing[key]
+        changed = diff_properties(properties, current_values)
+        if changed:
+            plan.updates.append((page_id, changed))
+        else:
+            plan.unchanged += 1
+
+    return plan
+
+
+def date_range_filter(payloads: list[NotionPayload]) -> dict[str, Any] | None:
+    """Build a query filter restricting pages to the payloads' date range."""
+    dates = [
+        decode_payload_property(payload["properties"]["Date"])
+        for payload in payloads
+        if "Date" in payload["properties"]
+    ]
+    if not dates:
+        return None
+
+    return {
+        "and": [
+            {"property": "Date", "date": {"on_or_after": min(dates)}},
+            {"property": "Date", "date": {"on_or_before": max(dates)}},
+        ]
+    }
+
+
+def _same_value(new: Any, current: Any) -> bool:
+    if isinstance(new, (int, float)) and isinstance(current, (int, float)):
+        return round(float(new), 2) == round(float(current), 2)
+    return new == current
@@ -0,0 +1,235 @@
+"""
+CPU and memory profiles of the sync pipeline, stage by stage.
+
+`python -m src.main profile` builds payloads with a `PipelineProfiler` as the
+service's stage hook: every stage runs under its own cProfile profiler, with
+tracemalloc traces cleared as it starts and snapshotted as it ends, so a slow
+run points at a stage and, inside it, at the functions and source lines
+responsible.
+"""
+
+import cProfile
+import itertools
+import json
+import linecache
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from src.notion_gateway import NotionAPIGateway
+from src.rate_limiter import RateLimiter
+
+STACKS_FILE = "stacks.folded"
+ALLOCATIONS_FILE = "allocations.txt"
+# Call paths given less time than this are left out of the folded stacks
+MIN_PATH_SECONDS = 1e-5
+MIB = 1024 * 1024
+
+# cProfile's key of a function: (file, line, name)
+Function = tuple[str, int, str]
+
+
+@dataclass
+class StageProfile:
+    """Calls, time and memory of one stage, added up over every time it ran."""
+
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    peak_bytes: int = 0
+    # Bytes still allocated when the stage returned, by (file, line)
+    allocations: Counter[tuple[str, int]] = field(default_factory=Counter)
+    profile: cProfile.Profile = field(default_factory=cProfile.Profile, repr=False)
+
+    @property
+    def retained_bytes(self) -> int:
+        return sum(self.allocations.values())
+
+
+class PipelineProfiler:
+    """
+    Stage hook that traces the functions and allocations of each stage.
+
+    Use it as a context manager, which traces allocations while it's open.
+    Stages can't nest, as one cProfile profiler runs at a time; a stage run
+    again, like reading both an invoice and a statement, adds to its profile.
+    Times include the profilers' own overhead, so compare them between runs
+    rather than with unprofiled ones.
+    """
+
+    def __init__(self) -> None:
+        self.stages: dict[str, StageProfile] = {}
+
+    def __enter__(self) -> "PipelineProfiler":
+        tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        tracemalloc.stop()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Open the profiler before profiling a stage")
+        stage = self.stages.setdefault(name, StageProfile(name))
+        # Only the stage's own allocations are traced, so one snapshot at its
+        # end holds what it retained; diffing against a snapshot of the whole
+        # heap would cost more than most stages
+        tracemalloc.clear_traces()
+        started_at = time.perf_counter()
+        stage.profile.enable()
+        try:
+            yield
+        finally:
+            stage.profile.disable()
+            stage.seconds += time.perf_counter() - started_at
+            stage.calls += 1
+            stage.peak_bytes = max(stage.peak_bytes, tracemalloc.get_traced_memory()[1])
+            for statistic in _snapshot().statistics("lineno"):
+                frame = statistic.traceback[0]
+                stage.allocations[frame.filename, frame.lineno] += statistic.size
+
+    def write(self, directory: str | Path, top: int = 15) -> list[Path]:
+        """
+        Write the profiles into `directory`.
+
+        - `stacks.folded`: collapsed stacks of every stage, in microseconds,
+          for flamegraph.pl, inferno or speedscope
+        - `allocations.txt`: each stage's time, peak memory and the source
+          lines holding the most memory when it returned
+        - `<stage>.prof`: cProfile stats of each stage, for pstats or snakeviz
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        written = []
+        stacks: Counter[str] = Counter()
+        for stage in self.stages.values():
+            stats = pstats.Stats(stage.profile)
+            stacks.update(collapsed_stacks(stats, root=stage.name))
+            path = directory / f"{stage.name}.prof"
+            stats.dump_stats(path)
+            written.append(path)
+
+        path = directory / STACKS_FILE
+        path.write_text(
+            "".join(f"{stack} {value}\n" for stack, value in sorted(stacks.items())),
+            encoding="utf-8",
+        )
+        written.insert(0, path)
+        path = directory / ALLOCATIONS_FILE
+        path.write_text(self.allocation_report(top), encoding="utf-8")
+        written.insert(1, path)
+        return written
+
+    def allocation_report(self, top: int = 15) -> str:
+        lines = []
+        for stage in self.stages.values():
+            lines.append(
+                f"== {stage.name}: {stage.calls} call(s), {stage.seconds:.3f} s, "
+                f"peak {stage.peak_bytes / MIB:.1f} MiB, "
+                f"retained {stage.retained_bytes / MIB:.1f} MiB"
+            )
+            by_size = sorted(
+                stage.allocations.items(), key=lambda item: abs(item[1]), reverse=True
+            )
+            for (filename, lineno), size in by_size[:top]:
+                source = linecache.getline(filename, lineno).strip()
+                lines.append(
+                    f"{size / 1024:>12,.1f} KiB  "
+                    f"{_short_path(filename)}:{lineno}  {source}"
+                )
+            lines.append("")
+        return "\n".join(lines)
+
+
+def collapsed_stacks(stats: pstats.Stats, root: str) -> Counter[str]:
+    """
+    Folded stacks of a cProfile run under a `root` frame, in microseconds.
+
+    cProfile records the callers of each function rather than whole stacks,
+    so a function's time is split over the paths reaching it in proportion to
+    the time of each call; recursive calls are folded into the outermost one.
+    """
+    entries: dict[Function, tuple] = stats.stats  # type: ignore[attr-defined]
+    callees: dict[Function, dict[Function, float]] = defaultdict(dict)
+    for function, (*_, callers) in entries.items():
+        for caller, (*_, cumulative) in callers.items():
+            callees[caller][function] = cumulative
+
+    stacks: Counter[str] = Counter()
+    # Functions on the path being walked
+    active: set[Function] = set()
+
+    def walk(function: Function, path: tuple[str, ...], seconds: float) -> None:
+        _, _, own, cumulative, _ = entries[function]
+        path = (*path, _label(function))
+        share = seconds / cumulative if cumulative else 0.0
+        if microseconds := round(own * share * 1e6):
+            stacks[";".join(path)] += microseconds
+        for callee, callee_seconds in callees[function].items():
+            if callee not in active and callee_seconds * share >= MIN_PATH_SECONDS:
+                active.add(callee)
+                walk(callee, path, callee_seconds * share)
+                active.discard(callee)
+
+    for function, entry in entries.items():
+        # The profiler's own disable() is a root too
+        if not entry[4] and not _is_profiler(function):
+            active.add(function)
+            walk(function, (root,), entry[3])
+            active.discard(function)
+    return stacks
+
+
+class StubGateway(NotionAPIGateway):
+    """
+    Gateway answering every request locally, to profile without Notion.
+
+    Requests are still encoded as the client would send them, the only part
+    of a send that costs CPU here; nothing is rate limited or sent.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(rate_limiter=RateLimiter(rate=1), token="stub")
+        self._page_ids = itertools.count(1)
+
+    def _request(self, method: Callable[..., Any], **kwargs: Any) -> dict[str, Any]:
+        json.dumps(kwargs)
+        return {"object": "page", "id": f"stub-{next(self._page_ids)}"}
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces(
+        [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ]
+    )
+
+
+def _label(function: Function) -> str:
+    filename, lineno, name = function
+    label = name if filename == "~" else f"{name} ({_short_path(filename)}:{lineno})"
+    # Folded stacks separate frames with ';'
+    return label.replace(";", ",")
+
+
+def _is_profiler(function: Function) -> bool:
+    return "_lsprof.Profiler" in function[2]
+
+
+def _short_path(filename: str) -> str:
+    """A file path relative to the import path it's found under."""
+    for prefix in sorted(filter(None, sys.path), key=len, reverse=True):
+        prefix = os.path.join(prefix, "")
+        if filename.startswith(prefix):
+            return filename[len(prefix) :]
+    return filename
@@ -0,0 +1,94 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class RateLimiter:
+    """Thread-safe token bucket that spaces out requests to the Notion API."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request slot is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated_at) * self.rate
+                )
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_seconds = (1 - self._tokens) / self.rate
+
+            time.sleep(wait_seconds)
+
+
+class SharedRateLimiter:
+    """
+    Token bucket stored in SQLite so every process using the same integration
+    token draws from one budget.
+
+    Each acquire reserves the next free slot in a single transaction and then
+    sleeps until that slot, so waiting processes don't poll the database.
+    """
+
+    def __init__(self, path: str | Path, key: str, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("Rate must be positive")
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._key = hashlib.sha256(key.encode()).hexdigest()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS buckets "
+            "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a request slot is available."""
+        wait_seconds = self._reserve()
+        if wait_seconds > 0:
+            time.sleep(wait_seconds)
+
+    def _reserve(self) -> float:
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._connection.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE key = ?",
+                    (self._key,),
+                ).fetchone()
+                tokens, updated_at = row if row else (float(self.burst), now)
+                tokens = min(self.burst, tokens + max(now - updated_at, 0) * self.rate)
+                tokens -= 1
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO buckets (key, tokens, updated_at) "
+                    "VALUES (?, ?, ?)",
+                    (self._key, tokens, now),
+                )
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+
+        return -tokens / self.rate if tokens < 0 else 0.0
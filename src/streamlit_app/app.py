@@ -1,5 +1,3 @@
-from typing import cast
-
 import pandas as pd
 import streamlit as st
 
@@ -9,13 +7,27 @@ from src.streamlit_app.components.data_editor import display_notion_data_editor
 from src.streamlit_app.components.payload_preview import show_notion_payload_preview
 from src.streamlit_app.components.raw_data_editor import display_raw_data_editor
 from src.streamlit_app.components.validation_display import display_validation_results
-from src.streamlit_app.processors.csv_parser import FileType, parse_uploaded_file
+from src.streamlit_app.components.windowed_editor import display_windowed_notion_editor
+from src.streamlit_app.processors.csv_parser import SOURCE_FILE_COLUMN
+from src.streamlit_app.processors.data_loader import (
+    Upload,
+    detect_uploads,
+    parse_uploads,
+)
 from src.streamlit_app.processors.notion_processor import send_to_notion
+from src.streamlit_app.session.review_data import (
+    WINDOWED_REVIEW_MIN_ROWS,
+    ReviewData,
+    clear_editor_changes,
+)
 from src.streamlit_app.session.state_manager import (
     initialize_session_state,
     reset_session_state,
 )
-from src.streamlit_app.validators.data_validator import validate_data
+from src.streamlit_app.validators.data_validator import (
+    invalid_notion_rows,
+    validate_data,
+)
 
 
 def main():
@@ -33,82 +45,152 @@ def main():
 
     with st.sidebar:
         st.header("Data Source")
-        file_type = st.selectbox(
-            "File Type",
-            options=["CREDIT_CARD_INVOICE", "BANK_ACCOUNT_STATEMENT"],
-            format_func=lambda x: (
-                "Credit Card Invoice"
-                if x == "CREDIT_CARD_INVOICE"
-                else "Bank Account Statement"
+        uploaded_files = st.file_uploader(
+            "Upload CSVs",
+            type=["csv"],
+            accept_multiple_files=True,
+            help=(
+                "Credit card invoices and bank account statements, in any mix: "
+                "the type of each file is detected from its header."
             ),
-            index=0 if st.session_state.file_type == "CREDIT_CARD_INVOICE" else 1,
-        )
-        st.session_state.file_type = file_type
-        st.session_state.default_payment_method = (
-            "CREDIT_CARD" if file_type == "CREDIT_CARD_INVOICE" else "PIX"
         )
 
-        uploaded_file = st.file_uploader("Upload CSV", type=["csv"])
-
-        if uploaded_file is not None:
-            with st.spinner("Reading uploaded CSV..."):
-                st.session_state.data_df = parse_uploaded_file(
-                    uploaded_file, cast(FileType, file_type)
+        if uploaded_files:
+            uploads, rejected = detect_uploads(uploaded_files)
+            key = "|".join(upload.key for upload in uploads)
+
+            # Reruns keep the files in the uploader; only a new set resets edits
+            if uploads and st.session_state.upload_key != key:
+                (
+                    st.session_state.review,
+                    st.session_state.upload_errors,
+                ) = load_uploads(uploads)
+                clear_editor_changes()
+                st.session_state.upload_key = key
+
+            for message in rejected + st.session_state.upload_errors:
+                st.error(message)
+            loaded: ReviewData | None = st.session_state.review
+            if uploads and loaded is not None:
+                st.success(
+                    f"{loaded.base[SOURCE_FILE_COLUMN].nunique()} file(s), "
+                    f"{len(loaded.base)} rows loaded. Proceed below."
                 )
-                st.session_state.edited_data = st.session_state.data_df.copy()
-                st.session_state.edited_notion_data = None
-                st.session_state.rows_to_delete = set()
-            st.success("CSV loaded. Proceed below.")
-
-    if st.session_state.data_df is not None:
-        # Step 1: Raw data editing; re-runs on any change
-        display_raw_data_editor(st.session_state.edited_data)
-
-        # Validate the edited data so row numbers match what's on screen
-        validation_results = validate_data(st.session_state.edited_data)
-
-        should_proceed = display_validation_results(validation_results)
-
-        if should_proceed:
-            st.divider()
-            # Step 2: Notion data preview & editing
-            display_notion_data_editor(st.session_state.edited_data)
-
-            if (
-                st.session_state.edited_notion_data is not None
-                and not st.session_state.edited_notion_data.empty
-            ):
-                show_notion_payload_preview()
-
-            st.divider()
-
-            col1, col2, col3 = st.columns([1, 1, 1])
-
-            with col2:
-                if st.button(
-                    "🚀 Send to Notion", type="primary", use_container_width=True
-                ):
-                    if not FINANCE_DASHBOARD_ID:
-                        st.error("Finance dashboard ID not configured")
-                    elif (
-                        st.session_state.edited_notion_data is None
-                        or st.session_state.edited_notion_data.empty
-                    ):
-                        st.error("No data to send. Please load and edit data first.")
-                    else:
-                        with st.spinner("Sending data to Notion..."):
-                            success = send_to_notion(
-                                st.session_state.edited_notion_data
-                            )
-
-                        if success:
-                            st.balloons()
-                            reset_session_state()
 
+    review: ReviewData | None = st.session_state.review
+    if review is not None:
+        raw_data_section(review)
     else:
-        st.info("👈 Upload a CSV in the sidebar to get started")
+        st.info("👈 Upload CSVs in the sidebar to get started")
         show_configuration()
 
 
+def load_uploads(uploads: list[Upload]) -> tuple[ReviewData | None, list[str]]:
+    """Parse uploads in parallel into one review, showing each file as it's read."""
+    frames: dict[str, pd.DataFrame] = {}
+    errors: list[str] = []
+    with st.status(f"Reading {len(uploads)} file(s)...") as status:
+        progress = st.progress(0.0)
+        for done, parsed in enumerate(parse_uploads(uploads), start=1):
+            name = parsed.upload.name
+            if parsed.ok:
+                frames[name] = parsed.frame
+                st.write(f"✅ {name}: {len(parsed.frame)} rows")
+            else:
+                errors.append(f"{name}: {parsed.error}")
+                st.write(f"❌ {name}: {parsed.error}")
+            progress.progress(done / len(uploads))
+        status.update(
+            label=f"Read {len(frames)} of {len(uploads)} file(s)",
+            state="complete" if not errors else "error",
+        )
+
+    if not frames:
+        return None, errors
+    # Files are parsed in any order but reviewed in the order they were uploaded
+    ordered = {
+        upload.name: frames[upload.name] for upload in uploads if upload.name in frames
+    }
+    payment_methods = {upload.name: upload.payment_method for upload in uploads}
+    return ReviewData.from_uploads(ordered, payment_methods), errors
+
+
+# Each section is a fragment that calls the sections downstream of it with its
+# own output, so an interaction reruns that section and what depends on it only.
+
+
+@st.fragment
+def raw_data_section(review: ReviewData):
+    """Step 1: raw data editing, followed by everything derived from it."""
+    windowed = st.toggle(
+        "Windowed review",
+        value=len(review.base) >= WINDOWED_REVIEW_MIN_ROWS,
+        help=(
+            "Page through the Notion data with filters and bulk actions instead "
+            "of loading every row into the editors. Edits made in one mode "
+            "aren't carried over to the other."
+        ),
+    )
+    if windowed:
+        edited_data = review.raw_view()
+    else:
+        edited_data = display_raw_data_editor(review.base)
+    validation_section(review, edited_data, windowed)
+
+
+@st.fragment
+def validation_section(review: ReviewData, edited_data: pd.DataFrame, windowed: bool):
+    """Validate the edited data so row numbers match what's on screen."""
+    validation_results = validate_data(edited_data)
+
+    if display_validation_results(validation_results):
+        st.divider()
+        notion_section(review, windowed)
+
+
+@st.fragment
+def notion_section(review: ReviewData, windowed: bool):
+    """Step 2: Notion data preview & editing."""
+    if windowed:
+        edited_notion_data = display_windowed_notion_editor(review)
+    else:
+        edited_notion_data = display_notion_data_editor(review.notion_data())
+    send_section(review, edited_notion_data)
+
+
+@st.fragment
+def send_section(review: ReviewData, edited_notion_data: pd.DataFrame | None):
+    """Payload preview and the send button for the edited Notion data."""
+    if edited_notion_data is not None and not edited_notion_data.empty:
+        invalid = int(invalid_notion_rows(edited_notion_data).sum())
+        if invalid:
+            st.warning(
+                f"⚠️ {invalid} row(s) have an invalid date, amount or category and "
+                "won't be sent until fixed; the windowed review's \"Invalid only\" "
+                "filter lists them"
+            )
+        show_notion_payload_preview(edited_notion_data)
+
+    st.divider()
+
+    col1, col2, col3 = st.columns([1, 1, 1])
+
+    with col2:
+        if st.button("🚀 Send to Notion", type="primary", use_container_width=True):
+            if not FINANCE_DASHBOARD_ID:
+                st.error("Finance dashboard ID not configured")
+            elif edited_notion_data is None or edited_notion_data.empty:
+                st.error("No data to send. Please load and edit data first.")
+            else:
+                with st.spinner("Sending data to Notion..."):
+                    success = send_to_notion(
+                        edited_notion_data, suggested=review.notion_data()
+                    )
+
+                if success:
+                    st.balloons()
+                    reset_session_state()
+
+
 if __name__ == "__main__":
     main()
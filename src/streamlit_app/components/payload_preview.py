@@ -1,20 +1,16 @@
+import pandas as pd
 import streamlit as st
 
 from src.streamlit_app.processors.notion_processor import build_notion_payload
 
 
-def show_notion_payload_preview():
+def show_notion_payload_preview(notion_data: pd.DataFrame):
     """Display preview of Notion API payloads for the first few rows."""
-    if (
-        st.session_state.edited_notion_data is None
-        or st.session_state.edited_notion_data.empty
-    ):
+    if notion_data is None or notion_data.empty:
         return
 
     with st.expander("🔧 Sample Notion API Payloads (first 3 rows)"):
-        for i, (_, row) in enumerate(
-            st.session_state.edited_notion_data.head(3).iterrows()
-        ):
+        for i, (_, row) in enumerate(notion_data.head(3).iterrows()):
             try:
                 payload = build_notion_payload(row)
                 st.json(payload)
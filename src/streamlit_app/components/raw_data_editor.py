@@ -1,6 +1,9 @@
 import pandas as pd
 import streamlit as st
 
+from src.streamlit_app.processors.csv_parser import SOURCE_FILE_COLUMN
+from src.streamlit_app.session.review_data import RAW_EDITOR_KEY
+
 
 def display_raw_data_editor(df: pd.DataFrame) -> pd.DataFrame:
     """Allow the user to review and edit the raw uploaded data before transformation."""
@@ -10,19 +13,15 @@ def display_raw_data_editor(df: pd.DataFrame) -> pd.DataFrame:
 
     st.subheader("🧾 Raw Data Review & Editing")
 
-    # Ensure 1-based line numbering is visible and preserved
-    df_to_edit = df.copy()
-    if df_to_edit.index.min() == 0:
-        df_to_edit.index = df_to_edit.index + 1
-    df_to_edit.index.name = "Line"
-
+    # The canonical frame already carries the 1-based "Line" index and is passed
+    # unchanged on every run, so the editor state stays a sparse overlay on it
     edited_df = st.data_editor(
-        df_to_edit,
+        df,
         use_container_width=True,
         num_rows="dynamic",
-        key="raw_data_editor",
+        column_config={SOURCE_FILE_COLUMN: st.column_config.TextColumn(disabled=True)},
+        key=RAW_EDITOR_KEY,
         hide_index=False,
     )
 
-    st.session_state.edited_data = edited_df
     return edited_df
@@ -0,0 +1,90 @@
+import pandas as pd
+import streamlit as st
+
+from src.streamlit_app.components.data_editor import (
+    NOTION_CATEGORY_OPTIONS,
+    NOTION_COLUMN_CONFIG,
+)
+from src.streamlit_app.session.review_data import ReviewData, ReviewFilter
+
+PAGE_SIZES = [50, 100, 250]
+
+
+def display_windowed_notion_editor(review: ReviewData) -> pd.DataFrame | None:
+    """
+    Display the Notion data one page at a time and return all edited Notion data.
+
+    Filtering, paging and bulk actions run on the server over whole columns;
+    only the rows of the current page are sent to the data editor.
+    """
+    notion_data = review.notion_data()
+    if notion_data.empty:
+        st.warning("No data to edit")
+        return None
+
+    st.subheader("📊 Notion Data Preview & Editing")
+
+    window = review.window
+    view = window.apply(notion_data, with_pending=False)
+
+    # Changing what's on screen folds the page's edits in first
+    filter_col, category_col, size_col, page_col = st.columns(4)
+    row_filter = filter_col.selectbox(
+        "Show", options=list(ReviewFilter), on_change=window.commit
+    )
+    category = None
+    if row_filter == ReviewFilter.CATEGORY:
+        category = category_col.selectbox(
+            "Category",
+            options=sorted(view["Category"].dropna().unique()),
+            on_change=window.commit,
+        )
+    page_size = size_col.selectbox(
+        "Rows per page", options=PAGE_SIZES, index=1, on_change=window.commit
+    )
+
+    matching = window.matching(view, row_filter, category)
+    pages = max(1, -(-len(matching) // page_size))
+    page = page_col.number_input(
+        "Page",
+        min_value=1,
+        max_value=pages,
+        value=1,
+        step=1,
+        on_change=window.commit,
+    )
+
+    window.lines = matching[(page - 1) * page_size : page * page_size]
+    st.caption(f"{len(matching)} of {len(view)} rows match · page {page} of {pages}")
+    st.data_editor(
+        view.loc[window.lines],
+        use_container_width=True,
+        num_rows="fixed",
+        column_config=NOTION_COLUMN_CONFIG,
+        key=window.editor_key,
+        hide_index=False,
+    )
+
+    bulk_category_col, set_col, remove_col = st.columns([2, 1, 1])
+    bulk_category = bulk_category_col.selectbox(
+        "Category for matching rows", options=NOTION_CATEGORY_OPTIONS
+    )
+    set_col.button(
+        f"Set category for {len(matching)} rows",
+        on_click=window.set_category,
+        args=(matching, bulk_category),
+        disabled=matching.empty,
+        use_container_width=True,
+    )
+    remove_col.button(
+        f"Remove {len(matching)} rows",
+        on_click=window.remove,
+        args=(matching,),
+        disabled=matching.empty,
+        use_container_width=True,
+    )
+
+    if window.removed:
+        st.info(f"🗑️ {len(window.removed)} row(s) removed from the table")
+
+    return window.apply(notion_data)
@@ -0,0 +1,89 @@
+import pandas as pd
+import streamlit as st
+
+from src.notion_sync_expenses.expense_report import (
+    REPORT_DIMENSIONS,
+    ExpenseReport,
+    build_report,
+)
+from src.streamlit_app.resources import get_expense_store
+
+
+@st.cache_data(show_spinner=False)
+def load_report(
+    version: float, start: str, end: str, by: str, limit: int
+) -> ExpenseReport:
+    """The report for these months; `version` changes whenever the store does."""
+    return build_report(get_expense_store(), start, end, by=by, limit=limit)
+
+
+def in_reais(cents: pd.DataFrame) -> pd.DataFrame:
+    return cents / 100
+
+
+def main():
+    st.set_page_config(page_title="Expense Reports", page_icon="📊", layout="wide")
+    st.title("📊 Expense Reports")
+    st.markdown(
+        "Totals over the expenses synced from this machine, read from the local "
+        "store without calling Notion. Run `python -m src.main report --refresh` "
+        "to rebuild it from everything in Notion."
+    )
+
+    store = get_expense_store()
+    if not store.enabled:
+        st.warning("The expense store needs pyarrow; install the `arrow` extra")
+        return
+    months = store.months()
+    if not months:
+        st.info("No expenses stored yet. Send some to Notion first.")
+        return
+
+    with st.sidebar:
+        st.header("Report")
+        start, end = (
+            st.select_slider("Months", options=months, value=(months[0], months[-1]))
+            if len(months) > 1
+            else (months[0], months[0])
+        )
+        by = st.radio("Totals by", REPORT_DIMENSIONS, horizontal=True)
+        limit = st.number_input("Top merchants", min_value=1, max_value=100, value=10)
+
+    report = load_report(store.version(), start, end, by, int(limit))
+
+    totals = in_reais(report.totals)
+    st.subheader(f"Monthly totals by {by}")
+    st.bar_chart(totals)
+    st.dataframe(
+        totals.assign(TOTAL=totals.sum(axis=1)),
+        use_container_width=True,
+        column_config={
+            name: st.column_config.NumberColumn(format="R$ %.2f")
+            for name in [*totals.columns, "TOTAL"]
+        },
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Essential vs non-essential")
+        st.dataframe(
+            in_reais(report.essential),
+            use_container_width=True,
+            column_config={
+                name: st.column_config.NumberColumn(format="R$ %.2f")
+                for name in report.essential.columns
+            },
+        )
+    with col2:
+        st.subheader("Top merchants")
+        st.dataframe(
+            report.top_merchants.assign(
+                total=report.top_merchants["total_cents"] / 100
+            ).drop(columns="total_cents"),
+            use_container_width=True,
+            column_config={"total": st.column_config.NumberColumn(format="R$ %.2f")},
+        )
+
+
+if __name__ == "__main__":
+    main()
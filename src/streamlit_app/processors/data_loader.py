@@ -1,7 +1,57 @@
+import hashlib
+from collections.abc import Iterator
+from concurrent.futures import as_completed
+from dataclasses import dataclass, field, replace
+
 import pandas as pd
 import streamlit as st
 
+from src.adapters.csv_reader import read_csv
+from src.adapters.export_parser import FileType, detect_file_type
 from src.envs import MONTHLY_INVOICE_FILENAME
+from src.streamlit_app.processors.csv_parser import parse_upload_bytes
+from src.streamlit_app.resources import get_parsed_frames, get_parsing_pool
+
+# Payment method of the rows of each file type
+PAYMENT_METHODS: dict[FileType, str] = {
+    "CREDIT_CARD_INVOICE": "CREDIT_CARD",
+    "BANK_ACCOUNT_STATEMENT": "PIX",
+}
+
+
+@dataclass(frozen=True)
+class Upload:
+    """One uploaded file and the type detected from its content."""
+
+    name: str
+    file_type: FileType
+    data: bytes = field(repr=False)
+    # Content hash and type, hashed once when the upload is created
+    key: str = field(default="", repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.key:
+            object.__setattr__(self, "key", upload_key(self.data, self.file_type))
+
+    @classmethod
+    def detect(cls, name: str, data: bytes) -> "Upload":
+        """ValueError if the file is neither an invoice nor a statement."""
+        return cls(name, detect_file_type(data), data)
+
+    @property
+    def payment_method(self) -> str:
+        return PAYMENT_METHODS[self.file_type]
+
+
+@dataclass
+class ParsedUpload:
+    upload: Upload
+    frame: pd.DataFrame | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
 
 
 def load_csv_data() -> pd.DataFrame:
@@ -11,7 +61,7 @@ def load_csv_data() -> pd.DataFrame:
         st.stop()
 
     try:
-        df = pd.read_csv(MONTHLY_INVOICE_FILENAME, sep=",")
+        df = read_csv(MONTHLY_INVOICE_FILENAME, sep=",")
         return df
     except FileNotFoundError:
         st.error(f"CSV file not found: {MONTHLY_INVOICE_FILENAME}")
@@ -19,3 +69,89 @@ def load_csv_data() -> pd.DataFrame:
     except Exception as e:
         st.error(f"Error loading CSV file: {str(e)}")
         st.stop()
+
+
+def upload_key(file_bytes: bytes, file_type: FileType) -> str:
+    """Identify an upload by its content and the file type it was parsed as."""
+    return f"{file_type}:{hashlib.sha256(file_bytes).hexdigest()}"
+
+
+def parse_uploads(uploads: list[Upload]) -> Iterator[ParsedUpload]:
+    """
+    Parse uploads concurrently, yielding each one as soon as it's parsed.
+
+    Files parsed before, by any session, come from the cache of parsed
+    frames keyed by content. The others are parsed in the shared process
+    pool, so a batch takes about as long as its largest file. A single file
+    is parsed in this process, where it skips pickling the file and its
+    frame across processes.
+    """
+    cache = get_parsed_frames()
+    pending = []
+    for upload in uploads:
+        frame = cache.get(upload.key)
+        if frame is None:
+            pending.append(upload)
+        else:
+            yield ParsedUpload(upload, frame=frame)
+
+    for parsed in _parse_all(pending):
+        if parsed.ok:
+            cache.put(parsed.upload.key, parsed.frame)
+        yield parsed
+
+
+def _parse_all(uploads: list[Upload]) -> Iterator[ParsedUpload]:
+    if len(uploads) == 1:
+        yield _parse(uploads[0])
+        return
+
+    pool = get_parsing_pool()
+    futures = {
+        pool.submit(parse_upload_bytes, upload.data, upload.file_type): upload
+        for upload in uploads
+    }
+    for future in as_completed(futures):
+        try:
+            yield ParsedUpload(futures[future], frame=future.result())
+        except Exception as e:
+            yield ParsedUpload(futures[future], error=e)
+
+
+def _parse(upload: Upload) -> ParsedUpload:
+    try:
+        return ParsedUpload(
+            upload, frame=parse_upload_bytes(upload.data, upload.file_type)
+        )
+    except Exception as e:
+        return ParsedUpload(upload, error=e)
+
+
+def detect_uploads(files) -> tuple[list[Upload], list[str]]:
+    """
+    Uploads of the files whose type was detected, and why the others weren't.
+
+    A file uploaded twice is kept once, and files sharing a name are told
+    apart by a suffix, as names identify the files in the review.
+    """
+    uploads: list[Upload] = []
+    rejected: list[str] = []
+    keys: set[str] = set()
+    names: set[str] = set()
+    for file in files:
+        try:
+            upload = Upload.detect(file.name, file.getvalue())
+        except ValueError as e:
+            rejected.append(f"{file.name}: {e}")
+            continue
+        if upload.key in keys:
+            rejected.append(f"{file.name}: same content as another file, skipped")
+            continue
+        name, copy = upload.name, 1
+        while name in names:
+            copy += 1
+            name = f"{upload.name} ({copy})"
+        keys.add(upload.key)
+        names.add(name)
+        uploads.append(replace(upload, name=name))
+    return uploads, rejected
@@ -1,15 +1,38 @@
-from datetime import datetime
-from typing import Dict, List
+import time
+from typing import Dict
 
+import numpy as np
 import pandas as pd
 import streamlit as st
 
 from src.envs import FINANCE_DASHBOARD_ID
-from src.notion_gateway import NotionAPIGateway
+from src.money import format_brl, parse_brl, to_reais
+from src.notion_sync_expenses.category_mapper import CategoryEnum
+from src.notion_sync_expenses.expense_store import record_pages
+from src.streamlit_app.resources import (
+    get_category_mapper,
+    get_expense_store,
+    get_merchant_canonicalizer,
+    get_monthly_summary,
+    get_notion_gateway,
+)
+from src.streamlit_app.processors.csv_parser import SOURCE_FILE_COLUMN
 
+# Seconds between updates of the send progress widgets
+PROGRESS_INTERVAL = 0.1
 
-def transform_data_for_notion(df: pd.DataFrame) -> pd.DataFrame:
-    """Transform CSV data into Notion-compatible format."""
+
+def transform_data_for_notion(
+    df: pd.DataFrame, payment_methods: dict[str, str] | None = None
+) -> pd.DataFrame:
+    """
+    Transform CSV data into Notion-compatible format.
+
+    Rows of a source file in `payment_methods` get that file's payment method,
+    the others the session's default one. Rows with an invalid date or amount
+    are kept with the raw text and no month, so `invalid_notion_rows` flags
+    them for review instead of the row disappearing.
+    """
     if df.empty:
         return df
 
@@ -18,41 +41,57 @@ def transform_data_for_notion(df: pd.DataFrame) -> pd.DataFrame:
             st.error("Finance dashboard ID not configured")
             return df
 
-        preview_data = []
-        for _, row in df.iterrows():
-            try:
-                date_obj = datetime.strptime(row["Data"], "%d/%m/%Y")
-                month = date_obj.strftime("%m - %b").upper()
-
-                # Support negative/positive values with comma decimals
-                value = float(
-                    str(row["Valor"])  # type: ignore
-                    .replace("R$", "")
-                    .replace(" ", "")
-                    .replace(".", "")
-                    .replace(",", ".")
-                    .strip()
-                )
-
-                preview_data.append(
-                    {
-                        "Month": month,
-                        "Bank Description": row["Lançamento"],
-                        "Category": row["Categoria"],
-                        "Value": f"R$ {value:.2f}".replace(".", ","),
-                        "Date": date_obj.strftime("%d/%m/%Y"),
-                        "Payment": st.session_state.get(
-                            "default_payment_method", "CREDIT_CARD"
-                        ),
-                        "Type": "NON-ESSENTIAL",
-                        "SOURCE": "AUTOMATION",
-                    }
-                )
-            except Exception as e:
-                st.error(f"Error processing row: {str(e)}")
-                continue
-
-        return pd.DataFrame(preview_data) if preview_data else pd.DataFrame()
+        categories = df["Categoria"].astype(object).copy()
+        unassigned = categories.isna() | categories.isin(["", CategoryEnum.UNASSIGNED])
+        if unassigned.any():
+            canonicalizer = get_merchant_canonicalizer()
+            merchants = canonicalizer.canonicalize_series(
+                df.loc[unassigned, "Lançamento"]
+            )
+            canonicalizer.save()
+            categories[unassigned] = (
+                get_category_mapper()
+                .map_descriptions(merchants)
+                .fillna(CategoryEnum.UNASSIGNED)
+            )
+
+        # Parse every amount once, signed and exact, and format them together
+        amounts = parse_brl(df["Valor"])
+        values = format_brl(amounts.cents)
+
+        default_payment = st.session_state.get("default_payment_method", "CREDIT_CARD")
+        payments = pd.Series(default_payment, index=df.index, dtype=object)
+        if payment_methods and SOURCE_FILE_COLUMN in df.columns:
+            payments = (
+                df[SOURCE_FILE_COLUMN]
+                .astype(object)
+                .map(payment_methods)
+                .fillna(default_payment)
+            )
+
+        # Whole columns at once: each distinct date is parsed once by pandas
+        dates = pd.to_datetime(df["Data"], format="%d/%m/%Y", errors="coerce")
+
+        # Keep the source row labels so edits and errors map back to the raw data
+        notion_data = pd.DataFrame(
+            {
+                "Month": dates.dt.strftime("%m - %b").str.upper(),
+                "Bank Description": df["Lançamento"],
+                "Category": categories,
+                "Value": values.where(~amounts.invalid, df["Valor"]),
+                "Date": dates.dt.strftime("%d/%m/%Y").fillna(df["Data"]),
+                "Payment": payments,
+                "Type": "NON-ESSENTIAL",
+                "SOURCE": "AUTOMATION",
+            },
+            index=df.index,
+        )
+        notion_data.index.name = df.index.name or "Line"
+        if SOURCE_FILE_COLUMN in df.columns:
+            notion_data.insert(
+                0, "File", df.loc[notion_data.index, SOURCE_FILE_COLUMN].array
+            )
+        return notion_data
     except Exception as e:
         st.error(f"Error creating editable preview: {str(e)}")
         return pd.DataFrame()
@@ -60,35 +99,103 @@ def transform_data_for_notion(df: pd.DataFrame) -> pd.DataFrame:
 
 def build_notion_payload(row: pd.Series) -> Dict:
     """Build Notion API payload from a data row."""
-    return {
-        "parent": {"database_id": FINANCE_DASHBOARD_ID},
-        "properties": {
-            "Month": {"select": {"name": row["Month"]}},
-            "Bank Description": {
-                "rich_text": [{"text": {"content": row["Bank Description"]}}]
-            },
-            "Category": {"select": {"name": row["Category"]}},
-            "Value": {
-                "number": float(
-                    str(row["Value"]).replace("R$", "").replace(",", ".").strip()
-                )
-            },
-            "Date": {
-                "date": {
-                    "start": datetime.strptime(row["Date"], "%d/%m/%Y").strftime(
-                        "%Y-%m-%d"
-                    )
-                }
+    payloads, invalid = build_notion_payloads(row.to_frame().T)
+    if invalid:
+        raise ValueError(f"Invalid date or amount: {row['Date']!r}, {row['Value']!r}")
+    return payloads[0][1]
+
+
+def build_notion_payloads(
+    data: pd.DataFrame,
+) -> tuple[list[tuple[int, Dict]], list[int]]:
+    """
+    Notion API payloads of every row, built from whole columns.
+
+    Returns the payloads keyed by row position, and the positions of the rows
+    whose date or amount is invalid, which get no payload.
+    """
+    dates = pd.to_datetime(data["Date"], format="%d/%m/%Y", errors="coerce")
+    amounts = parse_brl(data["Value"])
+    invalid = (dates.isna() | amounts.invalid).to_numpy(dtype=bool)
+    # Rows whose date was fixed in the editor have no month yet
+    months = data["Month"].astype(object)
+    months = months.where(
+        months.notna() & months.ne(""), dates.dt.strftime("%m - %b").str.upper()
+    )
+
+    columns = zip(
+        months.to_numpy(dtype=object),
+        data["Bank Description"].to_numpy(dtype=object),
+        data["Category"].to_numpy(dtype=object),
+        map(to_reais, amounts.cents.tolist()),
+        dates.dt.strftime("%Y-%m-%d").to_numpy(dtype=object),
+        data["Payment"].to_numpy(dtype=object),
+        data["Type"].to_numpy(dtype=object),
+        data["SOURCE"].to_numpy(dtype=object),
+        invalid,
+    )
+    payloads = []
+    for position, (
+        month,
+        description,
+        category,
+        value,
+        date,
+        payment,
+        expense_type,
+        source,
+        failed,
+    ) in enumerate(columns):
+        if failed:
+            continue
+        payload = {
+            "parent": {"database_id": FINANCE_DASHBOARD_ID},
+            "properties": {
+                "Month": {"select": {"name": month}},
+                "Bank Description": {"rich_text": [{"text": {"content": description}}]},
+                "Category": {"select": {"name": category}},
+                "Value": {"number": value},
+                "Date": {"date": {"start": date}},
+                "Payment": {"select": {"name": payment}},
+                "Type": {"select": {"name": expense_type}},
+                "SOURCE": {"select": {"name": source}},
             },
-            "Payment": {"select": {"name": row["Payment"]}},
-            "Type": {"select": {"name": row["Type"]}},
-            "SOURCE": {"select": {"name": row["SOURCE"]}},
-        },
-    }
+        }
+        payloads.append((position, payload))
+    return payloads, np.flatnonzero(invalid).tolist()
+
+
+def remember_corrections(suggested: pd.DataFrame, edited: pd.DataFrame) -> int:
+    """
+    Remember the categories the user changed from the suggested ones.
 
+    Corrections are keyed by merchant, so next uploads of the same merchants
+    are categorized as the user left them. Returns how many rows changed.
+    """
+    # Rows added in the editor had no suggestion, so there's nothing to correct
+    edited = edited.loc[edited.index.intersection(suggested.index)]
+    suggestions = suggested["Category"].reindex(edited.index).astype(object)
+    changed = edited["Category"].astype(object).ne(suggestions)
+    if not changed.any():
+        return 0
+    merchants = get_merchant_canonicalizer().canonicalize_series(
+        edited.loc[changed, "Bank Description"]
+    )
+    get_category_mapper().memory.remember(
+        dict(zip(merchants, edited.loc[changed, "Category"]))
+    )
+    return int(changed.sum())
 
-def send_to_notion(data_df: pd.DataFrame) -> bool:
-    """Send data to Notion database."""
+
+def send_to_notion(
+    data_df: pd.DataFrame, suggested: pd.DataFrame | None = None
+) -> bool:
+    """
+    Send data to Notion database.
+
+    Given the `suggested` data the editors started from, the category
+    corrections are remembered once rows were sent.
+    """
     if not FINANCE_DASHBOARD_ID:
         st.error("Finance dashboard ID not configured in environment variables")
         return False
@@ -97,30 +204,57 @@ def send_to_notion(data_df: pd.DataFrame) -> bool:
         st.warning("No data to send")
         return False
 
-    notion_gateway = NotionAPIGateway()
+    notion_gateway = get_notion_gateway()
     success_count = 0
     error_count = 0
 
     progress_bar = st.progress(0)
     status_text = st.empty()
 
-    for i, (_, row) in enumerate(data_df.iterrows()):
-        try:
-            payload = build_notion_payload(row)
-            notion_gateway.insert_row_to_notion(payload)
-            success_count += 1
+    payloads, invalid = build_notion_payloads(data_df)
+    if invalid:
+        error_count += len(invalid)
+        rows = ", ".join(str(position + 1) for position in invalid[:10])
+        more = f" and {len(invalid) - 10} more" if len(invalid) > 10 else ""
+        st.error(f"Invalid date or amount in row(s) {rows}{more}; not sent")
 
-            progress = (i + 1) / len(data_df)
-            progress_bar.progress(progress)
-            status_text.text(f"Processing row {i + 1} of {len(data_df)}...")
-
-        except Exception as e:
+    created = []
+    shown_at = 0.0
+    for done, result in enumerate(notion_gateway.create_pages(payloads), start=1):
+        if result.ok:
+            created.append(result.response)
+            success_count += 1
+        else:
             error_count += 1
-            st.error(f"Failed to send row {i + 1}: {str(e)}")
+            st.error(f"Failed to send row {result.key + 1}: {str(result.error)}")
+
+        # Every update is a message to the browser, so they're throttled
+        now = time.monotonic()
+        if now - shown_at >= PROGRESS_INTERVAL or done == len(payloads):
+            shown_at = now
+            progress_bar.progress(done / len(payloads))
+            status_text.text(f"Processing row {done} of {len(payloads)}...")
 
     progress_bar.empty()
     status_text.empty()
 
+    # Sent expenses show up in the reports page without reading them back
+    try:
+        record_pages(
+            get_expense_store(),
+            created,
+            get_merchant_canonicalizer(),
+            get_monthly_summary(),
+        )
+    except Exception as e:
+        st.warning(f"Sent expenses weren't added to the local store: {str(e)}")
+
+    if suggested is not None and success_count:
+        try:
+            remember_corrections(suggested, data_df)
+        except Exception as e:
+            st.warning(f"Category corrections weren't remembered: {str(e)}")
+
     if error_count == 0:
         st.success(f"✅ Successfully sent {success_count} rows to Notion!")
         return True
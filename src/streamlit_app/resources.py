@@ -0,0 +1,92 @@
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+import pandas as pd
+import streamlit as st
+
+from src.envs import SUMMARY_DATABASE_ID
+from src.notion_gateway import NotionAPIGateway, get_shared_gateway
+from src.notion_sync_expenses.category_classifier import load_category_classifier
+from src.notion_sync_expenses.category_mapper import CategoryMapper
+from src.notion_sync_expenses.expense_store import ExpenseStore
+from src.notion_sync_expenses.merchant_canonicalizer import MerchantCanonicalizer
+from src.notion_sync_expenses.summary import MonthlySummary
+
+# Parsed uploads kept by content, as with the single-file cache_data it replaces
+PARSED_UPLOADS_MAX_ENTRIES = 16
+
+
+class ParsedFrames:
+    """
+    Frames of recently parsed uploads by upload key, least recently used out.
+
+    Sessions get copies, so the review never edits a cached frame.
+    """
+
+    def __init__(self, max_entries: int = PARSED_UPLOADS_MAX_ENTRIES) -> None:
+        self.max_entries = max_entries
+        self._frames: OrderedDict[str, pd.DataFrame] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> pd.DataFrame | None:
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is None:
+                return None
+            self._frames.move_to_end(key)
+        return frame.copy()
+
+    def put(self, key: str, frame: pd.DataFrame) -> None:
+        with self._lock:
+            self._frames[key] = frame.copy()
+            self._frames.move_to_end(key)
+            while len(self._frames) > self.max_entries:
+                self._frames.popitem(last=False)
+
+
+@st.cache_resource
+def get_notion_gateway() -> NotionAPIGateway:
+    """Notion gateway shared by every session of this Streamlit server."""
+    return get_shared_gateway()
+
+
+@st.cache_resource
+def get_category_mapper() -> CategoryMapper:
+    """Category mapper shared by every session of this Streamlit server."""
+    return CategoryMapper(classifier=load_category_classifier())
+
+
+@st.cache_resource
+def get_merchant_canonicalizer() -> MerchantCanonicalizer:
+    """Merchant canonicalizer (and its memo cache) shared by every session."""
+    return MerchantCanonicalizer()
+
+
+@st.cache_resource
+def get_expense_store() -> ExpenseStore:
+    """Local store of synced expenses, fed by sends and read by the reports page."""
+    return ExpenseStore()
+
+
+@st.cache_resource
+def get_monthly_summary() -> MonthlySummary | None:
+    """Summary database updated by sends, when SUMMARY_DATABASE_ID is set."""
+    if not SUMMARY_DATABASE_ID:
+        return None
+    return MonthlySummary(get_notion_gateway(), SUMMARY_DATABASE_ID)
+
+
+@st.cache_resource
+def get_parsing_pool() -> ProcessPoolExecutor:
+    """Worker processes parsing multi-file uploads, shared by every session."""
+    # Spawned rather than forked: the server's threads may hold locks
+    return ProcessPoolExecutor(os.cpu_count() or 1, mp_context=get_context("spawn"))
+
+
+@st.cache_resource
+def get_parsed_frames() -> ParsedFrames:
+    """Parsed uploads shared by every session, so a rerun never parses twice."""
+    return ParsedFrames()
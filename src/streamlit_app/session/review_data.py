@@ -0,0 +1,263 @@
+import json
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+import pandas as pd
+import streamlit as st
+
+from src.notion_sync_expenses.category_mapper import CategoryEnum
+from src.streamlit_app.processors.csv_parser import SOURCE_FILE_COLUMN
+from src.streamlit_app.processors.notion_processor import transform_data_for_notion
+from src.streamlit_app.validators.data_validator import invalid_notion_rows
+
+RAW_EDITOR_KEY = "raw_data_editor"
+NOTION_EDITOR_KEY = "notion_data_editor"
+WINDOW_EDITOR_KEY = "notion_window_editor"
+# Column name st.data_editor uses for index cells in its edit state
+INDEX_IDENTIFIER = "_index"
+# Uploads above this size open in windowed review by default
+WINDOWED_REVIEW_MIN_ROWS = 1000
+
+
+class ReviewFilter(StrEnum):
+    ALL = "All rows"
+    UNASSIGNED = "UNASSIGNED only"
+    INVALID = "Invalid only"
+    CATEGORY = "By category"
+
+
+@dataclass
+class ReviewWindow:
+    """
+    Windowed review of the Notion data, one page of rows at a time.
+
+    Edits are kept as sparse overrides keyed by `Line`, so a page can be
+    replaced by another without losing what was edited on it. The page on
+    screen is edited through its own data editor; those edits are folded into
+    the overrides whenever the page or the filter changes, or before a bulk action.
+    """
+
+    overrides: pd.DataFrame = field(default_factory=pd.DataFrame)
+    removed: set[int] = field(default_factory=set)
+    generation: int = 0
+    # Lines of the page last given to the window editor
+    lines: pd.Index = field(default_factory=lambda: pd.Index([]))
+
+    @property
+    def editor_key(self) -> str:
+        return f"{WINDOW_EDITOR_KEY}_{self.generation}"
+
+    def pending(self) -> pd.DataFrame:
+        """Edits made on the current page that aren't in `overrides` yet."""
+        edited_rows = editor_changes(self.editor_key)["edited_rows"]
+        rows = {
+            self.lines[int(position)]: {
+                name: value
+                for name, value in changes.items()
+                if name != INDEX_IDENTIFIER
+            }
+            for position, changes in edited_rows.items()
+        }
+        return pd.DataFrame.from_dict(rows, orient="index", dtype=object)
+
+    def commit(self) -> None:
+        """Fold the current page's edits into the overrides and start a new page."""
+        pending = self.pending()
+        if not pending.empty:
+            self.overrides = pending.combine_first(self.overrides)
+        st.session_state.pop(self.editor_key, None)
+        self.generation += 1
+
+    def set_category(self, lines: pd.Index, category: str) -> None:
+        """Set the category of every line in `lines` in one vectorized update."""
+        self.commit()
+        update = pd.DataFrame({"Category": category}, index=lines, dtype=object)
+        self.overrides = update.combine_first(self.overrides)
+
+    def remove(self, lines: pd.Index) -> None:
+        """Leave every line in `lines` out of the data sent to Notion."""
+        self.commit()
+        self.removed.update(int(line) for line in lines)
+
+    def apply(
+        self, notion_data: pd.DataFrame, with_pending: bool = True
+    ) -> pd.DataFrame:
+        """
+        Derive the edited Notion data from the overrides.
+
+        Like `apply_editor_changes`, only the overridden columns are copied.
+        """
+        overrides = self.overrides
+        if with_pending:
+            pending = self.pending()
+            if not pending.empty:
+                overrides = pending.combine_first(overrides)
+
+        columns = {name: notion_data[name] for name in notion_data.columns}
+        for name in overrides.columns.intersection(notion_data.columns):
+            values = overrides[name].dropna()
+            values = values[values.index.isin(notion_data.index)]
+            if not values.empty:
+                columns[name] = notion_data[name].astype(object)
+                columns[name].loc[values.index] = values.to_numpy()
+        view = pd.DataFrame(columns, index=notion_data.index, copy=False)
+
+        if self.removed:
+            view = view.drop(index=list(self.removed), errors="ignore")
+        return view
+
+    def matching(
+        self,
+        view: pd.DataFrame,
+        row_filter: ReviewFilter,
+        category: str | None = None,
+    ) -> pd.Index:
+        """Lines of `view` that pass the filter, computed over whole columns."""
+        categories = view["Category"]
+        if row_filter == ReviewFilter.UNASSIGNED:
+            mask = categories.isna() | categories.isin(["", CategoryEnum.UNASSIGNED])
+        elif row_filter == ReviewFilter.INVALID:
+            mask = invalid_notion_rows(view)
+        elif row_filter == ReviewFilter.CATEGORY:
+            mask = categories == category
+        else:
+            return view.index
+        return view.index[mask.to_numpy(dtype=bool)]
+
+
+@dataclass
+class ReviewData:
+    """
+    One upload under review: the canonical parsed frame and nothing else.
+
+    An upload of several files is reviewed as one frame, its rows tagged
+    with the file they came from and paid with that file's payment method.
+
+    User edits live only in the data editors' widget state, a sparse record of
+    edited cells, deleted rows and added rows relative to the frame each editor
+    was given. Edited views are derived from it when needed instead of storing
+    full copies per step in the session.
+    """
+
+    base: pd.DataFrame
+    # Payment method of the rows of each source file
+    payment_methods: dict[str, str] = field(default_factory=dict)
+    window: ReviewWindow = field(default_factory=ReviewWindow)
+    _notion_cache: tuple[str, pd.DataFrame] | None = field(
+        default=None, repr=False, compare=False
+    )
+
+    @classmethod
+    def from_upload(cls, df: pd.DataFrame) -> "ReviewData":
+        """Build the canonical frame: string columns and a 1-based `Line` index."""
+        base = df.astype("string")
+        base.index = pd.RangeIndex(1, len(base) + 1, name="Line")
+        return cls(base=base)
+
+    @classmethod
+    def from_uploads(
+        cls, frames: dict[str, pd.DataFrame], payment_methods: dict[str, str]
+    ) -> "ReviewData":
+        """Review the frames of several files, in order, as one upload."""
+        combined = pd.concat(
+            [
+                frame.assign(**{SOURCE_FILE_COLUMN: name})
+                for name, frame in frames.items()
+            ],
+            ignore_index=True,
+        )
+        columns = [SOURCE_FILE_COLUMN, *combined.columns.drop(SOURCE_FILE_COLUMN)]
+        review = cls.from_upload(combined[columns])
+        review.payment_methods = payment_methods
+        return review
+
+    @property
+    def deleted_lines(self) -> set[int]:
+        """Lines the user deleted in the raw editor."""
+        deleted = editor_changes(RAW_EDITOR_KEY)["deleted_rows"]
+        return {int(self.base.index[position]) for position in deleted}
+
+    def raw_view(self) -> pd.DataFrame:
+        """The raw data with the user's edits from the raw editor applied."""
+        return apply_editor_changes(self.base, editor_changes(RAW_EDITOR_KEY))
+
+    def notion_data(self) -> pd.DataFrame:
+        """
+        The Notion-formatted rows of the raw view.
+
+        Only recomputed when the raw edits or the default payment method change,
+        so reruns of the Notion editor don't repeat categorization.
+        """
+        fingerprint = json.dumps(
+            [
+                editor_changes(RAW_EDITOR_KEY),
+                st.session_state.get("default_payment_method"),
+            ],
+            sort_keys=True,
+            default=str,
+        )
+        if self._notion_cache is None or self._notion_cache[0] != fingerprint:
+            self._notion_cache = (
+                fingerprint,
+                transform_data_for_notion(self.raw_view(), self.payment_methods),
+            )
+        return self._notion_cache[1]
+
+
+def editor_changes(key: str) -> dict[str, Any]:
+    """The sparse edit state of a data editor, with every field present."""
+    state = st.session_state.get(key) or {}
+    return {
+        "edited_rows": state.get("edited_rows", {}),
+        "deleted_rows": state.get("deleted_rows", []),
+        "added_rows": state.get("added_rows", []),
+    }
+
+
+def clear_editor_changes() -> None:
+    """Drop editor state so stale edits aren't replayed onto a new upload."""
+    for key in list(st.session_state.keys()):
+        if key in (RAW_EDITOR_KEY, NOTION_EDITOR_KEY) or str(key).startswith(
+            WINDOW_EDITOR_KEY
+        ):
+            del st.session_state[key]
+
+
+def apply_editor_changes(base: pd.DataFrame, changes: dict[str, Any]) -> pd.DataFrame:
+    """
+    Derive the edited view of `base` from a data editor's edit state.
+
+    Mirrors what st.data_editor returns, but only copies the columns that
+    were actually edited; without changes `base` itself is returned.
+    """
+    edited_rows = changes["edited_rows"]
+    deleted_rows = changes["deleted_rows"]
+    added_rows = changes["added_rows"]
+    if not (edited_rows or deleted_rows or added_rows):
+        return base
+
+    columns = {name: base[name] for name in base.columns}
+    for position, row_changes in edited_rows.items():
+        for name, value in row_changes.items():
+            if name == INDEX_IDENTIFIER or name not in columns:
+                continue
+            if columns[name] is base[name]:
+                columns[name] = base[name].copy()
+            columns[name].iat[int(position)] = value
+    view = pd.DataFrame(columns, index=base.index, copy=False)
+
+    if deleted_rows:
+        view = view.drop(index=base.index[[int(row) for row in deleted_rows]])
+
+    if added_rows:
+        next_label = int(base.index.max()) + 1 if len(base) else 1
+        added = pd.DataFrame(
+            [{k: v for k, v in row.items() if k in columns} for row in added_rows],
+            columns=base.columns,
+            index=pd.RangeIndex(next_label, next_label + len(added_rows)),
+        ).astype(base.dtypes.to_dict())
+        view = pd.concat([view, added])
+        view.index.name = base.index.name
+
+    return view
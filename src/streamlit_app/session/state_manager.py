@@ -1,27 +1,24 @@
 import streamlit as st
 
+from src.streamlit_app.session.review_data import clear_editor_changes
+
 
 def initialize_session_state():
     """Initialize all required session state variables."""
-    if "data_df" not in st.session_state:
-        st.session_state.data_df = None
-    if "edited_data" not in st.session_state:
-        st.session_state.edited_data = None
-    if "edited_notion_data" not in st.session_state:
-        st.session_state.edited_notion_data = None
-    if "rows_to_delete" not in st.session_state:
-        st.session_state.rows_to_delete = set()
+    if "review" not in st.session_state:
+        st.session_state.review = None
     if "default_payment_method" not in st.session_state:
         st.session_state.default_payment_method = "CREDIT_CARD"
-    if "file_type" not in st.session_state:
-        st.session_state.file_type = "CREDIT_CARD_INVOICE"
+    if "upload_key" not in st.session_state:
+        st.session_state.upload_key = None
+    if "upload_errors" not in st.session_state:
+        st.session_state.upload_errors = []
 
 
 def reset_session_state():
     """Reset session state after successful sync."""
-    st.session_state.data_df = None
-    st.session_state.edited_data = None
-    st.session_state.edited_notion_data = None
-    st.session_state.rows_to_delete = set()
+    st.session_state.review = None
+    clear_editor_changes()
     st.session_state.default_payment_method = "CREDIT_CARD"
-    st.session_state.file_type = "CREDIT_CARD_INVOICE"
+    st.session_state.upload_key = None
+    st.session_state.upload_errors = []
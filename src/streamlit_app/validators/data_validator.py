@@ -1,8 +1,11 @@
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
+import numpy as np
 import pandas as pd
 
+from src.money import parse_brl
+
 
 def validate_data(df: pd.DataFrame) -> Dict[str, Any]:
     """Validate the CSV data for required columns and formats."""
@@ -21,30 +24,58 @@ def validate_data(df: pd.DataFrame) -> Dict[str, Any]:
     if "Tipo" not in df.columns:
         validation_results["warnings"].append("Optional column missing: Tipo")
 
-    # Determine if index is already 1-based (from UI editors)
+    # Determine if index is already 1-based (from UI editors); "Line" labels
+    # survive row deletions, so they're used as-is even when line 1 is gone
     try:
-        index_is_one_based = int(getattr(df.index, "min", lambda: 0)()) == 1  # type: ignore[attr-defined]
+        index_is_one_based = (
+            df.index.name == "Line"
+            or int(getattr(df.index, "min", lambda: 0)()) == 1  # type: ignore[attr-defined]
+        )
     except Exception:
         index_is_one_based = False
     index_offset = 0 if index_is_one_based else 1
 
-    for idx, row in df.iterrows():
-        try:
-            datetime.strptime(row["Data"], "%d/%m/%Y")
-        except (ValueError, TypeError):
+    if "Data" in df.columns:
+        invalid_dates = _failing(
+            df["Data"], lambda value: datetime.strptime(value, "%d/%m/%Y")
+        )
+        for idx, value in df.loc[invalid_dates, "Data"].items():
             row_num = (idx + index_offset) if isinstance(idx, int) else str(idx)
             validation_results["warnings"].append(
-                f"Row {row_num}: Invalid date format '{row['Data']}' (expected DD/MM/YYYY)"
+                f"Row {row_num}: Invalid date format '{value}' (expected DD/MM/YYYY)"
             )
 
-    for idx, row in df.iterrows():
-        try:
-            value_str = str(row["Valor"]).replace("R$", "").replace(",", ".").strip()
-            float(value_str)
-        except (ValueError, TypeError):
+    if "Valor" in df.columns:
+        invalid_values = parse_brl(df["Valor"]).invalid
+        for idx, value in df.loc[invalid_values, "Valor"].items():
             row_num = (idx + index_offset) if isinstance(idx, int) else str(idx)
             validation_results["warnings"].append(
-                f"Row {row_num}: Invalid value format '{row['Valor']}'"
+                f"Row {row_num}: Invalid value format '{value}'"
             )
 
     return validation_results
+
+
+def _failing(values: pd.Series, parse: Callable[[Any], Any]) -> np.ndarray:
+    """Mask of values `parse` rejects, parsing each distinct value once."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    failed = np.zeros(len(uniques), dtype=bool)
+    for position, value in enumerate(uniques):
+        try:
+            parse(value)
+        except (ValueError, TypeError):
+            failed[position] = True
+    return failed[codes]
+
+
+def invalid_notion_rows(df: pd.DataFrame) -> pd.Series:
+    """
+    Mask of Notion rows that would fail to build a payload.
+
+    Checks the same formats as `build_notion_payload` over whole columns, so
+    large frames can be filtered without a per-row loop.
+    """
+    dates = pd.to_datetime(df["Date"], format="%d/%m/%Y", errors="coerce")
+    invalid_values = parse_brl(df["Value"]).invalid
+    categories = df["Category"].astype("string").fillna("").str.strip()
+    return dates.isna() | invalid_values | categories.eq("").astype(bool)
@@ -0,0 +1,67 @@
+"""Test cases for the learned category classifier."""
+
+import pandas as pd
+
+from src.notion_sync_expenses.category_classifier import CategoryClassifier
+from src.notion_sync_expenses.category_mapper import CategoryMapper
+
+DESCRIPTIONS = [
+    "PADARIA PAO QUENTE",
+    "PADARIA BOM DIA",
+    "PADARIA CENTRAL",
+    "POSTO SHELL",
+    "POSTO IPIRANGA",
+    "POSTO BR",
+]
+CATEGORIES = ["Food", "Food", "Food", "Transport", "Transport", "Transport"]
+
+
+class TestCategoryClassifier:
+    """Test cases for CategoryClassifier."""
+
+    def test_predicts_unseen_descriptions(self):
+        """Test that shared n-grams carry over to unseen merchants."""
+        classifier = CategoryClassifier.fit(DESCRIPTIONS, CATEGORIES)
+
+        predicted, confidence = classifier.predict(["Padaria Nova", "POSTO ALE"])
+
+        assert predicted.tolist() == ["Food", "Transport"]
+        assert (confidence > 0.5).all()
+
+    def test_save_and_load(self, tmp_path):
+        """Test that a persisted model predicts the same as the original."""
+        classifier = CategoryClassifier.fit(DESCRIPTIONS, CATEGORIES)
+        classifier.save(tmp_path / "model.npz")
+
+        loaded = CategoryClassifier.load(tmp_path / "model.npz")
+
+        assert (
+            loaded.predict(DESCRIPTIONS)[0].tolist()
+            == classifier.predict(DESCRIPTIONS)[0].tolist()
+        )
+
+
+class TestCategoryMapperFallback:
+    """Test cases for the classifier fallback in CategoryMapper."""
+
+    def test_rules_win_and_classifier_fills_the_rest(self):
+        """Test the rule pass runs first and low confidence stays unmapped."""
+        mapper = CategoryMapper(
+            classifier=CategoryClassifier.fit(DESCRIPTIONS, CATEGORIES),
+            min_confidence=0.9,
+        )
+        df = pd.DataFrame(
+            {
+                "description": ["UBER *TRIP", "PADARIA DO ZE", "XYZ", "NETFLIX"],
+                "category": [None, None, None, "Leisure"],
+            }
+        )
+
+        mapped = mapper.map_dataframe(df, "description", "category")["category"]
+
+        assert mapped.fillna("UNMAPPED").tolist() == [
+            "Transport",
+            "Food",
+            "UNMAPPED",
+            "Leisure",
+        ]
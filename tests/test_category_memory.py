@@ -0,0 +1,99 @@
+"""Test cases for the remembered category corrections."""
+
+import sqlite3
+import time
+
+import pandas as pd
+
+from src.enums import CategoryEnum
+from src.notion_sync_expenses.category_mapper import CategoryMapper
+from src.notion_sync_expenses.category_memory import CategoryMemory
+from src.notion_sync_expenses.category_rules import CategoryRules
+
+RULES = 'version = 1\n[[rules]]\npattern = "UBER"\ncategory = "Transport"\n'
+
+
+class TestCategoryMemory:
+    """Test cases for CategoryMemory."""
+
+    def test_remember_and_forget(self, tmp_path):
+        """Test that corrections are looked up and UNASSIGNED forgets them."""
+        memory = CategoryMemory(tmp_path / "memory.sqlite")
+
+        memory.remember({"PADARIA DO ZE": "Food", "UBER": "Leisure"})
+        memory.remember({"UBER": CategoryEnum.UNASSIGNED, "": "Food"})
+
+        assert memory.lookup(["PADARIA DO ZE", "UBER", "XYZ"]) == {
+            "PADARIA DO ZE": "Food"
+        }
+        assert len(memory) == 1
+
+    def test_other_connections_see_corrections(self, tmp_path):
+        """Test that a correction made elsewhere reaches a memory already loaded."""
+        path = tmp_path / "memory.sqlite"
+        reader = CategoryMemory(path)
+        assert reader.lookup(["NETFLIX"]) == {}
+
+        CategoryMemory(path).remember({"NETFLIX": "Subscription"})
+
+        assert reader.lookup(["NETFLIX"]) == {"NETFLIX": "Subscription"}
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the size bound drops the merchants used longest ago."""
+        memory = CategoryMemory(tmp_path / "memory.sqlite", max_entries=2)
+        memory.remember({"A": "Food"})
+        memory.remember({"B": "Home"})
+        time.sleep(0.01)
+        memory.lookup(["A"])
+
+        memory.remember({"C": "Health"})
+
+        assert memory.lookup(["A", "B", "C"]) == {"A": "Food", "C": "Health"}
+
+    def test_lookups_defer_their_writes(self, tmp_path):
+        """Test that a lookup writes nothing until the memory is flushed."""
+        path = tmp_path / "memory.sqlite"
+        memory = CategoryMemory(path)
+        memory.remember({"A": "Food"})
+        other = sqlite3.connect(path)
+        (before,) = other.execute("SELECT used_at FROM corrections").fetchone()
+        (version,) = other.execute("PRAGMA data_version").fetchone()
+        time.sleep(0.01)
+
+        assert memory.lookup(["A"]) == {"A": "Food"}
+        assert other.execute("PRAGMA data_version").fetchone() == (version,)
+
+        memory.flush()
+
+        (after,) = other.execute("SELECT used_at FROM corrections").fetchone()
+        assert after > before
+        other.close()
+
+    def test_evicts_stale_entries(self, tmp_path):
+        """Test that merchants unused for longer than the maximum age are dropped."""
+        path = tmp_path / "memory.sqlite"
+        CategoryMemory(path).remember({"OLD SHOP": "Home"})
+        time.sleep(0.01)
+
+        memory = CategoryMemory(path, max_age_days=0.005 / 86400)
+
+        assert memory.lookup(["OLD SHOP"]) == {}
+
+
+class TestCategoryMapperMemory:
+    """Test cases for corrections in CategoryMapper."""
+
+    def test_corrections_win_over_rules(self, tmp_path):
+        """Test that a remembered merchant skips the rules and the rest don't."""
+        rules_path = tmp_path / "rules.toml"
+        rules_path.write_text(RULES, encoding="utf-8")
+        memory = CategoryMemory(tmp_path / "memory.sqlite")
+        memory.remember({"UBER EATS": "Food"})
+        mapper = CategoryMapper(
+            rules=CategoryRules(rules_path, cache_dir=None), memory=memory
+        )
+
+        mapped = mapper.map_descriptions(pd.Series(["UBER EATS", "UBER", "UBER EATS"]))
+
+        assert mapped.tolist() == ["Food", CategoryEnum.TRANSPORT, "Food"]
+        assert mapper.map_category("UBER EATS") == "Food"
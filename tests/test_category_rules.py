@@ -0,0 +1,154 @@
+"""Test cases for the category rules file and its hot reload."""
+
+import time
+
+import pytest
+
+from src.enums import CategoryEnum
+from src.notion_sync_expenses.category_mapper import CategoryMapper
+from src.notion_sync_expenses.category_rules import (
+    CategoryRules,
+    load_rules,
+    parse_rules,
+)
+
+RULES = """
+version = 1
+
+[[rules]]
+pattern = "PAGAMENTOS"
+category = "Service"
+
+[[rules]]
+pattern = "UBER"
+category = "Transport"
+priority = 10
+
+[[rules]]
+pattern = "UBER EATS|IFOOD"
+category = "Food"
+priority = 20
+"""
+
+
+def _write(path, text: str):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+class TestCompiledRules:
+    """Test cases for loading and matching rules."""
+
+    def test_priority_then_file_order(self, tmp_path):
+        """Test that higher priorities win wherever their match is."""
+        rules = load_rules(_write(tmp_path / "rules.toml", RULES), cache_dir=None)
+
+        assert rules.match("UBER EATS PAGAMENTOS") == CategoryEnum.FOOD
+        assert rules.match("PAGAMENTOS UBER") == CategoryEnum.TRANSPORT
+        assert rules.match("pagamentos") == CategoryEnum.SERVICE
+        assert rules.match("PADARIA") is None
+
+    def test_cache_is_keyed_by_content(self, tmp_path):
+        """Test that the cached form is reused, and ignored once the file changes."""
+        path = _write(tmp_path / "rules.toml", RULES)
+        cache_dir = tmp_path / "cache"
+
+        first = load_rules(path, cache_dir)
+        cached = load_rules(path, cache_dir)
+        _write(path, RULES.replace('"Transport"', '"Leisure"'))
+        edited = load_rules(path, cache_dir)
+
+        assert len(list(cache_dir.glob("rules-*.json"))) == 2
+        assert cached.digest == first.digest
+        assert cached.source == first.source
+        assert cached.match("UBER") == CategoryEnum.TRANSPORT
+        assert edited.match("UBER") == CategoryEnum.LEISURE
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            'version = 2\n[[rules]]\npattern = "A"\ncategory = "Food"\n',
+            'version = 1\n[[rules]]\npattern = "A"\ncategory = "Snacks"\n',
+            'version = 1\n[[rules]]\npattern = "A("\ncategory = "Food"\n',
+            'version = 1\n[[rules]]\npattern = "(?P<x>A)"\ncategory = "Food"\n',
+            'version = 1\n[[rules]]\npattern = "(?i)AMAZON"\ncategory = "Food"\n',
+            'version = 1\n[[rules]]\ncategory = "Food"\n',
+            'version = 1\n[[rules]]\npattern = "A"\ncategory = "Food"\nweight = 1\n',
+        ],
+        ids=[
+            "version",
+            "category",
+            "regex",
+            "named-group",
+            "global-flag",
+            "no-pattern",
+            "key",
+        ],
+    )
+    def test_invalid_rules(self, text):
+        """Test that invalid rules files are rejected with a ValueError."""
+        with pytest.raises(ValueError):
+            parse_rules(text)
+
+
+class TestCategoryRules:
+    """Test cases for reloading rules in a running process."""
+
+    def test_invalid_edit_keeps_rules(self, tmp_path, capsys):
+        """Test that a broken edit is reported and the previous rules stay."""
+        path = _write(tmp_path / "rules.toml", RULES)
+        rules = CategoryRules(path, cache_dir=None)
+        mapper = CategoryMapper(rules=rules)
+
+        _write(path, RULES.replace('"Food"', '"Snacks"'))
+
+        assert not rules.reload()
+        assert "Keeping the current category rules" in capsys.readouterr().out
+        assert mapper.map_category("ifood") == CategoryEnum.FOOD
+
+    def test_add_rule_appends_to_file(self, tmp_path):
+        """Test that an added rule is saved, loaded and tried after the others."""
+        path = _write(tmp_path / "rules.toml", RULES)
+        rules = CategoryRules(path, cache_dir=None)
+        mapper = CategoryMapper(rules=rules)
+
+        mapper.add_rule(r"PADARIA\s+\"SOL\"|UBER", "Food")
+
+        assert mapper.map_category('padaria  "sol"') == CategoryEnum.FOOD
+        assert mapper.map_category("UBER") == CategoryEnum.TRANSPORT
+        assert load_rules(path, cache_dir=None).digest == rules.compiled.digest
+
+    def test_add_rule_rejects_invalid_rule(self, tmp_path):
+        """Test that an invalid rule leaves the file and the rules unchanged."""
+        path = _write(tmp_path / "rules.toml", RULES)
+        rules = CategoryRules(path, cache_dir=None)
+
+        with pytest.raises(ValueError):
+            rules.add_rule("(?P<name>PADARIA)", "Food")
+        with pytest.raises(ValueError):
+            rules.add_rule("PADARIA", "Snacks")
+
+        assert path.read_text(encoding="utf-8") == RULES
+        assert rules.compiled.match("PADARIA") is None
+
+    def test_watch_swaps_in_edits(self, tmp_path):
+        """Test that saving the file changes what running mappers return."""
+        path = _write(tmp_path / "rules.toml", RULES)
+        rules = CategoryRules(path, cache_dir=None)
+        mapper = CategoryMapper(rules=rules)
+        rules.watch()
+        try:
+            # Saved the way editors do, replacing the file
+            _write(tmp_path / "rules.toml.new", RULES.replace('"Food"', '"Leisure"'))
+            (tmp_path / "rules.toml.new").replace(path)
+
+            deadline = time.monotonic() + 5
+            while (
+                mapper.map_category("ifood") != CategoryEnum.LEISURE
+                and time.monotonic() < deadline
+            ):
+                time.sleep(0.05)
+        finally:
+            rules.stop()
+
+        assert mapper.map_category("ifood") == CategoryEnum.LEISURE
@@ -0,0 +1,122 @@
+"""Test cases for the adaptive concurrency controller."""
+
+import httpx
+import pytest
+from notion_client.errors import HTTPResponseError
+
+from src.concurrency import (
+    AdaptiveConcurrencyController,
+    CircuitOpenError,
+    CircuitState,
+)
+from src.notion_gateway import NotionAPIGateway
+from src.rate_limiter import RateLimiter
+
+
+def _complete(controller: AdaptiveConcurrencyController, status: int, latency=0.1):
+    controller.acquire()
+    controller.release(latency, status)
+
+
+class TestAdaptiveConcurrencyController:
+    """Test cases for AIMD behaviour and the circuit breaker."""
+
+    def test_limit_grows_while_healthy(self):
+        """Test additive increase after healthy windows, capped at the maximum."""
+        controller = AdaptiveConcurrencyController(maximum=3, window=5)
+
+        for _ in range(9):
+            _complete(controller, 200)
+        assert controller.limit == 2
+
+        for _ in range(50):
+            _complete(controller, 200)
+        assert controller.limit == 3
+        assert controller.history[-1].reason.startswith("healthy window")
+
+    def test_limit_halves_on_throttling(self):
+        """Test multiplicative decrease on 429."""
+        controller = AdaptiveConcurrencyController(maximum=8, initial=8, window=5)
+
+        _complete(controller, 429)
+
+        assert controller.limit == 4
+        assert controller.history[-1].reason == "HTTP 429"
+
+    def test_client_errors_do_not_shrink_limit(self):
+        """Test that validation errors aren't treated as overload."""
+        controller = AdaptiveConcurrencyController(maximum=8, initial=8)
+
+        _complete(controller, 400)
+
+        assert controller.limit == 8
+
+    def test_circuit_opens_on_sustained_failure(self):
+        """Test that consecutive failures open the circuit and a probe closes it."""
+        controller = AdaptiveConcurrencyController(
+            maximum=4, failure_threshold=3, cooldown_seconds=0
+        )
+
+        for _ in range(3):
+            _complete(controller, 503)
+        assert controller.state == CircuitState.OPEN
+
+        _complete(controller, 200)
+        assert controller.state == CircuitState.CLOSED
+
+    def test_open_circuit_fails_fast(self):
+        """Test that requests are refused during the cooldown."""
+        controller = AdaptiveConcurrencyController(
+            maximum=4, failure_threshold=1, cooldown_seconds=60
+        )
+        _complete(controller, 500)
+
+        with pytest.raises(CircuitOpenError):
+            controller.acquire()
+
+
+def _gateway() -> NotionAPIGateway:
+    return NotionAPIGateway(
+        rate_limiter=RateLimiter(rate=1000, burst=100),
+        concurrency=AdaptiveConcurrencyController(maximum=4, initial=4),
+        token="secret",
+    )
+
+
+def _bad_gateway(status: int) -> HTTPResponseError:
+    # Proxies answer with HTML, which notion_client can't turn into an APIResponseError
+    return HTTPResponseError(httpx.Response(status, text="<html>Bad Gateway</html>"))
+
+
+class TestGatewayRequests:
+    """Test cases for how gateway requests hold concurrency slots."""
+
+    def test_unexpected_errors_free_the_slot(self):
+        """Test that a request failing with any exception releases its slot."""
+        gateway = _gateway()
+
+        def broken():
+            raise ValueError("unexpected")
+
+        for _ in range(gateway.concurrency.limit):
+            with pytest.raises(ValueError):
+                gateway._request(broken)
+
+        assert gateway.concurrency.snapshot()["in_flight"] == 0
+        assert gateway._request(lambda: {"id": "page"}) == {"id": "page"}
+
+    def test_non_json_gateway_errors_are_retried(self, monkeypatch):
+        """Test that a 502 without a JSON body is retried, not raised."""
+        monkeypatch.setattr("src.notion_gateway.time.sleep", lambda seconds: None)
+        gateway = _gateway()
+        responses = iter([_bad_gateway(502), {"id": "page"}])
+
+        def flaky():
+            response = next(responses)
+            if isinstance(response, Exception):
+                raise response
+            return response
+
+        assert gateway._request(flaky) == {"id": "page"}
+        assert gateway.concurrency.snapshot()["in_flight"] == 0
+        assert gateway.concurrency.limit == 2
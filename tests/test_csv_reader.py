@@ -0,0 +1,96 @@
+"""Test cases for the CSV reader backends."""
+
+import pandas as pd
+import pytest
+
+from src.adapters.csv_reader import read_csv, read_header, resolve_backend
+
+CSV = 'Data,Lançamento,Categoria,Valor\n01/10/2025,IFOOD,,"R$ 10,00"\n02/10/2025,UBER,TRANSPORTE,"R$ 20,00"\n'
+
+BACKENDS = [
+    "pandas",
+    pytest.param(
+        "pyarrow",
+        marks=pytest.mark.skipif(
+            resolve_backend("auto") != "pyarrow", reason="pyarrow is not installed"
+        ),
+    ),
+]
+
+
+@pytest.fixture
+def invoice(tmp_path):
+    path = tmp_path / "fatura.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return path
+
+
+class TestReadCsv:
+    """Test cases for read_csv."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_reads_projected_columns_as_strings(self, invoice, backend):
+        """Test that only `usecols` are read, missing ones skipped, as strings."""
+        df = read_csv(invoice, usecols=["Data", "Valor", "Saldo"], backend=backend)
+
+        assert list(df.columns) == ["Data", "Valor"]
+        assert df["Valor"].tolist() == ["R$ 10,00", "R$ 20,00"]
+        assert pd.api.types.is_string_dtype(df["Data"])
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_empty_cells_are_missing(self, invoice, backend):
+        """Test that empty cells read as NaN on both backends."""
+        df = read_csv(invoice, backend=backend)
+
+        assert df["Categoria"].isna().tolist() == [True, False]
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_dtype_and_buffer_input(self, backend):
+        """Test that explicit dtypes apply when reading from bytes."""
+        data = b"date;title;amount\n2025-10-01;IFOOD;10.5\n"
+
+        df = read_csv(data, sep=";", dtype={"amount": "float64"}, backend=backend)
+
+        assert df["amount"].dtype == "float64"
+        assert df["amount"].tolist() == [10.5]
+
+    def test_backends_agree(self, invoice):
+        """Test that both backends produce the same frame."""
+        if resolve_backend("auto") != "pyarrow":
+            pytest.skip("pyarrow is not installed")
+
+        pd.testing.assert_frame_equal(
+            read_csv(invoice, backend="pandas"),
+            read_csv(invoice, backend="pyarrow"),
+            check_dtype=False,
+        )
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_ragged_rows(self, backend):
+        """Test that extra and missing trailing fields read as with pandas."""
+        data = b"date,title,amount\n2025-10-01,IFOOD,10\n2025-10-02,UBER,20,x\n2025-10-03,99\n"
+
+        df = read_csv(data, usecols=["date", "title", "amount"], backend=backend)
+
+        assert df["title"].tolist() == ["IFOOD", "UBER", "99"]
+        assert df["amount"].tolist()[:2] == ["10", "20"]
+        assert df["amount"].isna().tolist() == [False, False, True]
+
+    def test_unknown_backend(self, invoice):
+        """Test that an unknown backend is rejected."""
+        with pytest.raises(ValueError):
+            read_csv(invoice, backend="polars")
+
+
+class TestReadHeader:
+    """Test cases for read_header."""
+
+    def test_header_after_skipped_rows(self):
+        """Test that the header is read after `skip_rows` lines."""
+        data = "Extrato Conta\n\nData;Descrição;Valor\n1;2;3\n".encode("utf-8")
+
+        assert read_header(data, sep=";", skip_rows=2) == [
+            "Data",
+            "Descrição",
+            "Valor",
+        ]
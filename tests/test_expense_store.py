@@ -0,0 +1,117 @@
+"""Test cases for the local expense store and its reports."""
+
+import pandas as pd
+import pytest
+
+from src.notion_sync_expenses.expense_report import (
+    build_report,
+    monthly_totals,
+    top_merchants,
+)
+from src.notion_sync_expenses.expense_store import ExpenseStore, expense_records
+from src.notion_sync_expenses.merchant_canonicalizer import MerchantCanonicalizer
+
+pytest.importorskip("pyarrow")
+
+
+def _records(*rows: tuple[str, str, str, float, str]) -> pd.DataFrame:
+    values = pd.DataFrame(
+        [
+            {
+                "Date": date,
+                "Bank Description": description,
+                "Category": category,
+                "Value": value,
+                "Payment": "CREDIT_CARD",
+                "Type": "NON-ESSENTIAL",
+                "SOURCE": "AUTOMATION",
+            }
+            for _, date, description, value, category in rows
+        ],
+        index=pd.Index([row[0] for row in rows], name="page_id"),
+    )
+    return expense_records(values, MerchantCanonicalizer(cache_path=None))
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ExpenseStore(tmp_path / "expenses")
+    store.upsert(
+        _records(
+            ("a", "2025-09-30", "IFOOD *REST", 10.5, "Food"),
+            ("b", "2025-10-01", "UBER *TRIP", 20.0, "Transport"),
+            ("c", "2025-10-15T10:00:00.000-03:00", "IFOOD *REST", 0.1, "Food"),
+        )
+    )
+    return store
+
+
+class TestExpenseRecords:
+    """Test cases for expense_records."""
+
+    def test_parses_values_and_drops_unusable_pages(self):
+        """Test that cents are exact and pages without date or value are left out."""
+        records = _records(
+            ("a", "2025-10-01", "IFOOD", 0.29, "Food"),
+            ("b", None, "UBER", 1.0, "Transport"),
+            ("c", "2025-10-02", "UBER", None, "Transport"),
+        )
+
+        assert records["page_id"].tolist() == ["a"]
+        assert records["amount_cents"].tolist() == [29]
+
+
+class TestExpenseStore:
+    """Test cases for ExpenseStore."""
+
+    def test_partitions_by_month(self, store):
+        """Test that each month is its own partition and ranges read only theirs."""
+        assert store.months() == ["2025-09", "2025-10"]
+        assert sorted(store.load("2025-10")["page_id"]) == ["b", "c"]
+        assert store.load(end="2025-09")["page_id"].tolist() == ["a"]
+
+    def test_upsert_replaces_by_page_id_across_months(self, store):
+        """Test that an updated page moves to its new month instead of repeating."""
+        store.upsert(_records(("a", "2025-10-20", "IFOOD *REST", 12.0, "Food")))
+
+        expenses = store.load()
+        assert store.months() == ["2025-10"]
+        assert len(expenses) == 3
+        assert expenses.set_index("page_id").loc["a", "amount_cents"] == 1200
+
+    def test_remove_and_replace(self, store):
+        """Test that archived pages are dropped and a full export replaces all."""
+        assert store.remove(["b", "missing"]) == 1
+        assert sorted(store.load()["page_id"]) == ["a", "c"]
+
+        store.replace(_records(("z", "2024-01-01", "NETFLIX", 39.9, "Subscription")))
+        assert store.months() == ["2024-01"]
+        assert store.load()["page_id"].tolist() == ["z"]
+
+
+class TestExpenseReport:
+    """Test cases for the report aggregates."""
+
+    def test_monthly_totals_and_top_merchants(self, store):
+        """Test month × category totals and merchants ranked by total."""
+        report = build_report(store, by="category", limit=1)
+
+        assert report.totals.loc["2025-10"].to_dict() == {
+            "Food": 10,
+            "Transport": 2000,
+        }
+        assert report.totals.loc["2025-09", "Transport"] == 0
+        assert report.top_merchants.index.tolist() == ["UBER *TRIP"]
+        assert report.essential["NON-ESSENTIAL"].sum() == 3060
+
+    def test_empty(self):
+        """Test that an empty selection gives empty aggregates."""
+        empty = pd.DataFrame(columns=["month", "merchant", "category", "amount_cents"])
+
+        assert monthly_totals(empty).empty
+        assert top_merchants(empty).empty
+
+    def test_unknown_dimension(self, store):
+        """Test that only the known columns can be totalled."""
+        with pytest.raises(ValueError):
+            build_report(store, by="merchant")
@@ -0,0 +1,41 @@
+"""Test cases for merchant canonicalization."""
+
+import pandas as pd
+import pytest
+
+from src.notion_sync_expenses.merchant_canonicalizer import MerchantCanonicalizer
+
+
+class TestMerchantCanonicalizer:
+    """Test cases for MerchantCanonicalizer."""
+
+    @pytest.mark.parametrize(
+        "description,expected",
+        [
+            ("AMAZON Parcela 2/10", "AMAZON"),
+            ("PG *LOJA ABC SAO PAULO BR", "LOJA ABC"),
+            ("IFD*PIZZARIA DO ZE", "IFOOD PIZZARIA DO ZE"),
+            ("Pix enviado - João da Silva", "JOAO DA SILVA"),
+            ("MP*MERCADOLIVRE 12345678", "MERCADOLIVRE"),
+            ("POSTO BR", "POSTO BR"),
+        ],
+    )
+    def test_canonical_keys(self, description, expected):
+        """Test that noise is stripped from descriptions."""
+        assert MerchantCanonicalizer(cache_path=None).canonicalize(description) == (
+            expected
+        )
+
+    def test_cache_is_bounded_and_persisted(self, tmp_path):
+        """Test LRU eviction and that saved keys are reloaded."""
+        cache_path = tmp_path / "merchant_keys.json"
+        canonicalizer = MerchantCanonicalizer(cache_path=cache_path, max_entries=2)
+
+        keys = canonicalizer.canonicalize_series(
+            pd.Series(["UBER *TRIP", "NETFLIX.COM", "UBER *TRIP", "SPOTIFY"])
+        )
+        canonicalizer.save()
+
+        assert keys.tolist() == ["UBER *TRIP", "NETFLIX.COM", "UBER *TRIP", "SPOTIFY"]
+        reloaded = MerchantCanonicalizer(cache_path=cache_path, max_entries=2)
+        assert list(reloaded._cache) == ["NETFLIX.COM", "SPOTIFY"]
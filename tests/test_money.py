@@ -0,0 +1,95 @@
+"""Test cases for the BRL money parser."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.money import format_brl, parse_brl, parse_cents
+
+AMOUNTS = {
+    "R$ 1.234,56": 123456,
+    "-R$ 10,00": -1000,
+    "R$ -5,5": -550,
+    "R$ 1.000,00": 100000,
+    "+3": 300,
+    "10.50": 1050,
+    "1.234": 123400,
+    "R$ 12.345.678,90": 1234567890,
+}
+INVALID = ["abc", "1,234", "10,", "1.23.45", "1234567890123456", ""]
+
+
+class TestParseBrl:
+    """Test cases for parse_brl and parse_cents."""
+
+    @pytest.mark.parametrize("dtype", [object, "string"])
+    def test_parses_column_to_cents(self, dtype):
+        """Test that every accepted format becomes exact cents."""
+        values = pd.Series(list(AMOUNTS) + INVALID + [None], dtype=dtype)
+
+        parsed = parse_brl(values)
+
+        assert parsed.cents.dtype == "int64"
+        assert parsed.cents.tolist() == list(AMOUNTS.values()) + [0] * 7
+        assert parsed.invalid.tolist() == [False] * len(AMOUNTS) + [True] * 7
+
+    def test_keeps_index(self):
+        """Test that results align with the parsed column."""
+        values = pd.Series(["R$ 1,00", "x"], index=pd.Index([3, 7], name="Line"))
+
+        parsed = parse_brl(values)
+
+        assert parsed.cents.index.equals(values.index)
+        assert parsed.invalid[7]
+
+    def test_all_missing_column(self):
+        """Test that a column with no values at all is entirely invalid."""
+        parsed = parse_brl(pd.Series([None, None], dtype=object))
+
+        assert parsed.cents.tolist() == [0, 0]
+        assert parsed.invalid.tolist() == [True, True]
+
+    def test_numeric_columns_round_to_the_cent(self):
+        """Test that float amounts are rounded rather than truncated."""
+        parsed = parse_brl(pd.Series([0.29, -1234.565, np.nan]))
+
+        assert parsed.cents.tolist() == [29, -123456, 0]
+        assert parsed.invalid.tolist() == [False, False, True]
+
+    def test_numbers_too_large_for_cents_are_invalid(self):
+        """Test that numeric amounts that would overflow int64 cents are flagged."""
+        values = pd.Series([1e20, -1e15, 999_999_999_999.0, np.inf])
+
+        parsed = parse_brl(values)
+
+        assert parsed.cents.tolist() == [0, 0, 99_999_999_999_900, 0]
+        assert parsed.invalid.tolist() == [True, True, False, True]
+        with pytest.raises(ValueError):
+            parse_cents(1e20)
+
+    def test_scalar_matches_column(self):
+        """Test that parse_cents reads values exactly as parse_brl does."""
+        for value, cents in AMOUNTS.items():
+            assert parse_cents(value) == cents
+        for value in INVALID + [None, float("nan")]:
+            with pytest.raises(ValueError):
+                parse_cents(value)
+
+    def test_sums_are_exact(self):
+        """Test that sums of cents don't accumulate float error."""
+        parsed = parse_brl(pd.Series(["R$ 0,10"] * 3))
+
+        assert parsed.cents.sum() == 30
+
+
+class TestFormatBrl:
+    """Test cases for format_brl."""
+
+    def test_round_trip(self):
+        """Test that formatted amounts parse back to the same cents."""
+        cents = pd.Series([123456, -50, 0, 7])
+
+        formatted = format_brl(cents)
+
+        assert formatted.tolist() == ["R$ 1234,56", "R$ -0,50", "R$ 0,00", "R$ 0,07"]
+        assert parse_brl(formatted).cents.tolist() == cents.tolist()
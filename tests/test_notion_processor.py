@@ -0,0 +1,107 @@
+"""Test cases for building the Notion preview and payloads in the app."""
+
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.streamlit_app.processors import notion_processor
+from src.streamlit_app.processors.notion_processor import (
+    build_notion_payload,
+    build_notion_payloads,
+    remember_corrections,
+    transform_data_for_notion,
+)
+
+
+def _raw() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Data": ["01/10/2025", "31/02/2025", "03/10/2025"],
+            "Lançamento": ["IFOOD", "UBER", "NETFLIX"],
+            "Categoria": ["Food", "Others", "Subscription"],
+            "Valor": ["R$ 10,00", "20,00", "oops"],
+        },
+        index=pd.RangeIndex(1, 4, name="Line"),
+    ).astype("string")
+
+
+class TestTransformDataForNotion:
+    """Test cases for transform_data_for_notion."""
+
+    def test_formats_whole_columns(self):
+        """Test that dates, months and amounts are formatted per row."""
+        notion_data = transform_data_for_notion(_raw())
+
+        assert notion_data.loc[1, "Month"] == "10 - OCT"
+        assert notion_data.loc[1, "Date"] == "01/10/2025"
+        assert notion_data.loc[1, "Value"] == "R$ 10,00"
+        assert notion_data.index.name == "Line"
+
+    def test_keeps_invalid_rows_with_their_raw_text(self):
+        """Test that rows with a bad date or amount stay, for review."""
+        notion_data = transform_data_for_notion(_raw())
+
+        assert list(notion_data.index) == [1, 2, 3]
+        assert notion_data.loc[2, "Date"] == "31/02/2025"
+        assert notion_data.loc[3, "Value"] == "oops"
+        assert pd.isna(notion_data.loc[2, "Month"])
+
+
+class TestBuildNotionPayloads:
+    """Test cases for build_notion_payloads."""
+
+    def test_month_of_a_fixed_date(self):
+        """Test that a row whose date was fixed in the editor gets its month."""
+        notion_data = transform_data_for_notion(_raw().head(2))
+        notion_data.loc[2, "Date"] = "28/02/2025"
+
+        payloads, invalid = build_notion_payloads(notion_data)
+
+        assert invalid == []
+        assert payloads[1][1]["properties"]["Month"] == {"select": {"name": "02 - FEB"}}
+
+    def test_matches_single_row_payloads(self):
+        """Test that column-built payloads match the per-row builder."""
+        notion_data = transform_data_for_notion(_raw().head(1))
+        notion_data = pd.concat([notion_data] * 2)
+        notion_data.iloc[1, notion_data.columns.get_loc("Value")] = "x"
+
+        payloads, invalid = build_notion_payloads(notion_data)
+
+        assert invalid == [1]
+        assert payloads == [(0, build_notion_payload(notion_data.iloc[0]))]
+        properties = payloads[0][1]["properties"]
+        assert properties["Value"] == {"number": 10.0}
+        assert properties["Date"] == {"date": {"start": "2025-10-01"}}
+
+
+class TestRememberCorrections:
+    """Test cases for remember_corrections."""
+
+    def test_only_changed_suggestions_are_remembered(self, monkeypatch):
+        """Test that rows added in the editor aren't taken as corrections."""
+        remembered = {}
+        monkeypatch.setattr(
+            notion_processor,
+            "get_category_mapper",
+            lambda: SimpleNamespace(memory=SimpleNamespace(remember=remembered.update)),
+        )
+        monkeypatch.setattr(
+            notion_processor,
+            "get_merchant_canonicalizer",
+            lambda: SimpleNamespace(canonicalize_series=lambda values: values),
+        )
+        suggested = pd.DataFrame(
+            {"Bank Description": ["IFOOD", "UBER"], "Category": ["Food", "Others"]},
+            index=pd.Index([1, 2], name="Line"),
+        )
+        edited = pd.DataFrame(
+            {
+                "Bank Description": ["IFOOD", "UBER", "FEIRA"],
+                "Category": ["Food", "Transport", "Food"],
+            },
+            index=pd.Index([1, 2, 3], name="Line"),
+        )
+
+        assert remember_corrections(suggested, edited) == 1
+        assert remembered == {"UBER": "Transport"}
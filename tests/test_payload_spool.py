@@ -0,0 +1,65 @@
+"""Test cases for the payload spool and the concurrent sender."""
+
+from src.notion_gateway import NotionAPIGateway
+from src.notion_sync_expenses.payload_spool import (
+    read_spool,
+    read_spool_header,
+    spool_checkpoint,
+    write_spool,
+)
+from src.rate_limiter import RateLimiter
+
+
+def _payload(description: str) -> dict:
+    return {
+        "parent": {"database_id": "db"},
+        "properties": {
+            "Bank Description": {"rich_text": [{"text": {"content": description}}]}
+        },
+    }
+
+
+class TestPayloadSpool:
+    """Test cases for spool files."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that payloads are read back in order with their indexes."""
+        spool_path = tmp_path / "payloads.ndjson.gz"
+        payloads = [_payload("IFOOD"), _payload("Padaria São João")]
+
+        count = write_spool(spool_path, payloads, metadata={"bank": "INTER"})
+
+        assert count == 2
+        assert read_spool_header(spool_path)["bank"] == "INTER"
+        assert list(read_spool(spool_path)) == list(enumerate(payloads))
+
+    def test_checkpoint_resume(self, tmp_path):
+        """Test that checkpointed keys survive a reload."""
+        checkpoint = spool_checkpoint(tmp_path / "payloads.ndjson.gz")
+        assert checkpoint.load() == set()
+
+        checkpoint.mark(3)
+        checkpoint.mark(0)
+
+        assert checkpoint.load() == {"0", "3"}
+
+
+class TestConcurrentSender:
+    """Test cases for NotionAPIGateway.map_concurrently."""
+
+    def test_results_cover_every_item(self):
+        """Test that every item yields exactly one result, errors included."""
+        gateway = NotionAPIGateway(rate_limiter=RateLimiter(rate=1000, burst=100))
+
+        def send(value: int) -> dict:
+            if value == 3:
+                raise ValueError("boom")
+            return {"id": f"page-{value}"}
+
+        results = list(
+            gateway.map_concurrently(send, ((i, i) for i in range(10)), max_workers=3)
+        )
+
+        assert sorted(result.key for result in results) == list(range(10))
+        failed = [result for result in results if not result.ok]
+        assert [result.key for result in failed] == [3]
@@ -0,0 +1,109 @@
+"""Test cases for the pipeline profiler."""
+
+import pstats
+
+import pytest
+
+from src.profiling import (
+    ALLOCATIONS_FILE,
+    STACKS_FILE,
+    PipelineProfiler,
+    StubGateway,
+    collapsed_stacks,
+)
+
+
+def _leaf(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def _branch(n: int) -> int:
+    return _leaf(n) + _leaf(n)
+
+
+def _allocate(rows: int) -> list[dict]:
+    return [{"row": index} for index in range(rows)]
+
+
+class TestPipelineProfiler:
+    """Test cases for PipelineProfiler."""
+
+    def test_stages_add_up(self):
+        """Test that a stage run twice accumulates calls and allocations."""
+        with PipelineProfiler() as profiler:
+            with profiler.stage("read"):
+                first = _allocate(1000)
+            with profiler.stage("read"):
+                second = _allocate(1000)
+
+        stage = profiler.stages["read"]
+        assert stage.calls == 2
+        assert stage.peak_bytes > 0
+        (location, size), *_ = stage.allocations.most_common(1)
+        assert location[0] == __file__
+        assert size >= 2 * 1000 * 64
+        assert len(first) == len(second)
+
+    def test_stage_needs_open_profiler(self):
+        """Test that stages can't be profiled before tracing starts."""
+        profiler = PipelineProfiler()
+
+        with pytest.raises(RuntimeError):
+            with profiler.stage("read"):
+                pass
+
+    def test_writes_reports(self, tmp_path):
+        """Test that every stage is written to the folded stacks and reports."""
+        with PipelineProfiler() as profiler:
+            with profiler.stage("map"):
+                _branch(200_000)
+            with profiler.stage("build"):
+                _allocate(100)
+
+        written = profiler.write(tmp_path, top=5)
+
+        assert {path.name for path in written} == {
+            STACKS_FILE,
+            ALLOCATIONS_FILE,
+            "map.prof",
+            "build.prof",
+        }
+        stacks = (tmp_path / STACKS_FILE).read_text(encoding="utf-8").splitlines()
+        assert any(
+            line.startswith("map;_branch") and "_leaf" in line for line in stacks
+        )
+        assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in stacks)
+        report = (tmp_path / ALLOCATIONS_FILE).read_text(encoding="utf-8")
+        assert "== build: 1 call(s)" in report
+
+
+class TestCollapsedStacks:
+    """Test cases for collapsed_stacks."""
+
+    def test_time_follows_call_paths(self):
+        """Test that callee time sits under its caller and totals are kept."""
+        with PipelineProfiler() as profiler:
+            with profiler.stage("stage"):
+                _branch(300_000)
+        stats = pstats.Stats(profiler.stages["stage"].profile)
+
+        stacks = collapsed_stacks(stats, root="stage")
+
+        leaf_paths = [stack for stack in stacks if "_leaf" in stack]
+        assert leaf_paths
+        assert all(stack.split(";")[1].startswith("_branch") for stack in leaf_paths)
+        total = stats.total_tt * 1e6
+        assert sum(stacks.values()) == pytest.approx(total, rel=0.05)
+
+
+class TestStubGateway:
+    """Test cases for StubGateway."""
+
+    def test_answers_without_notion(self):
+        """Test that pages are created locally with distinct ids."""
+        gateway = StubGateway()
+        payload = {"parent": {"database_id": "db"}, "properties": {}}
+
+        pages = [gateway.create_page(payload) for _ in range(3)]
+
+        assert [page["id"] for page in pages] == ["stub-1", "stub-2", "stub-3"]
@@ -0,0 +1,34 @@
+"""Test cases for rate limiters."""
+
+import time
+
+from src.rate_limiter import SharedRateLimiter
+
+
+class TestSharedRateLimiter:
+    """Test cases for the SQLite-backed rate limiter."""
+
+    def test_limiters_with_same_key_share_budget(self, tmp_path):
+        """Test that two limiters on one token split a single rate budget."""
+        path = tmp_path / "rate_limit.sqlite"
+        first = SharedRateLimiter(path, key="secret", rate=50)
+        second = SharedRateLimiter(path, key="secret", rate=50)
+
+        started_at = time.monotonic()
+        for _ in range(10):
+            first.acquire()
+            second.acquire()
+        elapsed = time.monotonic() - started_at
+
+        # 20 requests at 50/s with a burst of 1 need at least 19 intervals
+        assert elapsed >= 19 / 50 * 0.9
+
+    def test_different_keys_are_independent(self, tmp_path):
+        """Test that other integration tokens don't consume the budget."""
+        path = tmp_path / "rate_limit.sqlite"
+        SharedRateLimiter(path, key="secret", rate=1).acquire()
+
+        started_at = time.monotonic()
+        SharedRateLimiter(path, key="other-secret", rate=1).acquire()
+
+        assert time.monotonic() - started_at < 0.5
@@ -0,0 +1,54 @@
+"""Test cases for cross-source reconciliation."""
+
+from datetime import datetime
+
+import pandas as pd
+
+from src.notion_sync_expenses.reconciliation import (
+    drop_cross_source_duplicates,
+    find_cross_source_duplicates,
+)
+
+
+def _rows(*rows: tuple[str, str, float]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"date": datetime.fromisoformat(date), "amount": amount, "payment": payment}
+            for payment, date, amount in rows
+        ]
+    )
+
+
+class TestCrossSourceDuplicates:
+    """Test cases for find_cross_source_duplicates."""
+
+    def test_matches_within_tolerance_regardless_of_sign(self):
+        """Test that a statement debit matches the invoice row days apart."""
+        df = _rows(
+            ("CREDIT_CARD", "2025-10-01", 150.0),
+            ("PIX", "2025-10-03", -150.0),
+            ("PIX", "2025-10-20", -150.0),
+        )
+
+        duplicate_of = find_cross_source_duplicates(
+            df, source_column="payment", keep="CREDIT_CARD"
+        )
+
+        assert duplicate_of.tolist()[1] == 0
+        assert pd.isna(duplicate_of[0]) and pd.isna(duplicate_of[2])
+
+    def test_each_row_absorbs_one_duplicate(self):
+        """Test one-to-one matching, nearest date first."""
+        df = _rows(
+            ("CREDIT_CARD", "2025-10-01", 10.0),
+            ("CREDIT_CARD", "2025-10-05", 10.0),
+            ("PIX", "2025-10-02", 10.0),
+            ("PIX", "2025-10-01", 10.0),
+            ("PIX", "2025-10-04", 10.0),
+        )
+
+        reconciled = drop_cross_source_duplicates(
+            df, source_column="payment", keep="CREDIT_CARD"
+        )
+
+        assert reconciled.index.tolist() == [0, 1, 2]
@@ -0,0 +1,131 @@
+"""Test cases for the Streamlit review data model."""
+
+import pandas as pd
+
+from src.streamlit_app.processors.csv_parser import SOURCE_FILE_COLUMN
+from src.streamlit_app.session.review_data import (
+    ReviewData,
+    ReviewFilter,
+    ReviewWindow,
+    apply_editor_changes,
+)
+
+
+def _review() -> ReviewData:
+    return ReviewData.from_upload(
+        pd.DataFrame(
+            {
+                "Data": ["01/10/2025", "02/10/2025", "03/10/2025"],
+                "Lançamento": ["IFOOD", "UBER", "NETFLIX"],
+                "Valor": ["10,00", "20,00", "39,90"],
+            }
+        )
+    )
+
+
+class TestFromUploads:
+    """Test cases for reviewing several files as one upload."""
+
+    def test_rows_keep_their_file(self):
+        """Test that files share one line numbering and their own payment method."""
+        frame = _review().base.reset_index(drop=True)
+        review = ReviewData.from_uploads(
+            {"fatura.csv": frame, "extrato.csv": frame.head(1)},
+            {"fatura.csv": "CREDIT_CARD", "extrato.csv": "PIX"},
+        )
+
+        assert list(review.base.index) == [1, 2, 3, 4]
+        assert review.base.columns[0] == SOURCE_FILE_COLUMN
+        assert review.base[SOURCE_FILE_COLUMN].tolist() == ["fatura.csv"] * 3 + [
+            "extrato.csv"
+        ]
+        assert review.payment_methods["extrato.csv"] == "PIX"
+
+
+class TestApplyEditorChanges:
+    """Test cases for apply_editor_changes."""
+
+    def test_no_changes_returns_base(self):
+        """Test that an untouched editor doesn't copy the frame."""
+        review = _review()
+        changes = {"edited_rows": {}, "deleted_rows": [], "added_rows": []}
+
+        assert apply_editor_changes(review.base, changes) is review.base
+
+    def test_changes_keep_line_labels_and_base(self):
+        """Test that edits, deletions and additions keep labels stable."""
+        review = _review()
+        changes = {
+            "edited_rows": {1: {"Valor": "25,00"}},
+            "deleted_rows": [0],
+            "added_rows": [{"Data": "04/10/2025", "Lançamento": "X", "Valor": "1,00"}],
+        }
+
+        view = apply_editor_changes(review.base, changes)
+
+        assert list(view.index) == [2, 3, 4]
+        assert view.loc[2, "Valor"] == "25,00"
+        assert view.loc[4, "Lançamento"] == "X"
+        assert review.base.loc[2, "Valor"] == "20,00"
+        assert len(review.base) == 3
+
+
+def _notion_data() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Bank Description": ["IFOOD", "UBER", "NETFLIX"],
+            "Category": ["UNASSIGNED", "UNASSIGNED", "Subscription"],
+            "Value": ["R$ 10,00", "R$ 20,00", "oops"],
+            "Date": ["01/10/2025", "02/10/2025", "03/10/2025"],
+        },
+        index=pd.RangeIndex(1, 4, name="Line"),
+    )
+
+
+class TestReviewWindow:
+    """Test cases for ReviewWindow."""
+
+    def test_filters_select_lines(self):
+        """Test that the UNASSIGNED and invalid filters return matching lines."""
+        window = ReviewWindow()
+        notion_data = _notion_data()
+
+        assert list(window.matching(notion_data, ReviewFilter.UNASSIGNED)) == [1, 2]
+        assert list(window.matching(notion_data, ReviewFilter.INVALID)) == [3]
+        assert list(
+            window.matching(notion_data, ReviewFilter.CATEGORY, "Subscription")
+        ) == [3]
+
+    def test_invalid_filter_finds_bad_upload_rows(self):
+        """Test that rows with a bad date or amount reach the invalid filter."""
+        review = ReviewData.from_upload(
+            pd.DataFrame(
+                {
+                    "Data": ["01/10/2025", "32/10/2025", "03/10/2025"],
+                    "Lançamento": ["IFOOD", "UBER", "NETFLIX"],
+                    "Categoria": ["Food", "Others", "Subscription"],
+                    "Valor": ["10,00", "20,00", "abc"],
+                }
+            )
+        )
+
+        notion_data = review.notion_data()
+
+        assert list(notion_data.index) == [1, 2, 3]
+        assert list(review.window.matching(notion_data, ReviewFilter.INVALID)) == [
+            2,
+            3,
+        ]
+
+    def test_bulk_actions_apply_as_overrides(self):
+        """Test that bulk updates are applied by line without touching the data."""
+        window = ReviewWindow()
+        notion_data = _notion_data()
+
+        window.set_category(pd.Index([1, 2]), "Food")
+        window.remove(pd.Index([3]))
+        view = window.apply(notion_data)
+
+        assert list(view.index) == [1, 2]
+        assert list(view["Category"]) == ["Food", "Food"]
+        assert notion_data.loc[1, "Category"] == "UNASSIGNED"
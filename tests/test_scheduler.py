@@ -0,0 +1,153 @@
+"""Test cases for the multi-tenant sync scheduler."""
+
+import pytest
+
+from src.notion_gateway import SendResult
+from src.notion_sync_expenses.expense_store import ExpenseStore
+from src.notion_sync_expenses.notion_sync_service import NotionSyncService
+from src.notion_sync_expenses.scheduler import PROCESSED_DIR, FairQueue, SyncScheduler
+from src.notion_sync_expenses.tenants import load_tenants
+
+INVOICE = (
+    "Data,Lançamento,Categoria,Tipo,Valor\n"
+    '05/03/2024,IFOOD *IFOOD,Restaurantes,Compra à vista,"R$ 45,90"\n'
+    '06/03/2024,UBER *TRIP,Transporte,Compra à vista,"R$ 23,00"\n'
+    '07/03/2024,NETFLIX.COM,Serviços,Compra à vista,"R$ 39,90"\n'
+)
+
+
+class FakeGateway:
+    def __init__(self):
+        self.payloads = []
+
+    def create_pages(self, payloads, max_workers):
+        for key, payload in payloads:
+            self.payloads.append(payload)
+            yield SendResult(key, {"id": f"page-{len(self.payloads)}"})
+
+
+def _write_config(tmp_path, body: str):
+    path = tmp_path / "tenants.toml"
+    path.write_text(body, encoding="utf-8")
+    return path
+
+
+class TestFairQueue:
+    """Test cases for FairQueue."""
+
+    def test_tenants_take_turns(self):
+        """Test that a tenant with a long queue can't delay the others."""
+        queue = FairQueue()
+        for index in range(3):
+            queue.push("big", f"big-{index}")
+        queue.push("small", "small-0")
+        queue.push("other", "other-0")
+
+        popped = [queue.pop() for _ in range(len(queue))]
+
+        assert popped == ["big-0", "small-0", "other-0", "big-1", "big-2"]
+        assert queue.pop() is None
+
+    def test_skipped_tenants_wait(self):
+        """Test that tenants passed in skip are left queued."""
+        queue = FairQueue()
+        queue.push("busy", "busy-0")
+        queue.push("idle", "idle-0")
+
+        assert queue.pop(skip={"busy"}) == "idle-0"
+        assert queue.pop(skip={"busy"}) is None
+        assert queue.pop() == "busy-0"
+
+
+class TestLoadTenants:
+    """Test cases for the tenant config."""
+
+    def test_reads_tokens_from_environment(self, tmp_path, monkeypatch):
+        """Test that token_env names the variable holding the token."""
+        monkeypatch.setenv("ANA_NOTION_SECRET", "secret-ana")
+        config = _write_config(
+            tmp_path,
+            '[[tenants]]\nname = "ana"\ntoken_env = "ANA_NOTION_SECRET"\n'
+            'database_id = "db-ana"\ninbox = "inbox/ana"\nbank = "nubank"\n',
+        )
+
+        (tenant,) = load_tenants(config)
+
+        assert tenant.token == "secret-ana"
+        assert tenant.bank == "NUBANK"
+        assert "secret-ana" not in repr(tenant)
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            '[[tenants]]\nname = "ana"\ndatabase_id = "db"\ninbox = "in"\n',
+            '[[tenants]]\nname = "ana"\ntoken = "t"\ndatabase_id = "db"\n'
+            'inbox = "in"\nbank = "ITAU"\n',
+            '[[tenants]]\nname = "ana"\ntoken = "t"\ndatabase_id = "db"\n'
+            'inbox = "in"\n[[tenants]]\nname = "ana"\ntoken = "u"\n'
+            'database_id = "db2"\ninbox = "in2"\n',
+            '[[tenants]]\nname = "../ana"\ntoken = "t"\ndatabase_id = "db"\n'
+            'inbox = "in"\n',
+        ],
+        ids=["no-token", "bank", "duplicate", "name"],
+    )
+    def test_invalid_config(self, tmp_path, body):
+        """Test that invalid tenants are rejected with a ValueError."""
+        with pytest.raises(ValueError):
+            load_tenants(_write_config(tmp_path, body))
+
+
+class TestSyncScheduler:
+    """Test cases for SyncScheduler."""
+
+    def test_syncs_every_inbox_once(self, tmp_path, monkeypatch):
+        """Test that chunked exports are sent in full and not again when re-dropped."""
+        pytest.importorskip("pyarrow")
+        # Spawned parsing processes read their settings from the environment
+        monkeypatch.setenv("MERCHANT_CACHE_PATH", str(tmp_path / "merchants.json"))
+        monkeypatch.setenv("CATEGORY_MODEL_PATH", str(tmp_path / "model.npz"))
+        monkeypatch.setenv("ANA_TOKEN", "token-ana")
+        monkeypatch.setenv("BIA_TOKEN", "token-bia")
+        for name in ("ana", "bia"):
+            (tmp_path / name).mkdir()
+            (tmp_path / name / "fatura.csv").write_text(INVOICE, encoding="utf-8")
+        config = _write_config(
+            tmp_path,
+            "".join(
+                f'[[tenants]]\nname = "{name}"\ntoken_env = "{name.upper()}_TOKEN"\n'
+                f'database_id = "db-{name}"\ninbox = "{tmp_path / name}"\n'
+                for name in ("ana", "bia")
+            ),
+        )
+
+        with SyncScheduler(
+            load_tenants(config),
+            parse_workers=1,
+            chunk_rows=2,
+            state_dir=tmp_path / "state",
+        ) as scheduler:
+            gateways = {}
+            for name, tenant in scheduler.tenants.items():
+                gateways[name] = FakeGateway()
+                scheduler.services[name] = NotionSyncService(
+                    database_id=tenant.database_id,
+                    gateway=gateways[name],
+                    expense_store=ExpenseStore(tmp_path / "store" / name),
+                )
+
+            reports = {report.tenant: report for report in scheduler.run_once()}
+            (tmp_path / "ana" / "fatura.csv").write_text(INVOICE, encoding="utf-8")
+            again = {report.tenant: report for report in scheduler.run_once()}
+
+        for name in ("ana", "bia"):
+            assert (reports[name].files, reports[name].sent) == (1, 3)
+            databases = {
+                payload["parent"]["database_id"] for payload in gateways[name].payloads
+            }
+            assert databases == {f"db-{name}"}
+            assert len(list((tmp_path / name / PROCESSED_DIR).iterdir())) == (
+                2 if name == "ana" else 1
+            )
+        assert again["ana"].files == 1
+        assert (again["ana"].sent, again["ana"].skipped) == (0, 3)
+        assert len(gateways["ana"].payloads) == 3
@@ -0,0 +1,110 @@
+"""Test cases for database snapshots."""
+
+import pytest
+
+from src.notion_sync_expenses.snapshot import (
+    read_snapshot,
+    read_snapshot_header,
+    restore_payload,
+    write_snapshot,
+)
+
+pytest.importorskip("pyarrow")
+
+DATABASE = {
+    "id": "db-1",
+    "properties": {
+        "Bank Description": {"type": "rich_text"},
+        "Value": {"type": "number"},
+        "Category": {"type": "select"},
+        "Tags": {"type": "multi_select"},
+        "Date": {"type": "date"},
+        "Reviewed": {"type": "checkbox"},
+        "Month Total": {"type": "formula"},
+    },
+}
+
+
+def _page(page_id: str, description: str, value: float | None) -> dict:
+    return {
+        "id": page_id,
+        "created_time": "2025-10-02T12:00:00.000Z",
+        "last_edited_time": "2025-10-03T08:30:00.000Z",
+        "properties": {
+            "Bank Description": {
+                "type": "rich_text",
+                "rich_text": [
+                    {"plain_text": description[:2000]},
+                    {"plain_text": description[2000:]},
+                ],
+            },
+            "Value": {"type": "number", "number": value},
+            "Category": {"type": "select", "select": {"name": "Food"}},
+            "Tags": {"type": "multi_select", "multi_select": [{"name": "work"}]},
+            "Date": {"type": "date", "date": {"start": "2025-10-01"}},
+            "Reviewed": {"type": "checkbox", "checkbox": True},
+            "Month Total": {"type": "formula", "formula": {"number": 99.5}},
+        },
+    }
+
+
+class TestSnapshot:
+    """Test cases for writing, reading and restoring snapshots."""
+
+    def test_round_trip(self, tmp_path):
+        """Test that decoded values, ids and edit times survive the file."""
+        path = tmp_path / "finance.parquet"
+        long_text = "IFOOD " * 500
+
+        count = write_snapshot(
+            path,
+            DATABASE,
+            iter([_page("p1", long_text, 10.5), _page("p2", "UBER", None)]),
+            batch_size=1,
+        )
+
+        rows = list(read_snapshot(path))
+        assert count == 2
+        assert [row["page_id"] for row in rows] == ["p1", "p2"]
+        assert rows[0]["Bank Description"] == long_text
+        assert rows[0]["Value"] == 10.5 and rows[1]["Value"] is None
+        assert rows[0]["Tags"] == ["work"]
+        assert rows[0]["Month Total"] == "99.5"
+        assert rows[0]["last_edited_time"].isoformat() == "2025-10-03T08:30:00+00:00"
+        assert read_snapshot_header(path)["database_id"] == "db-1"
+
+    def test_restore_payload(self, tmp_path):
+        """Test that restorable properties are rebuilt and formulas left out."""
+        path = tmp_path / "finance.parquet"
+        write_snapshot(path, DATABASE, [_page("p1", "x" * 2500, 10.5)])
+        header = read_snapshot_header(path)
+
+        payload = restore_payload(
+            "db-2", next(read_snapshot(path)), header["properties"]
+        )
+
+        properties = payload["properties"]
+        assert payload["parent"] == {"database_id": "db-2"}
+        assert "Month Total" not in properties
+        assert [
+            len(t["text"]["content"])
+            for t in properties["Bank Description"]["rich_text"]
+        ] == [2000, 500]
+        assert properties["Value"] == {"number": 10.5}
+        assert properties["Category"] == {"select": {"name": "Food"}}
+        assert properties["Tags"] == {"multi_select": [{"name": "work"}]}
+        assert properties["Date"] == {"date": {"start": "2025-10-01"}}
+        assert properties["Reviewed"] == {"checkbox": True}
+
+    def test_incomplete_snapshot_isnt_left_behind(self, tmp_path):
+        """Test that a failed backup doesn't leave a file that looks complete."""
+        path = tmp_path / "finance.parquet"
+
+        def pages():
+            yield _page("p1", "IFOOD", 1.0)
+            raise RuntimeError("connection lost")
+
+        with pytest.raises(RuntimeError):
+            write_snapshot(path, DATABASE, pages())
+
+        assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,293 @@
+"""Test cases for the monthly summary database."""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from src.notion_gateway import SendResult
+from src.notion_sync_expenses.expense_store import (
+    ExpenseStore,
+    record_pages,
+    remove_pages,
+)
+from src.notion_sync_expenses.merchant_canonicalizer import MerchantCanonicalizer
+from src.notion_sync_expenses.summary import (
+    SUMMARY_PROPERTIES,
+    MonthlySummary,
+    summary_deltas,
+)
+
+
+class FakeGateway:
+    """Summary pages kept in memory; writes to pages in `failing` raise."""
+
+    def __init__(self, properties=SUMMARY_PROPERTIES):
+        self.properties = properties
+        self.pages: dict[str, dict] = {}
+        self.writes: list[str] = []
+        self.failing: set[str] = set()
+
+    def get_database(self, database_id):
+        return {"properties": {n: {"type": t} for n, t in self.properties.items()}}
+
+    def iter_database_pages(self, database_id, filter=None):
+        for page_id, properties in self.pages.items():
+            yield {
+                "id": page_id,
+                "properties": {
+                    "Month": {"select": {"name": properties["Month"]}},
+                    "Category": {"select": {"name": properties["Category"]}},
+                },
+            }
+
+    def create_page(self, payload):
+        properties = payload["properties"]
+        page_id = f"summary-{len(self.pages) + 1}"
+        self.pages[page_id] = {
+            "Month": properties["Month"]["select"]["name"],
+            "Category": properties["Category"]["select"]["name"],
+        }
+        return self.update_page(page_id, properties)
+
+    def update_page(self, page_id, properties):
+        page = self.pages[page_id]
+        if f"{page['Month']} {page['Category']}" in self.failing:
+            raise RuntimeError("Notion is down")
+        page["Total"] = properties["Total"]["number"]
+        page["Expenses"] = properties["Expenses"]["number"]
+        self.writes.append(page_id)
+        return {"id": page_id}
+
+    def map_concurrently(self, send, items, max_workers):
+        for key, item in items:
+            try:
+                yield SendResult(key, send(item))
+            except Exception as e:
+                yield SendResult(key, error=e)
+
+    def totals(self) -> dict[tuple[str, str], tuple[float, int]]:
+        return {
+            (page["Month"], page["Category"]): (page["Total"], page["Expenses"])
+            for page in self.pages.values()
+            if "Total" in page
+        }
+
+
+def _rows(*rows: tuple[str, str, str, int]) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {
+                "page_id": page_id,
+                "date": pd.Timestamp(date),
+                "category": category,
+                "amount_cents": cents,
+            }
+            for page_id, date, category, cents in rows
+        ],
+        columns=["page_id", "date", "category", "amount_cents"],
+    )
+
+
+def _page(page_id: str, date: str, category: str, value: float) -> dict:
+    return {
+        "id": page_id,
+        "properties": {
+            "Date": {"type": "date", "date": {"start": date}},
+            "Bank Description": {"type": "rich_text", "rich_text": []},
+            "Category": {"type": "select", "select": {"name": category}},
+            "Value": {"type": "number", "number": value},
+        },
+    }
+
+
+def _deltas(*rows: tuple[str, str, int, int]) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=["month", "category", "cents", "expenses"])
+
+
+class TestSummaryDeltas:
+    """Test cases for summary_deltas."""
+
+    def test_moves_changed_pages_between_totals(self):
+        """Test that edits move amounts and counts, and unchanged totals drop out."""
+        before = _rows(
+            ("a", "2025-10-01", "Food", 1000),
+            ("b", "2025-10-02", "Food", 500),
+            ("c", "2025-09-30", "Home", 700),
+        )
+        after = _rows(
+            ("a", "2025-10-01", "Leisure", 1000),
+            ("b", "2025-10-02", "Food", 500),
+            ("c", "2025-10-01", "Home", 900),
+            ("d", "2025-10-03", None, 100),
+        )
+
+        deltas = summary_deltas(before, after)
+
+        assert sorted(deltas.itertuples(index=False, name=None)) == [
+            ("2025-09", "Home", -700, -1),
+            ("2025-10", "Food", -1000, -1),
+            ("2025-10", "Home", 900, 1),
+            ("2025-10", "Leisure", 1000, 1),
+            ("2025-10", "UNASSIGNED", 100, 1),
+        ]
+
+    def test_no_rows(self):
+        """Test that a batch without usable pages changes nothing."""
+        assert summary_deltas(_rows(), _rows()).empty
+
+
+class TestMonthlySummary:
+    """Test cases for MonthlySummary."""
+
+    def test_writes_only_changed_pages(self, tmp_path):
+        """Test that pages are created once and then updated only when touched."""
+        gateway = FakeGateway()
+        summary = MonthlySummary(gateway, "summary-db", tmp_path / "summary.sqlite")
+
+        first = summary.apply(
+            _deltas(("2025-10", "Food", 1500, 2), ("2025-10", "Home", 700, 1))
+        )
+        gateway.writes.clear()
+        second = summary.apply(_deltas(("2025-10", "Food", -500, -1)))
+
+        assert (first.created, first.updated) == (2, 0)
+        assert (second.created, second.updated) == (0, 1)
+        assert len(gateway.writes) == 1
+        assert gateway.totals() == {
+            ("2025-10", "Food"): (10.0, 1),
+            ("2025-10", "Home"): (7.0, 1),
+        }
+
+    def test_failed_writes_are_retried(self, tmp_path):
+        """Test that a total Notion didn't take is written by the next push."""
+        gateway = FakeGateway()
+        summary = MonthlySummary(gateway, "summary-db", tmp_path / "summary.sqlite")
+        summary.apply(_deltas(("2025-10", "Food", 1000, 1)))
+        gateway.failing.add("2025-10 Food")
+
+        failed = summary.apply(_deltas(("2025-10", "Food", 250, 1)))
+        gateway.failing.clear()
+        retried = MonthlySummary(
+            gateway, "summary-db", tmp_path / "summary.sqlite"
+        ).push()
+
+        assert failed.failed == 1
+        assert retried.updated == 1
+        assert gateway.totals() == {("2025-10", "Food"): (12.5, 2)}
+
+    def test_pages_are_written_outside_the_write_lock(self, tmp_path):
+        """Test that deltas can be recorded while summary pages are being written."""
+        path = tmp_path / "summary.sqlite"
+        gateway = FakeGateway()
+        summary = MonthlySummary(gateway, "summary-db", path)
+        create_page = gateway.create_page
+
+        def create_while_recording(payload):
+            other = sqlite3.connect(path, timeout=0, isolation_level=None)
+            other.execute("BEGIN IMMEDIATE")
+            other.execute("ROLLBACK")
+            other.close()
+            return create_page(payload)
+
+        gateway.create_page = create_while_recording
+
+        report = summary.apply(_deltas(("2025-10", "Food", 1000, 1)))
+
+        assert (report.created, report.failed) == (1, 0)
+
+    def test_rebuild_reuses_pages(self, tmp_path):
+        """Test that a rebuild adopts existing pages and zeroes emptied ones."""
+        gateway = FakeGateway()
+        summary = MonthlySummary(gateway, "summary-db", tmp_path / "summary.sqlite")
+        summary.apply(
+            _deltas(("2025-10", "Food", 1000, 1), ("2025-09", "Home", 300, 1))
+        )
+
+        report = MonthlySummary(
+            gateway, "summary-db", tmp_path / "rebuilt.sqlite"
+        ).rebuild(
+            _rows(
+                ("a", "2025-10-01", "Food", 400),
+                ("b", "2025-10-02", "Leisure", 600),
+            )
+        )
+
+        assert (report.created, report.updated) == (1, 2)
+        assert gateway.totals() == {
+            ("2025-10", "Food"): (4.0, 1),
+            ("2025-09", "Home"): (0.0, 0),
+            ("2025-10", "Leisure"): (6.0, 1),
+        }
+
+    def test_rebuild_checks_properties(self, tmp_path):
+        """Test that a database without the summary properties is rejected."""
+        gateway = FakeGateway(properties={"Name": "title", "Total": "rich_text"})
+        summary = MonthlySummary(gateway, "summary-db", tmp_path / "summary.sqlite")
+
+        with pytest.raises(ValueError, match="Total"):
+            summary.rebuild(_rows())
+
+
+class TestRecordPages:
+    """Test cases for keeping the summary in step with the expense store."""
+
+    def test_writes_move_totals(self, tmp_path):
+        """Test that creates, edits and archives each apply their delta."""
+        pytest.importorskip("pyarrow")
+        gateway = FakeGateway()
+        summary = MonthlySummary(gateway, "summary-db", tmp_path / "summary.sqlite")
+        store = ExpenseStore(tmp_path / "expenses")
+        canonicalizer = MerchantCanonicalizer(cache_path=None)
+
+        record_pages(
+            store,
+            [
+                _page("a", "2025-10-01", "Food", 10.0),
+                _page("b", "2025-10-02", "Food", 5.5),
+            ],
+            canonicalizer,
+            summary,
+        )
+        record_pages(
+            store, [_page("b", "2025-10-02", "Home", 5.5)], canonicalizer, summary
+        )
+        remove_pages(store, ["a"], summary)
+
+        assert gateway.totals() == {
+            ("2025-10", "Food"): (0.0, 0),
+            ("2025-10", "Home"): (5.5, 1),
+        }
+
+    def test_deltas_commit_with_the_store_write(self, tmp_path, monkeypatch):
+        """Test that totals count a store write if and only if it happened."""
+        pytest.importorskip("pyarrow")
+        gateway = FakeGateway()
+        summary = MonthlySummary(gateway, "summary-db", tmp_path / "summary.sqlite")
+        store = ExpenseStore(tmp_path / "expenses")
+        canonicalizer = MerchantCanonicalizer(cache_path=None)
+
+        def fail(*args):
+            raise OSError("unavailable")
+
+        with monkeypatch.context() as patch:
+            patch.setattr(store, "upsert", fail)
+            with pytest.raises(OSError):
+                record_pages(
+                    store,
+                    [_page("a", "2025-10-01", "Food", 10.0)],
+                    canonicalizer,
+                    summary,
+                )
+        with monkeypatch.context() as patch:
+            patch.setattr(gateway, "map_concurrently", fail)
+            with pytest.raises(OSError):
+                record_pages(
+                    store,
+                    [_page("a", "2025-10-01", "Food", 4.0)],
+                    canonicalizer,
+                    summary,
+                )
+        summary.push()
+
+        assert gateway.totals() == {("2025-10", "Food"): (4.0, 1)}
@@ -0,0 +1,111 @@
+"""Test cases for rolling back the pages created by a sync run."""
+
+import pytest
+
+from src.notion_gateway import SendResult
+from src.notion_sync_expenses.expense_store import ExpenseStore
+from src.notion_sync_expenses.notion_sync_service import NotionSyncService
+from src.notion_sync_expenses.sync_runs import SyncRun
+
+
+class FakeGateway:
+    """Archives pages in memory; archiving a page in `failing` raises."""
+
+    def __init__(self):
+        self.archived: list[str] = []
+        self.failing: set[str] = set()
+
+    def archive_page(self, page_id):
+        if page_id in self.failing:
+            raise RuntimeError("Notion is down")
+        self.archived.append(page_id)
+        return {"id": page_id, "archived": True}
+
+    def map_concurrently(self, send, items, max_workers):
+        for key, item in items:
+            try:
+                yield SendResult(key, send(item))
+            except Exception as e:
+                yield SendResult(key, error=e)
+
+
+def _service(tmp_path, gateway: FakeGateway) -> NotionSyncService:
+    return NotionSyncService(
+        database_id="db",
+        gateway=gateway,
+        expense_store=ExpenseStore(tmp_path / "store"),
+        state_dir=tmp_path / "state",
+    )
+
+
+class TestSyncRun:
+    """Test cases for SyncRun."""
+
+    def test_ledgers_live_under_the_run_id(self, tmp_path):
+        """Test that a run only exists once a page is recorded under it."""
+        run = SyncRun("run-1", tmp_path)
+        assert not run.exists()
+
+        run.pages.mark_many(["page-1", "page-2"])
+        run.archived.mark("page-1")
+
+        reopened = SyncRun("run-1", tmp_path)
+        assert reopened.exists()
+        assert reopened.pages.read() == ["page-1", "page-2"]
+        assert reopened.archived.load() == {"page-1"}
+        assert not SyncRun("run-2", tmp_path).exists()
+
+
+class TestRollbackRun:
+    """Test cases for NotionSyncService.rollback_run."""
+
+    def test_archives_every_page(self, tmp_path):
+        """Test that each page of the run is archived once and checkpointed."""
+        gateway = FakeGateway()
+        # A page recorded twice, as a retried send can do, is archived once
+        SyncRun("run-1", tmp_path / "state").pages.mark_many(
+            ["page-1", "page-2", "page-1"]
+        )
+
+        report = _service(tmp_path, gateway).rollback_run("run-1", max_workers=2)
+
+        assert (report.archived, report.failed, report.skipped) == (2, 0, 0)
+        assert gateway.archived == ["page-1", "page-2"]
+        assert SyncRun("run-1", tmp_path / "state").archived.load() == {
+            "page-1",
+            "page-2",
+        }
+
+    def test_resumes_after_partial_failure(self, tmp_path):
+        """Test that a second rollback retries only the pages that failed."""
+        gateway = FakeGateway()
+        gateway.failing.add("page-2")
+        SyncRun("run-1", tmp_path / "state").pages.mark_many(
+            ["page-1", "page-2", "page-3"]
+        )
+        service = _service(tmp_path, gateway)
+
+        first = service.rollback_run("run-1", max_workers=2)
+        gateway.failing.clear()
+        second = service.rollback_run("run-1", max_workers=2)
+
+        assert (first.archived, first.failed, first.skipped) == (2, 1, 0)
+        assert (second.archived, second.failed, second.skipped) == (1, 0, 2)
+        assert gateway.archived == ["page-1", "page-3", "page-2"]
+
+    def test_skips_archived_pages(self, tmp_path):
+        """Test that a finished rollback archives nothing when run again."""
+        gateway = FakeGateway()
+        run = SyncRun("run-1", tmp_path / "state")
+        run.pages.mark_many(["page-1", "page-2"])
+        run.archived.mark_many(["page-1", "page-2"])
+
+        report = _service(tmp_path, gateway).rollback_run("run-1", max_workers=2)
+
+        assert (report.archived, report.failed, report.skipped) == (0, 0, 2)
+        assert gateway.archived == []
+
+    def test_unknown_run(self, tmp_path):
+        """Test that a run without recorded pages is rejected with a ValueError."""
+        with pytest.raises(ValueError, match="run-9"):
+            _service(tmp_path, FakeGateway()).rollback_run("run-9", max_workers=2)
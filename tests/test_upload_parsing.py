@@ -0,0 +1,134 @@
+"""Test cases for detecting and parsing multi-file uploads."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from src.adapters.export_parser import detect_file_type
+from src.streamlit_app.processors import data_loader
+from src.streamlit_app.processors.data_loader import (
+    Upload,
+    detect_uploads,
+    parse_uploads,
+)
+
+INVOICE = (
+    '"Data","Lançamento","Categoria","Tipo","Valor"\n'
+    '"01/10/2025","IFOOD","UNASSIGNED","Compra à vista","R$ 10,00"\n'
+).encode("utf-8")
+STATEMENT = (
+    "\ufeffExtrato Conta Corrente \n"
+    "Conta ;12345678\n"
+    "\n"
+    "Data Lançamento;Histórico;Descrição;Valor;Saldo\n"
+    "02/10/2025;Pix enviado ;PADARIA;-5,50;100,00\n"
+    "03/10/2025;Pix enviado ;MERCADO;-20,00;80,00\n"
+).encode("utf-8")
+
+
+def _file(name: str, data: bytes) -> SimpleNamespace:
+    """Stand-in for Streamlit's UploadedFile."""
+    return SimpleNamespace(name=name, getvalue=lambda: data)
+
+
+class TestDetectFileType:
+    """Test cases for detect_file_type."""
+
+    def test_detects_each_type(self):
+        """Test that both exports are told apart by their header."""
+        assert detect_file_type(INVOICE) == "CREDIT_CARD_INVOICE"
+        assert detect_file_type(STATEMENT) == "BANK_ACCOUNT_STATEMENT"
+
+    def test_rejects_other_files(self):
+        """Test that a CSV without either header is rejected."""
+        with pytest.raises(ValueError):
+            detect_file_type(b"name,amount\nx,1\n")
+
+
+class TestDetectUploads:
+    """Test cases for detect_uploads."""
+
+    def test_skips_duplicates_and_renames_clashes(self):
+        """Test that repeated content is dropped and clashing names get a suffix."""
+        files = [
+            _file("export.csv", INVOICE),
+            _file("export.csv", STATEMENT),
+            _file("copy.csv", INVOICE),
+            _file("notes.csv", b"hello\n"),
+        ]
+
+        uploads, rejected = detect_uploads(files)
+
+        assert [(upload.name, upload.file_type) for upload in uploads] == [
+            ("export.csv", "CREDIT_CARD_INVOICE"),
+            ("export.csv (2)", "BANK_ACCOUNT_STATEMENT"),
+        ]
+        assert [message.split(":")[0] for message in rejected] == [
+            "copy.csv",
+            "notes.csv",
+        ]
+
+    def test_hashes_each_file_once(self, monkeypatch):
+        """Test that the key is hashed on detection and kept on renamed copies."""
+        calls = []
+        upload_key = data_loader.upload_key
+        monkeypatch.setattr(
+            data_loader,
+            "upload_key",
+            lambda data, file_type: calls.append(file_type)
+            or upload_key(data, file_type),
+        )
+
+        uploads, _ = detect_uploads(
+            [_file("export.csv", INVOICE), _file("export.csv", STATEMENT)]
+        )
+        keys = [upload.key for upload in uploads for _ in range(3)]
+
+        assert len(calls) == 2
+        assert keys[3] == upload_key(STATEMENT, "BANK_ACCOUNT_STATEMENT")
+
+
+class TestParseUploads:
+    """Test cases for parse_uploads."""
+
+    def test_parses_every_file(self):
+        """Test that files are parsed in worker processes, failures included."""
+        uploads = [
+            Upload.detect("fatura.csv", INVOICE),
+            Upload.detect("extrato.csv", STATEMENT),
+            # A statement header with none of the expected columns
+            Upload("broken.csv", "BANK_ACCOUNT_STATEMENT", b"x;y\n1;2\n"),
+        ]
+
+        parsed = {result.upload.name: result for result in parse_uploads(uploads)}
+
+        assert len(parsed["fatura.csv"].frame) == 1
+        assert parsed["extrato.csv"].frame["Lançamento"].tolist() == [
+            "Pix enviado - PADARIA",
+            "Pix enviado - MERCADO",
+        ]
+        assert not parsed["broken.csv"].ok
+        assert isinstance(parsed["broken.csv"].error, KeyError)
+
+    def test_single_file(self):
+        """Test that a single file is parsed without the worker pool."""
+        (parsed,) = parse_uploads([Upload.detect("fatura.csv", INVOICE)])
+
+        assert parsed.ok
+        assert parsed.frame["Valor"].tolist() == ["R$ 10,00"]
+
+    def test_parsed_uploads_are_cached_by_content(self, monkeypatch):
+        """Test that an upload parsed before isn't parsed again, and comes as a copy."""
+        data = INVOICE.replace(b"IFOOD", b"PADARIA")
+        (first,) = parse_uploads([Upload.detect("fatura.csv", data)])
+        first.frame["Valor"] = "edited"
+
+        def fail(*args):
+            raise AssertionError("parsed again")
+
+        monkeypatch.setattr(data_loader, "parse_upload_bytes", fail)
+        (again,) = parse_uploads([Upload.detect("renamed.csv", data)])
+
+        assert again.ok
+        assert again.upload.name == "renamed.csv"
+        assert again.frame["Valor"].tolist() == ["R$ 10,00"]
@@ -0,0 +1,74 @@
+"""Test cases for upsert planning."""
+
+from datetime import datetime
+
+from src.notion_gateway import ExpenseRow, NotionAPIGateway
+from src.notion_sync_expenses.upsert import plan_upsert
+
+
+def _payload(description: str, value: float, category: str = "Food") -> dict:
+    return NotionAPIGateway.build_payload(
+        "db",
+        ExpenseRow(
+            date=datetime(2025, 10, 1),
+            description=description,
+            category=category,
+            value=value,
+            payment="CREDIT_CARD",
+            type_="NON-ESSENTIAL",
+        ),
+    )
+
+
+def _page(page_id: str, payload: dict, created_time: str) -> dict:
+    """Turn a payload into the page object shape returned by databases.query."""
+    properties = {}
+    for name, prop in payload["properties"].items():
+        ((prop_type, value),) = prop.items()
+        if prop_type == "rich_text":
+            value = [{"plain_text": item["text"]["content"]} for item in value]
+        properties[name] = {"type": prop_type, prop_type: value}
+    return {"id": page_id, "created_time": created_time, "properties": properties}
+
+
+class TestPlanUpsert:
+    """Test cases for plan_upsert."""
+
+    def test_only_changed_properties_are_updated(self):
+        """Test that unchanged rows are skipped and updates carry only the diff."""
+        pages = [
+            _page("page-1", _payload("IFOOD", 10.0), "2025-10-02T00:00:00Z"),
+            _page("page-2", _payload("UBER", 20.0), "2025-10-02T00:00:01Z"),
+        ]
+        payloads = [
+            _payload("IFOOD", 10.0),
+            _payload("UBER", 25.5, category="Transport"),
+            _payload("NETFLIX", 39.9),
+        ]
+
+        plan = plan_upsert(payloads, pages)
+
+        assert plan.unchanged == 1
+        assert plan.creates == [payloads[2]]
+        assert plan.updates == [
+            (
+                "page-2",
+                {
+                    "Category": {"select": {"name": "Transport"}},
+                    "Value": {"number": 25.5},
+                },
+            )
+        ]
+
+    def test_repeated_purchases_match_by_order(self):
+        """Test that same-day repeats pair with pages in creation order."""
+        pages = [
+            _page("second", _payload("IFOOD", 30.0), "2025-10-02T00:00:01Z"),
+            _page("first", _payload("IFOOD", 10.0), "2025-10-02T00:00:00Z"),
+        ]
+        payloads = [_payload("IFOOD", 10.0), _payload("IFOOD", 30.0)]
+
+        plan = plan_upsert(payloads, pages)
+
+        assert plan.unchanged == 2
+        assert plan.creates == []